@@ -1,29 +1,62 @@
 # Critérios: Integração simulada (API pública clara), Design de testes
-from .entities import Carrinho, CarrinhoItem, Cupom, Produto
-from .exceptions import (
-    CupomExpiradoError,
-    CupomInvalidoError,
-    EstoqueInsuficienteError,
-    FreteIndisponivelError,
-    ItemInexistenteError,
-)
-from .frete import Frete, FreteAPI
-from .repositories import EstoqueRepository, InMemoryEstoqueRepository
-from .services import CarrinhoService
-
-__all__ = [
-    "Carrinho",
-    "CarrinhoItem",
-    "CarrinhoService",
-    "Cupom",
-    "CupomExpiradoError",
-    "CupomInvalidoError",
-    "EstoqueInsuficienteError",
-    "Frete",
-    "FreteAPI",
-    "FreteIndisponivelError",
-    "InMemoryEstoqueRepository",
-    "ItemInexistenteError",
-    "Produto",
-    "EstoqueRepository",
-]
+# Os submódulos são carregados no primeiro acesso ao nome (PEP 562), para que
+# quem só precisa de uma parte não pague pela importação do pacote inteiro.
+from importlib import import_module
+
+# Verdadeiro só para checadores de tipo; evita importar typing no caminho frio.
+TYPE_CHECKING = False
+
+_ORIGENS = {
+    "Carrinho": ".entities",
+    "CarrinhoItem": ".entities",
+    "CarrinhoService": ".services",
+    "ConcurrentEstoqueRepository": ".repositories",
+    "Cupom": ".entities",
+    "CupomEsgotadoError": ".exceptions",
+    "CupomExpiradoError": ".exceptions",
+    "CupomInexistenteError": ".exceptions",
+    "CupomInvalidoError": ".exceptions",
+    "Dinheiro": ".dinheiro",
+    "EstoqueInsuficienteError": ".exceptions",
+    "Frete": ".frete",
+    "FreteAPI": ".frete",
+    "FreteIndisponivelError": ".exceptions",
+    "InMemoryEstoqueRepository": ".repositories",
+    "ItemInexistenteError": ".exceptions",
+    "Produto": ".entities",
+    "ProdutoInexistenteError": ".exceptions",
+    "EstoqueRepository": ".repositories",
+}
+
+__all__ = list(_ORIGENS)
+
+
+def __getattr__(nome: str):
+    origem = _ORIGENS.get(nome)
+    if origem is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(origem, __name__), nome)
+    globals()[nome] = valor  # próximos acessos não passam mais por aqui
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .dinheiro import Dinheiro
+    from .entities import Carrinho, CarrinhoItem, Cupom, Produto
+    from .exceptions import (
+        CupomEsgotadoError,
+        CupomExpiradoError,
+        CupomInexistenteError,
+        CupomInvalidoError,
+        EstoqueInsuficienteError,
+        FreteIndisponivelError,
+        ItemInexistenteError,
+        ProdutoInexistenteError,
+    )
+    from .frete import Frete, FreteAPI
+    from .repositories import ConcurrentEstoqueRepository, EstoqueRepository, InMemoryEstoqueRepository
+    from .services import CarrinhoService
@@ -0,0 +1,215 @@
+import asyncio
+from datetime import date
+from typing import TYPE_CHECKING, Callable, Mapping, Optional, Protocol, Union, runtime_checkable
+
+from .entities import Carrinho, Cupom, Produto
+from .exceptions import FreteIndisponivelError
+from .frete import Frete, TabelaFreteLocal
+from .promocoes import PROMOCOES_PADRAO, MotorPromocoes
+from .repositories import EstoqueRepository
+from .services import CEP_ORIGEM_PADRAO, ResumoPedido, _calcular_descontos, _montar_resumo
+
+if TYPE_CHECKING:
+    from .cupons import RegistroCupons
+
+
+class AsyncFreteAPI(Protocol):
+    async def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        ...
+
+
+@runtime_checkable
+class AsyncEstoqueRepository(Protocol):
+    async def reservar(self, sku: str, quantidade: int) -> None:
+        ...
+
+    async def liberar(self, sku: str, quantidade: int) -> None:
+        ...
+
+    async def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        ...
+
+    async def quantidade_disponivel(self, sku: str) -> int:
+        ...
+
+    async def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
+    async def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
+    async def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
+
+class EstoqueAssincrono:
+    """Expõe um ``EstoqueRepository`` síncrono e não bloqueante (ex.: em memória) como awaitable."""
+
+    def __init__(self, estoque: EstoqueRepository) -> None:
+        self._estoque = estoque
+
+    async def reservar(self, sku: str, quantidade: int) -> None:
+        self._estoque.reservar(sku, quantidade)
+
+    async def liberar(self, sku: str, quantidade: int) -> None:
+        self._estoque.liberar(sku, quantidade)
+
+    async def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self._estoque.confirmar_reserva(sku, quantidade)
+
+    async def quantidade_disponivel(self, sku: str) -> int:
+        return self._estoque.quantidade_disponivel(sku)
+
+    async def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.reservar_lote(itens)
+
+    async def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.liberar_lote(itens)
+
+    async def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.confirmar_lote(itens)
+
+
+class TransportadoraSimulada:
+    """Transportadora em processo com latência injetável, cotando pela ``TabelaFreteLocal``."""
+
+    def __init__(
+        self,
+        *,
+        latencia: Union[float, Callable[[], float]] = 0.0,
+        tabela: Optional[TabelaFreteLocal] = None,
+    ) -> None:
+        self._latencia = latencia
+        self._tabela = tabela or TabelaFreteLocal()
+        self.chamadas = 0
+
+    async def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        self.chamadas += 1
+        latencia = self._latencia() if callable(self._latencia) else self._latencia
+        await asyncio.sleep(latencia)
+        return self._tabela.cotacao(cep_origem, cep_destino, peso_total)
+
+
+class AsyncCarrinhoService:
+    """Contraparte asyncio de ``CarrinhoService``.
+
+    ``calcular_resumo`` dispara a cotação de frete antes de calcular os
+    descontos, de modo que as duas etapas se sobrepõem. Cotações que excedem
+    o timeout (do construtor ou da chamada), contado desde o disparo, viram
+    ``FreteIndisponivelError``. Cupons seguem as mesmas regras do serviço
+    síncrono, inclusive o registro de cupons.
+    """
+
+    def __init__(
+        self,
+        estoque: AsyncEstoqueRepository,
+        frete_api: AsyncFreteAPI,
+        *,
+        data_provider: Callable[[], date] | None = None,
+        cep_origem: str = CEP_ORIGEM_PADRAO,
+        timeout_frete: Optional[float] = None,
+        promocoes: MotorPromocoes = PROMOCOES_PADRAO,
+        cupons: "RegistroCupons | None" = None,
+    ) -> None:
+        self._estoque = estoque
+        self._frete_api = frete_api
+        self._hoje = data_provider or date.today
+        self._cep_origem = cep_origem
+        self._timeout_frete = timeout_frete
+        self._promocoes = promocoes
+        self._cupons = cupons
+
+    async def adicionar_item(self, carrinho: Carrinho, produto: Produto, quantidade: int) -> None:
+        await self._estoque.reservar(produto.sku, quantidade)
+        try:
+            carrinho.adicionar(produto, quantidade)
+        except Exception:
+            await self._estoque.liberar(produto.sku, quantidade)
+            raise
+
+    async def alterar_quantidade(self, carrinho: Carrinho, sku: str, quantidade: int) -> None:
+        item = carrinho.itens.get(sku)
+        if item is None:
+            raise ValueError(f"SKU {sku} não está no carrinho")
+        delta = quantidade - item.quantidade
+        if delta > 0:
+            await self._estoque.reservar(sku, delta)
+        elif delta < 0:
+            await self._estoque.liberar(sku, -delta)
+        carrinho.alterar_quantidade(sku, quantidade)
+
+    async def remover_item(self, carrinho: Carrinho, sku: str) -> None:
+        item = carrinho.itens.get(sku)
+        if item is None:
+            raise ValueError(f"SKU {sku} não está no carrinho")
+        await self._estoque.liberar(sku, item.quantidade)
+        carrinho.remover(sku)
+
+    async def aplicar_cupom(self, carrinho: Carrinho, cupom: Cupom | str, *, cliente: str | None = None) -> None:
+        """Aplica um cupom; códigos (``str``) são resolvidos no registro de cupons."""
+        if isinstance(cupom, str):
+            if self._cupons is None:
+                raise ValueError("Serviço sem registro de cupons para resolver códigos")
+            cupom = self._cupons.verificar(cupom, self._hoje(), cliente)
+        else:
+            cupom.validar(self._hoje())
+        carrinho.registrar_cupom(cupom)
+
+    async def calcular_resumo(
+        self, carrinho: Carrinho, cep_destino: str, *, timeout: Optional[float] = None
+    ) -> ResumoPedido:
+        if carrinho.esta_vazio():
+            raise ValueError("Carrinho não pode estar vazio ao calcular resumo")
+        disparo = asyncio.get_running_loop().time()
+        cotacao = asyncio.ensure_future(
+            self._frete_api.cotacao(self._cep_origem, cep_destino, carrinho.peso_total)
+        )
+        # Cede o laço uma vez para a cotação chegar à transportadora antes dos descontos.
+        await asyncio.sleep(0)
+        try:
+            valor_bruto, desconto_promocional, desconto_cupom = _calcular_descontos(
+                carrinho, self._hoje(), self._promocoes
+            )
+        except BaseException:
+            cotacao.cancel()
+            raise
+        frete = await self._aguardar_frete(cotacao, cep_destino, timeout, disparo)
+        return _montar_resumo(valor_bruto, desconto_promocional, desconto_cupom, frete)
+
+    async def finalizar(
+        self,
+        carrinho: Carrinho,
+        cep_destino: str,
+        *,
+        timeout: Optional[float] = None,
+        cliente: str | None = None,
+    ) -> ResumoPedido:
+        resumo = await self.calcular_resumo(carrinho, cep_destino, timeout=timeout)
+        codigo = None
+        if self._cupons is not None and carrinho.cupom is not None and carrinho.cupom.codigo in self._cupons:
+            codigo = carrinho.cupom.codigo
+            self._cupons.resgatar(codigo, self._hoje(), cliente)
+        try:
+            await self._estoque.confirmar_lote(
+                {sku: item.quantidade for sku, item in carrinho.itens.items()}
+            )
+        except Exception:
+            if codigo is not None:
+                self._cupons.estornar(codigo, cliente)  # type: ignore[union-attr]
+            raise
+        carrinho.limpar()
+        return resumo
+
+    async def _aguardar_frete(
+        self, cotacao: "asyncio.Future[Frete]", cep_destino: str, timeout: Optional[float], disparo: float
+    ) -> Frete:
+        limite = self._timeout_frete if timeout is None else timeout
+        if limite is not None:
+            limite = max(0.0, limite - (asyncio.get_running_loop().time() - disparo))
+        try:
+            frete = await asyncio.wait_for(cotacao, limite)
+        except asyncio.TimeoutError as erro:
+            raise FreteIndisponivelError(cep_destino) from erro
+        if frete is None:
+            raise FreteIndisponivelError(cep_destino)
+        return frete
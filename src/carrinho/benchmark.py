@@ -0,0 +1,702 @@
+"""Suíte de benchmarks do carrinho com baselines em JSON.
+
+Uso::
+
+    python -m carrinho.benchmark executar --saida benchmarks/baseline.json
+    python -m carrinho.benchmark executar --comparar benchmarks/baseline.json --tolerancia 15
+    python -m carrinho.benchmark comparar benchmarks/baseline.json atual.json
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from .carga import PerfilCarga, executar_carga
+from .catalogo import Catalogo, produto_de_registro
+from .catalogo_colunar import CatalogoColunar, exportar_colunar
+from .cupons import RegistroCupons
+from .entities import Carrinho, Cupom, Produto
+from .estoque_expiracao import EstoqueComExpiracao
+from .estoque_particionado import EstoqueParticionado
+from .estoque_sqlite import SQLiteEstoqueRepository
+from .estoque_wal import EstoqueDuravel
+from .eventos_carrinho import DiarioCarrinhos
+from .frete import TabelaFreteLocal
+from .frete_cache import FreteComCache
+from .frete_tabela import TabelaFreteCEP
+from .metricas import resumir_latencias
+from .precificacao_lote import calcular_resumos_em_lote
+from .promocoes import (
+    DescontoSku,
+    FaixaCategoria,
+    FaixaQuantidade,
+    FaixaValor,
+    LeveXPagueY,
+    MotorPromocoes,
+    RegraPromocao,
+)
+from .replay import ReplayPedidos
+from .repositories import ConcurrentEstoqueRepository, EstoqueRepository, InMemoryEstoqueRepository
+from .serializacao import exportar_carrinhos, importar_carrinhos
+from .services import CarrinhoService
+
+VERSAO_FORMATO = 1
+REFERENCIA = date(2025, 1, 15)
+
+
+@dataclass(frozen=True, slots=True)
+class Benchmark:
+    """``preparar`` monta o cenário fora da medição e devolve a operação medida.
+
+    Cenários com recursos (arquivos temporários, processos) devolvem um
+    gerenciador de contexto que entrega a operação e os libera na saída.
+    """
+
+    nome: str
+    preparar: Callable[[], Union[Callable[[], object], ContextManager[Callable[[], object]]]]
+    iteracoes: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Regressao:
+    nome: str
+    base: float
+    atual: float
+
+    @property
+    def variacao(self) -> float:
+        return (self.atual - self.base) / self.base * 100 if self.base else float("inf")
+
+
+def _produtos(quantidade: int) -> List[Produto]:
+    return [
+        Produto(sku=f"SKU-{i:05d}", nome=f"Produto {i}", preco=Decimal(10 + i % 90) + Decimal("0.90"), peso_kg=0.3)
+        for i in range(quantidade)
+    ]
+
+
+def _servico(
+    produtos: Sequence[Produto], estoque_por_sku: int = 1_000_000, *, resumos_em_cache: int = 0
+) -> CarrinhoService:
+    estoque = InMemoryEstoqueRepository()
+    for produto in produtos:
+        estoque.registrar(produto.sku, estoque_por_sku)
+    return CarrinhoService(
+        estoque,
+        TabelaFreteLocal(),
+        data_provider=lambda: REFERENCIA,
+        resumos_em_cache=resumos_em_cache,
+        faixa_peso=TabelaFreteLocal.chave_faixa,
+    )
+
+
+def _mutacao_carrinho() -> Callable[[], object]:
+    produtos = _produtos(20)
+    servico = _servico(produtos)
+
+    def operar() -> None:
+        carrinho = Carrinho()
+        for produto in produtos:
+            servico.adicionar_item(carrinho, produto, 2)
+        for produto in produtos[::2]:
+            servico.alterar_quantidade(carrinho, produto.sku, 1)
+        for produto in produtos:
+            servico.remover_item(carrinho, produto.sku)
+
+    return operar
+
+
+def _resumo(linhas: int, resumos_em_cache: int = 0) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        produtos = _produtos(linhas)
+        servico = _servico(produtos, resumos_em_cache=resumos_em_cache)
+        carrinho = Carrinho()
+        servico.adicionar_itens(carrinho, [(produto, 1 + i % 3) for i, produto in enumerate(produtos)])
+        servico.aplicar_cupom(carrinho, Cupom("BENCH10", 10, REFERENCIA + timedelta(days=30)))
+        return lambda: servico.calcular_resumo(carrinho, "88000-000")
+
+    return preparar
+
+
+def _reservas_e_liberacoes(
+    repo: EstoqueRepository, skus: Sequence[str], threads: int, operacoes: int
+) -> Callable[[], object]:
+    def trabalhar(deslocamento: int) -> None:
+        for indice in range(operacoes):
+            sku = skus[(indice * 7 + deslocamento) % len(skus)]
+            repo.reservar(sku, 1)
+            repo.liberar(sku, 1)
+
+    if threads == 1:
+        return lambda: trabalhar(0)
+
+    def operar() -> None:
+        trabalhadores = [threading.Thread(target=trabalhar, args=(t,)) for t in range(threads)]
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+
+    return operar
+
+
+def _estoque(
+    abrir: Callable[[], ContextManager[EstoqueRepository]], *, threads: int = 1, operacoes: int = 2_000
+) -> Callable[[], ContextManager[Callable[[], object]]]:
+    """Pares reservar+liberar sobre 64 SKUs, de ``threads`` threads ao mesmo tempo."""
+    skus = [f"SKU-{i:03d}" for i in range(64)]
+
+    @contextmanager
+    def preparar() -> Iterator[Callable[[], object]]:
+        with abrir() as repo:
+            for sku in skus:
+                repo.registrar(sku, threads * operacoes)
+            yield _reservas_e_liberacoes(repo, skus, threads, operacoes)
+
+    return preparar
+
+
+@contextmanager
+def _estoque_sqlite() -> Iterator[EstoqueRepository]:
+    with tempfile.TemporaryDirectory() as diretorio:
+        with SQLiteEstoqueRepository(str(Path(diretorio) / "estoque.db")) as repo:
+            yield repo
+
+
+def _estoque_wal(*, duravel_ao_retornar: bool) -> Callable[[], ContextManager[EstoqueRepository]]:
+    @contextmanager
+    def abrir() -> Iterator[EstoqueRepository]:
+        with tempfile.TemporaryDirectory() as diretorio:
+            with EstoqueDuravel(diretorio, duravel_ao_retornar=duravel_ao_retornar) as repo:
+                yield repo
+
+    return abrir
+
+
+def _estoque_particionado(shards: int, pedidos: int = 100) -> Callable[[], ContextManager[Callable[[], object]]]:
+    skus = [f"SKU-{i:04d}" for i in range(1_000)]
+    lotes = [{skus[(indice * 13 + k * 97) % len(skus)]: 1 for k in range(5)} for indice in range(pedidos)]
+
+    @contextmanager
+    def preparar() -> Iterator[Callable[[], object]]:
+        with EstoqueParticionado(shards) as estoque:
+            estoque.executar_lote([("registrar", sku, 1_000_000) for sku in skus])
+
+            def operar() -> None:
+                for itens in lotes:
+                    estoque.reservar_lote(itens)
+                    estoque.liberar_lote(itens)
+
+            yield operar
+
+    return preparar
+
+
+def _expiracao_estoque(donos: int = 2_000) -> Callable[[], object]:
+    skus = [f"SKU-{i:03d}" for i in range(100)]
+
+    def operar() -> None:
+        agora = [0.0]
+        base = InMemoryEstoqueRepository()
+        for sku in skus:
+            base.registrar(sku, donos)
+        estoque = EstoqueComExpiracao(base, ttl=60, relogio=lambda: agora[0])
+        for indice in range(donos):
+            agora[0] = indice * 1e-3
+            estoque.para(f"carrinho-{indice}").reservar(skus[indice % len(skus)], 1)
+        agora[0] += 61
+        estoque.expirar()
+
+    return operar
+
+
+def _carrinhos_para_precificar(quantidade: int) -> List[Carrinho]:
+    produtos = _produtos(50)
+    cupom = Cupom("BENCH12", 12, REFERENCIA)
+    carrinhos = []
+    for indice in range(quantidade):
+        carrinho = Carrinho()
+        carrinho.adicionar(produtos[indice % 50], 1 + indice % 11)
+        carrinho.adicionar(produtos[(indice * 7) % 50], 2)
+        if indice % 3 == 0:
+            carrinho.registrar_cupom(cupom)
+        carrinhos.append(carrinho)
+    return carrinhos
+
+
+def _precificacao_escalar(quantidade: int) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        servico = _servico([])
+        carrinhos = _carrinhos_para_precificar(quantidade)
+        return lambda: [servico.calcular_resumo(carrinho, "88000-000") for carrinho in carrinhos]
+
+    return preparar
+
+
+def _precificacao_lote(quantidade: int) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        carrinhos = _carrinhos_para_precificar(quantidade)
+        frete = TabelaFreteLocal()
+        return lambda: calcular_resumos_em_lote(carrinhos, "88000-000", frete, referencia=REFERENCIA)
+
+    return preparar
+
+
+def _mil_regras_promocionais() -> Callable[[], object]:
+    regras: List[RegraPromocao] = []
+    for indice in range(400):
+        regras.append(
+            FaixaCategoria(categoria=f"cat-{indice % 100}", minimo=1 + indice // 100, percentual=2 + indice % 20)
+        )
+        regras.append(DescontoSku(sku=f"SKU-{indice:05d}", percentual=1 + indice % 30, minimo=1 + indice % 3))
+    for indice in range(150):
+        regras.append(LeveXPagueY(sku=f"SKU-{1_000 + indice:05d}", leve=3, pague=2))
+    for indice in range(50):
+        regras.append(FaixaQuantidade(minimo=indice * 2 + 1, percentual=1 + indice % 10))
+        regras.append(FaixaValor(minimo=Decimal(indice * 100), percentual=1 + indice % 5))
+    motor = MotorPromocoes(regras)
+    carrinho = Carrinho()
+    for indice, produto in enumerate(_produtos(1_200)[::23]):
+        carrinho.adicionar(replace(produto, categoria=f"cat-{indice}"), 1 + indice % 4)
+    return lambda: motor.desconto_centavos(carrinho)
+
+
+def _registros_de_catalogo(quantidade: int) -> List[Produto]:
+    return [
+        produto_de_registro(
+            {
+                "sku": f"SKU-{indice:07d}",
+                "nome": f"Produto {indice}",
+                "preco": f"{indice % 5_000 + 1}.90",
+                "peso_kg": (indice % 50 + 1) / 10,
+                "categoria": f"categoria-{indice % 200}",
+                "ativo": indice % 10 != 0,
+            }
+        )
+        for indice in range(quantidade)
+    ]
+
+
+def _carga_catalogo(quantidade: int = 10_000) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        produtos = _registros_de_catalogo(quantidade)
+        return lambda: Catalogo(produtos)
+
+    return preparar
+
+
+def _consulta_catalogo(quantidade: int = 10_000) -> Callable[[], object]:
+    catalogo = Catalogo(_registros_de_catalogo(quantidade))
+    skus = [f"SKU-{indice:07d}" for indice in range(0, quantidade, 10)]
+
+    def operar() -> None:
+        for sku in skus:
+            catalogo.obter(sku)
+
+    return operar
+
+
+@contextmanager
+def _arquivo_colunar(quantidade: int) -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = Path(diretorio) / "catalogo.col"
+        exportar_colunar(
+            (
+                Produto(
+                    sku=f"SKU-{indice:07d}",
+                    nome=f"Produto {indice}",
+                    preco=Decimal(indice % 9_999 + 1),
+                    peso_kg=0.5,
+                    categoria=f"categoria-{indice % 100}",
+                )
+                for indice in range(quantidade)
+            ),
+            caminho,
+        )
+        yield caminho
+
+
+def _abertura_colunar(quantidade: int) -> Callable[[], ContextManager[Callable[[], object]]]:
+    @contextmanager
+    def preparar() -> Iterator[Callable[[], object]]:
+        with _arquivo_colunar(quantidade) as caminho:
+            yield lambda: CatalogoColunar(caminho).fechar()
+
+    return preparar
+
+
+@contextmanager
+def _consulta_colunar(quantidade: int = 200_000) -> Iterator[Callable[[], object]]:
+    skus = [f"SKU-{indice:07d}" for indice in range(0, quantidade, quantidade // 1_000)]
+    with _arquivo_colunar(quantidade) as caminho, CatalogoColunar(caminho) as catalogo:
+
+        def operar() -> None:
+            for sku in skus:
+                catalogo.obter(sku)
+
+        yield operar
+
+
+def _carrinhos_para_serializar(quantidade: int) -> List[Carrinho]:
+    produtos = _produtos(2_000)
+    carrinhos = []
+    for indice in range(quantidade):
+        carrinho = Carrinho(identificador=f"c{indice}")
+        for deslocamento in range(4):
+            carrinho.adicionar(produtos[(indice * 13 + deslocamento * 101) % len(produtos)], 1 + deslocamento)
+        carrinhos.append(carrinho)
+    return carrinhos
+
+
+def _exportacao_jsonl(quantidade: int = 1_000) -> Callable[[], object]:
+    carrinhos = _carrinhos_para_serializar(quantidade)
+    return lambda: exportar_carrinhos(carrinhos, io.StringIO())
+
+
+def _importacao_jsonl(quantidade: int = 1_000) -> Callable[[], object]:
+    destino = io.StringIO()
+    exportar_carrinhos(_carrinhos_para_serializar(quantidade), destino)
+    linhas = destino.getvalue().splitlines()
+    return lambda: sum(1 for _ in importar_carrinhos(linhas))
+
+
+def _replay(processos: int, pedidos: int = 500) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        produtos = _produtos(200)
+        carrinhos = []
+        for indice in range(pedidos):
+            carrinho = Carrinho(identificador=f"pedido-{indice}")
+            for deslocamento in range(5):
+                carrinho.adicionar(produtos[(indice * 7 + deslocamento * 31) % len(produtos)], 1)
+            carrinhos.append(carrinho)
+        estoque = {produto.sku: 1_000_000 for produto in produtos}
+
+        def operar() -> None:
+            for _ in ReplayPedidos(estoque, processos=processos, referencia=REFERENCIA).executar(carrinhos):
+                pass
+
+        return operar
+
+    return preparar
+
+
+def _resgate_cupom(cadastrados: int, resgates: int = 1_000) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        registro = RegistroCupons(
+            Cupom(f"CUPOM-{i:07d}", 5 + i % 20, REFERENCIA + timedelta(days=i % 365)) for i in range(cadastrados)
+        )
+        codigos = [f"CUPOM-{(i * 7_919) % cadastrados:07d}" for i in range(resgates)]
+
+        def operar() -> None:
+            for codigo in codigos:
+                registro.resgatar(codigo, REFERENCIA)
+
+        return operar
+
+    return preparar
+
+
+def _tabela_cep(faixas: int, consultas: int = 1_000) -> Callable[[], Callable[[], object]]:
+    def preparar() -> Callable[[], object]:
+        largura = 100_000_000 // faixas
+        tabela = TabelaFreteCEP(
+            {
+                "cep_inicio": f"{i * largura:08d}",
+                "cep_fim": f"{(i + 1) * largura - 1:08d}",
+                "peso_ate": str(limite),
+                "valor": f"{12 + i % 40 + limite / 2:.2f}",
+                "prazo_dias": str(2 + i % 9),
+            }
+            for i in range(faixas)
+            for limite in (1, 3, 5, 10, 20, 30)
+        )
+        gerador = random.Random(21)
+        pedidos = [(f"{gerador.randrange(100_000_000):08d}", gerador.uniform(0.1, 30)) for _ in range(consultas)]
+
+        def operar() -> None:
+            for cep, peso in pedidos:
+                tabela.cotacao("01000-000", cep, peso)
+
+        return operar
+
+    return preparar
+
+
+def _gravar_eventos(diario: DiarioCarrinhos, carrinho: Carrinho, produtos: Sequence[Produto], eventos: int) -> None:
+    for indice in range(eventos):
+        if indice % 4 == 3:
+            sku = produtos[(indice - 3) % len(produtos)].sku
+            carrinho.alterar_quantidade(sku, 1 + indice % 7)
+            diario.registrar_alteracao(carrinho, sku, 1 + indice % 7)
+        else:
+            produto = produtos[indice % len(produtos)]
+            carrinho.adicionar(produto, 1)
+            diario.registrar_adicao(carrinho, produto, 1)
+
+
+@contextmanager
+def _acrescimo_eventos(eventos: int = 200) -> Iterator[Callable[[], object]]:
+    produtos = _produtos(50)
+    with tempfile.TemporaryDirectory() as diretorio:
+        diario = DiarioCarrinhos(diretorio, eventos_por_snapshot=1 << 30)
+        carrinho = Carrinho(identificador="carrinho-grande")
+        try:
+            yield lambda: _gravar_eventos(diario, carrinho, produtos, eventos)
+        finally:
+            diario.fechar()
+
+
+def _reconstrucao_eventos(
+    eventos_por_snapshot: int, eventos: int = 5_000
+) -> Callable[[], ContextManager[Callable[[], object]]]:
+    @contextmanager
+    def preparar() -> Iterator[Callable[[], object]]:
+        with tempfile.TemporaryDirectory() as diretorio:
+            with DiarioCarrinhos(diretorio, eventos_por_snapshot=eventos_por_snapshot) as diario:
+                _gravar_eventos(diario, Carrinho(identificador="carrinho-grande"), _produtos(50), eventos)
+
+            def operar() -> None:
+                with DiarioCarrinhos(diretorio) as diario:
+                    diario.reconstruir("carrinho-grande")
+
+            yield operar
+
+    return preparar
+
+
+def _carga_vitrine() -> Callable[[], object]:
+    perfil = PerfilCarga(sessoes=300)
+    return lambda: executar_carga(perfil)
+
+
+def _cotacao_frete() -> Callable[[], object]:
+    tabela = TabelaFreteLocal()
+    pesos = [0.5 + i * 0.37 for i in range(64)]
+
+    def operar() -> None:
+        for peso in pesos:
+            tabela.cotacao("01000-000", "88000-000", peso)
+
+    return operar
+
+
+def _cotacao_frete_cache() -> Callable[[], object]:
+    cache = FreteComCache(TabelaFreteLocal(), faixa_peso=TabelaFreteLocal.chave_faixa)
+    pesos = [0.5 + i * 0.37 for i in range(64)]
+
+    def operar() -> None:
+        for peso in pesos:
+            cache.cotacao("01000-000", "88000-000", peso)
+
+    return operar
+
+
+def _validacao_cupom() -> Callable[[], object]:
+    servico = _servico([])
+    carrinho = Carrinho()
+    cupom = Cupom("BENCH10", 10, REFERENCIA + timedelta(days=30))
+    return lambda: servico.aplicar_cupom(carrinho, cupom)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    b.nome: b
+    for b in (
+        Benchmark("carrinho.mutacao", _mutacao_carrinho, iteracoes=50),
+        Benchmark("resumo.linhas_1", _resumo(1), iteracoes=2_000),
+        Benchmark("resumo.linhas_100", _resumo(100), iteracoes=200),
+        Benchmark("resumo.linhas_10000", _resumo(10_000), iteracoes=5),
+        Benchmark("resumo.memorizado", _resumo(100, resumos_em_cache=16), iteracoes=2_000),
+        Benchmark("precificacao.escalar_1000", _precificacao_escalar(1_000)),
+        Benchmark("precificacao.lote_1000", _precificacao_lote(1_000)),
+        Benchmark("promocoes.mil_regras", _mil_regras_promocionais, iteracoes=200),
+        Benchmark("estoque.memoria", _estoque(lambda: nullcontext(InMemoryEstoqueRepository()))),
+        Benchmark("estoque.contencao", _estoque(lambda: nullcontext(ConcurrentEstoqueRepository()), threads=4)),
+        Benchmark(
+            "estoque.contencao_lock_global",
+            _estoque(lambda: nullcontext(ConcurrentEstoqueRepository(listras=1)), threads=4),
+        ),
+        Benchmark("estoque.sqlite", _estoque(_estoque_sqlite)),
+        Benchmark("estoque.wal_grupo", _estoque(_estoque_wal(duravel_ao_retornar=False))),
+        Benchmark("estoque.wal_duravel", _estoque(_estoque_wal(duravel_ao_retornar=True), threads=8, operacoes=20)),
+        Benchmark("estoque.particionado_1", _estoque_particionado(1)),
+        Benchmark("estoque.particionado_2", _estoque_particionado(2)),
+        Benchmark("estoque.expiracao", _expiracao_estoque),
+        Benchmark("catalogo.carga", _carga_catalogo()),
+        Benchmark("catalogo.obter", _consulta_catalogo, iteracoes=20),
+        Benchmark("catalogo_colunar.abertura_2000", _abertura_colunar(2_000), iteracoes=50),
+        Benchmark("catalogo_colunar.abertura_200000", _abertura_colunar(200_000), iteracoes=50),
+        Benchmark("catalogo_colunar.obter", _consulta_colunar, iteracoes=20),
+        Benchmark("serializacao.exportar_1000", _exportacao_jsonl, iteracoes=5),
+        Benchmark("serializacao.importar_1000", _importacao_jsonl, iteracoes=5),
+        Benchmark("replay.processos_1", _replay(1)),
+        Benchmark("replay.processos_2", _replay(2)),
+        Benchmark("frete.cotacao", _cotacao_frete, iteracoes=200),
+        Benchmark("frete.cotacao_cache", _cotacao_frete_cache, iteracoes=200),
+        Benchmark("frete.tabela_cep_60", _tabela_cep(10), iteracoes=20),
+        Benchmark("frete.tabela_cep_30000", _tabela_cep(5_000), iteracoes=20),
+        Benchmark("cupom.validacao", _validacao_cupom, iteracoes=5_000),
+        Benchmark("cupom.resgate_1k", _resgate_cupom(1_000), iteracoes=20),
+        Benchmark("cupom.resgate_300k", _resgate_cupom(300_000), iteracoes=20),
+        Benchmark("eventos.acrescimo", _acrescimo_eventos, iteracoes=10),
+        Benchmark("eventos.reconstrucao_log", _reconstrucao_eventos(1 << 30)),
+        Benchmark("eventos.reconstrucao_snapshot", _reconstrucao_eventos(1_000)),
+        Benchmark("carga.vitrine", _carga_vitrine),
+    )
+}
+
+
+def executar_benchmark(benchmark: Benchmark, *, aquecimento: int = 3, repeticoes: int = 15) -> Dict[str, float]:
+    """Roda ``aquecimento`` rodadas descartadas e ``repeticoes`` medidas.
+
+    Cada rodada executa a operação ``benchmark.iteracoes`` vezes; o valor
+    registrado é o tempo médio por operação, em segundos.
+    """
+    if repeticoes <= 0:
+        raise ValueError("Repetições devem ser positivas")
+    preparado = benchmark.preparar()
+    if not isinstance(preparado, AbstractContextManager):
+        preparado = nullcontext(preparado)
+    iteracoes = range(benchmark.iteracoes)
+    amostras: List[float] = []
+    with preparado as operacao:
+        for rodada in range(aquecimento + repeticoes):
+            inicio = time.perf_counter()
+            for _ in iteracoes:
+                operacao()
+            duracao = (time.perf_counter() - inicio) / benchmark.iteracoes
+            if rodada >= aquecimento:
+                amostras.append(duracao)
+    return resumir_latencias(amostras)
+
+
+def executar_suite(
+    filtro: Optional[str] = None,
+    *,
+    aquecimento: int = 3,
+    repeticoes: int = 15,
+    benchmarks: Mapping[str, Benchmark] = BENCHMARKS,
+) -> Dict[str, Dict[str, float]]:
+    return {
+        nome: executar_benchmark(benchmark, aquecimento=aquecimento, repeticoes=repeticoes)
+        for nome, benchmark in benchmarks.items()
+        if filtro is None or filtro in nome
+    }
+
+
+def salvar_baseline(resultados: Mapping[str, Mapping[str, float]], caminho: str) -> None:
+    documento = {
+        "versao": VERSAO_FORMATO,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "benchmarks": {nome: dict(valores) for nome, valores in sorted(resultados.items())},
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(documento, arquivo, indent=2, sort_keys=True)
+        arquivo.write("\n")
+
+
+def carregar_baseline(caminho: str) -> Dict[str, Dict[str, float]]:
+    with open(caminho, encoding="utf-8") as arquivo:
+        documento = json.load(arquivo)
+    if documento.get("versao") != VERSAO_FORMATO:
+        raise ValueError(f"Formato de baseline não suportado: {documento.get('versao')!r}")
+    return documento["benchmarks"]
+
+
+def comparar(
+    base: Mapping[str, Mapping[str, float]],
+    atual: Mapping[str, Mapping[str, float]],
+    *,
+    tolerancia: float = 10.0,
+    metrica: str = "p50",
+) -> List[Regressao]:
+    """Benchmarks presentes nos dois lados que ficaram mais de ``tolerancia``% mais lentos."""
+    regressoes = []
+    for nome in sorted(base.keys() & atual.keys()):
+        anterior, novo = base[nome][metrica], atual[nome][metrica]
+        if novo > anterior * (1 + tolerancia / 100):
+            regressoes.append(Regressao(nome, anterior, novo))
+    return regressoes
+
+
+def formatar(resultados: Mapping[str, Mapping[str, float]]) -> str:
+    linhas = [f"{'benchmark':<36}{'p50':>12}{'p95':>12}{'p99':>12}"]
+    for nome, valores in resultados.items():
+        linhas.append(
+            f"{nome:<36}" + "".join(f"{valores[chave] * 1e6:>10.1f}us" for chave in ("p50", "p95", "p99"))
+        )
+    return "\n".join(linhas)
+
+
+def _relatar_regressoes(regressoes: Sequence[Regressao], tolerancia: float) -> int:
+    if not regressoes:
+        print(f"Nenhuma regressão acima de {tolerancia:g}%.")
+        return 0
+    for regressao in regressoes:
+        print(
+            f"REGRESSÃO {regressao.nome}: {regressao.base * 1e6:.1f}us -> "
+            f"{regressao.atual * 1e6:.1f}us (+{regressao.variacao:.1f}%)"
+        )
+    return 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do carrinho.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    executar = comandos.add_parser("executar", help="roda a suíte e imprime os percentis")
+    executar.add_argument("-k", "--filtro", help="roda só benchmarks cujo nome contém o texto")
+    executar.add_argument("--aquecimento", type=int, default=3)
+    executar.add_argument("--repeticoes", type=int, default=15)
+    executar.add_argument("--saida", help="grava os resultados como baseline JSON")
+    executar.add_argument("--comparar", metavar="BASELINE", help="falha se regredir em relação à baseline")
+    executar.add_argument("--tolerancia", type=float, default=10.0, help="regressão aceita, em %%")
+    executar.add_argument("--metrica", default="p50", choices=("media", "p50", "p95", "p99"))
+
+    comparar_ = comandos.add_parser("comparar", help="compara dois arquivos de baseline")
+    comparar_.add_argument("base")
+    comparar_.add_argument("atual")
+    comparar_.add_argument("--tolerancia", type=float, default=10.0, help="regressão aceita, em %%")
+    comparar_.add_argument("--metrica", default="p50", choices=("media", "p50", "p95", "p99"))
+
+    argumentos = parser.parse_args(argv)
+    if argumentos.comando == "comparar":
+        regressoes = comparar(
+            carregar_baseline(argumentos.base),
+            carregar_baseline(argumentos.atual),
+            tolerancia=argumentos.tolerancia,
+            metrica=argumentos.metrica,
+        )
+        return _relatar_regressoes(regressoes, argumentos.tolerancia)
+
+    resultados = executar_suite(
+        argumentos.filtro, aquecimento=argumentos.aquecimento, repeticoes=argumentos.repeticoes
+    )
+    print(formatar(resultados))
+    if argumentos.saida:
+        salvar_baseline(resultados, argumentos.saida)
+    if argumentos.comparar:
+        regressoes = comparar(
+            carregar_baseline(argumentos.comparar),
+            resultados,
+            tolerancia=argumentos.tolerancia,
+            metrica=argumentos.metrica,
+        )
+        return _relatar_regressoes(regressoes, argumentos.tolerancia)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""Gerador de tráfego de vitrine para exercitar o ``CarrinhoService``.
+
+Uso::
+
+    python -m carrinho.carga --semente 42 --sessoes 5000 --threads 4 --json carga.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .entities import Carrinho, Cupom, Produto
+from .exceptions import EstoqueInsuficienteError
+from .frete import TabelaFreteLocal
+from .metricas import resumir_latencias
+from .repositories import ConcurrentEstoqueRepository, InMemoryEstoqueRepository
+from .services import CarrinhoService
+
+REFERENCIA = date(2025, 1, 15)
+CEPS = ("01310-100", "20040-002", "30130-010", "80010-000", "88010-400", "90010-150")
+
+
+@dataclass(frozen=True, slots=True)
+class PerfilCarga:
+    """Parâmetros do tráfego; a mesma ``semente`` gera exatamente as mesmas sessões.
+
+    ``taxa_chegada`` é em sessões por segundo (chegadas de Poisson); ``0``
+    dispara as sessões sem pausa. ``tamanhos`` é a distribuição de linhas
+    por carrinho como pares (linhas, peso). A popularidade dos SKUs segue
+    Zipf com expoente ``zipf``.
+    """
+
+    semente: int = 42
+    sessoes: int = 1_000
+    taxa_chegada: float = 0.0
+    threads: int = 1
+    produtos: int = 500
+    zipf: float = 1.1
+    estoque_por_sku: int = 200
+    tamanhos: Tuple[Tuple[int, float], ...] = ((1, 0.35), (2, 0.25), (3, 0.15), (5, 0.15), (10, 0.1))
+    quantidade_maxima: int = 3
+    probabilidade_cupom: float = 0.2
+    probabilidade_alteracao: float = 0.15
+    probabilidade_abandono: float = 0.3
+    visualizacoes_resumo: int = 2
+
+
+@dataclass(frozen=True, slots=True)
+class Sessao:
+    chegada: float
+    itens: Tuple[Tuple[int, int], ...]
+    alteracao: Optional[Tuple[int, int]]
+    usa_cupom: bool
+    cep: str
+    abandona: bool
+
+
+def _amostrador_zipf(quantidade: int, expoente: float, gerador: random.Random):
+    acumulado = list(accumulate(1 / (posicao**expoente) for posicao in range(1, quantidade + 1)))
+    total = acumulado[-1]
+    return lambda: bisect_left(acumulado, gerador.random() * total)
+
+
+def planejar(perfil: PerfilCarga) -> List[Sessao]:
+    """Sorteia todas as sessões de antemão, só a partir da semente."""
+    gerador = random.Random(perfil.semente)
+    sku = _amostrador_zipf(perfil.produtos, perfil.zipf, gerador)
+    linhas = [tamanho for tamanho, _ in perfil.tamanhos]
+    pesos = [peso for _, peso in perfil.tamanhos]
+    chegada = 0.0
+    sessoes = []
+    for _ in range(perfil.sessoes):
+        if perfil.taxa_chegada > 0:
+            chegada += gerador.expovariate(perfil.taxa_chegada)
+        itens = tuple(
+            (sku(), gerador.randint(1, perfil.quantidade_maxima))
+            for _ in range(gerador.choices(linhas, pesos)[0])
+        )
+        alteracao = None
+        if gerador.random() < perfil.probabilidade_alteracao:
+            alteracao = (gerador.randrange(len(itens)), gerador.randint(1, perfil.quantidade_maxima))
+        sessoes.append(
+            Sessao(
+                chegada=chegada,
+                itens=itens,
+                alteracao=alteracao,
+                usa_cupom=gerador.random() < perfil.probabilidade_cupom,
+                cep=gerador.choice(CEPS),
+                abandona=gerador.random() < perfil.probabilidade_abandono,
+            )
+        )
+    return sessoes
+
+
+@dataclass(slots=True)
+class RelatorioCarga:
+    semente: int
+    sessoes: int = 0
+    finalizadas: int = 0
+    abandonadas: int = 0
+    vazias: int = 0
+    operacoes: int = 0
+    duracao: float = 0.0
+    falhas_estoque: Dict[str, int] = field(default_factory=dict)
+    erros: Dict[str, int] = field(default_factory=dict)
+    latencias: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def vazao(self) -> float:
+        return self.operacoes / self.duracao if self.duracao else 0.0
+
+    def para_dict(self) -> Dict[str, object]:
+        dados = asdict(self)
+        dados["vazao"] = self.vazao
+        return dados
+
+    def formatar(self) -> str:
+        linhas = [
+            f"semente {self.semente}: {self.sessoes} sessões em {self.duracao:.2f}s "
+            f"({self.vazao:,.0f} operações/s) | finalizadas {self.finalizadas} | "
+            f"abandonadas {self.abandonadas} | sem itens {self.vazias}",
+            f"falhas de estoque: {dict(sorted(self.falhas_estoque.items())) or 'nenhuma'}"
+            + (f" | outros erros: {dict(sorted(self.erros.items()))}" if self.erros else ""),
+            f"{'operação':<20}{'n':>8}{'p50':>10}{'p95':>10}{'p99':>10}",
+        ]
+        for operacao, valores in sorted(self.latencias.items()):
+            linhas.append(
+                f"{operacao:<20}{valores['n']:>8}"
+                + "".join(f"{valores[chave] * 1e6:>8.1f}us" for chave in ("p50", "p95", "p99"))
+            )
+        return "\n".join(linhas)
+
+
+# Séries medidas por sessão, não por chamada ao serviço.
+_POR_SESSAO = ("fila", "sessao")
+
+
+class _Coletor:
+    """Latências e contagens de uma thread; juntadas no relatório ao final."""
+
+    def __init__(self) -> None:
+        self.latencias: Dict[str, List[float]] = {}
+        self.falhas_estoque: Dict[str, int] = {}
+        self.erros: Dict[str, int] = {}
+        self.finalizadas = self.abandonadas = self.vazias = 0
+
+    def medir(self, operacao: str, funcao, *argumentos) -> bool:
+        inicio = time.perf_counter()
+        try:
+            funcao(*argumentos)
+        except EstoqueInsuficienteError:
+            self.falhas_estoque[operacao] = self.falhas_estoque.get(operacao, 0) + 1
+            return False
+        except Exception as erro:
+            chave = f"{operacao}:{type(erro).__name__}"
+            self.erros[chave] = self.erros.get(chave, 0) + 1
+            return False
+        finally:
+            self.latencias.setdefault(operacao, []).append(time.perf_counter() - inicio)
+        return True
+
+
+def _catalogo(perfil: PerfilCarga) -> List[Produto]:
+    gerador = random.Random(perfil.semente ^ 0x5EED)
+    return [
+        Produto(
+            sku=f"SKU-{indice:05d}",
+            nome=f"Produto {indice}",
+            preco=Decimal(gerador.randint(500, 50_000)) / 100,
+            peso_kg=round(gerador.uniform(0.1, 4.0), 2),
+            categoria=f"cat-{indice % 12}",
+        )
+        for indice in range(perfil.produtos)
+    ]
+
+
+def _executar_sessao(
+    servico: CarrinhoService, produtos: Sequence[Produto], cupom: Cupom, perfil: PerfilCarga, sessao: Sessao, coletor: _Coletor
+) -> None:
+    carrinho = Carrinho()
+    for indice, quantidade in sessao.itens:
+        coletor.medir("adicionar_item", servico.adicionar_item, carrinho, produtos[indice], quantidade)
+    if sessao.alteracao is not None:
+        posicao, quantidade = sessao.alteracao
+        sku = produtos[sessao.itens[posicao][0]].sku
+        if sku in carrinho.itens:
+            coletor.medir("alterar_quantidade", servico.alterar_quantidade, carrinho, sku, quantidade)
+    if carrinho.esta_vazio():
+        coletor.vazias += 1
+        return
+    if sessao.usa_cupom:
+        coletor.medir("aplicar_cupom", servico.aplicar_cupom, carrinho, cupom)
+    for _ in range(perfil.visualizacoes_resumo):
+        coletor.medir("calcular_resumo", servico.calcular_resumo, carrinho, sessao.cep)
+    if sessao.abandona:
+        # Abandono devolve o estoque reservado, como faria a expiração da reserva.
+        for sku in list(carrinho.itens):
+            coletor.medir("remover_item", servico.remover_item, carrinho, sku)
+        coletor.abandonadas += 1
+    elif coletor.medir("finalizar", servico.finalizar, carrinho, sessao.cep):
+        coletor.finalizadas += 1
+
+
+def executar_carga(perfil: PerfilCarga, *, servico: Optional[CarrinhoService] = None) -> RelatorioCarga:
+    """Roda o plano de ``perfil`` contra ``servico`` (por padrão, estoque em memória e ``TabelaFreteLocal``).
+
+    As latências por operação são tempo de serviço. Com ``taxa_chegada``,
+    ``fila`` é o atraso de cada sessão em relação à chegada agendada e
+    ``sessao`` vai da chegada agendada ao fim da sessão, incluindo essa
+    espera; sem ritmo, ``sessao`` conta só a própria sessão. Com ``threads=1`` as
+    contagens do relatório se repetem para a mesma semente; com mais threads
+    a ordem entre sessões concorrentes varia.
+    """
+    produtos = _catalogo(perfil)
+    if servico is None:
+        estoque = ConcurrentEstoqueRepository() if perfil.threads > 1 else InMemoryEstoqueRepository()
+        for produto in produtos:
+            estoque.registrar(produto.sku, perfil.estoque_por_sku)
+        servico = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: REFERENCIA)
+    cupom = Cupom("CARGA10", 10, REFERENCIA + timedelta(days=30))
+    sessoes = planejar(perfil)
+    coletores = [_Coletor() for _ in range(perfil.threads)]
+    proxima = iter(range(len(sessoes)))
+    trava = threading.Lock()
+    inicio = time.perf_counter()
+
+    def trabalhar(coletor: _Coletor) -> None:
+        while True:
+            with trava:
+                indice = next(proxima, None)
+            if indice is None:
+                return
+            sessao = sessoes[indice]
+            if perfil.taxa_chegada > 0:
+                agendada = inicio + sessao.chegada
+                folga = agendada - time.perf_counter()
+                if folga > 0:
+                    time.sleep(folga)
+                # Medido a partir da chegada agendada: se as threads atrasam, a fila
+                # entra na conta em vez de sumir (omissão coordenada).
+                coletor.latencias.setdefault("fila", []).append(max(0.0, time.perf_counter() - agendada))
+            else:
+                agendada = time.perf_counter()  # sem ritmo de chegada não há fila
+            _executar_sessao(servico, produtos, cupom, perfil, sessao, coletor)
+            coletor.latencias.setdefault("sessao", []).append(time.perf_counter() - agendada)
+
+    threads = [threading.Thread(target=trabalhar, args=(coletor,)) for coletor in coletores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    relatorio = RelatorioCarga(semente=perfil.semente, sessoes=len(sessoes), duracao=time.perf_counter() - inicio)
+    latencias: Dict[str, List[float]] = {}
+    for coletor in coletores:
+        relatorio.finalizadas += coletor.finalizadas
+        relatorio.abandonadas += coletor.abandonadas
+        relatorio.vazias += coletor.vazias
+        for destino, origem in ((relatorio.falhas_estoque, coletor.falhas_estoque), (relatorio.erros, coletor.erros)):
+            for chave, quantidade in origem.items():
+                destino[chave] = destino.get(chave, 0) + quantidade
+        for operacao, valores in coletor.latencias.items():
+            latencias.setdefault(operacao, []).extend(valores)
+    relatorio.operacoes = sum(len(valores) for operacao, valores in latencias.items() if operacao not in _POR_SESSAO)
+    relatorio.latencias = {operacao: resumir_latencias(valores) for operacao, valores in latencias.items()}
+    return relatorio
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    padrao = PerfilCarga()
+    parser = argparse.ArgumentParser(description="Simula tráfego de vitrine contra o CarrinhoService.")
+    parser.add_argument("--semente", type=int, default=padrao.semente)
+    parser.add_argument("--sessoes", type=int, default=padrao.sessoes)
+    parser.add_argument("--taxa", type=float, default=padrao.taxa_chegada, help="sessões/s (0 = sem pausa)")
+    parser.add_argument("--threads", type=int, default=padrao.threads)
+    parser.add_argument("--produtos", type=int, default=padrao.produtos)
+    parser.add_argument("--zipf", type=float, default=padrao.zipf)
+    parser.add_argument("--estoque", type=int, default=padrao.estoque_por_sku, help="unidades por SKU")
+    parser.add_argument("--cupom", type=float, default=padrao.probabilidade_cupom)
+    parser.add_argument("--abandono", type=float, default=padrao.probabilidade_abandono)
+    parser.add_argument("--json", help="grava o relatório em JSON para comparar execuções")
+    argumentos = parser.parse_args(argv)
+
+    perfil = PerfilCarga(
+        semente=argumentos.semente,
+        sessoes=argumentos.sessoes,
+        taxa_chegada=argumentos.taxa,
+        threads=argumentos.threads,
+        produtos=argumentos.produtos,
+        zipf=argumentos.zipf,
+        estoque_por_sku=argumentos.estoque,
+        probabilidade_cupom=argumentos.cupom,
+        probabilidade_abandono=argumentos.abandono,
+    )
+    relatorio = executar_carga(perfil)
+    print(relatorio.formatar())
+    if argumentos.json:
+        with open(argumentos.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"perfil": asdict(perfil), "relatorio": relatorio.para_dict()}, arquivo, indent=2)
+            arquivo.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import csv
+import json
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .dinheiro import Dinheiro
+from .entities import Produto
+from .exceptions import ProdutoInexistenteError
+
+_VERDADEIROS = {"1", "true", "sim", "s", "yes"}
+
+
+def _normalizar_nome(nome: str) -> str:
+    return nome.casefold()
+
+
+class Catalogo:
+    """Catálogo imutável de produtos carregado uma única vez.
+
+    Produtos ficam em um dicionário por SKU; categoria e situação (ativo)
+    têm índices secundários e ``buscar_por_prefixo`` usa uma lista ordenada
+    de nomes normalizados com bisect. Strings de categoria são internadas e
+    preços/pesos repetidos compartilham a mesma instância, o que reduz o
+    custo por produto em catálogos grandes. SKUs repetidos na carga
+    prevalecem pela última ocorrência.
+    """
+
+    def __init__(self, produtos: Iterable[Produto]) -> None:
+        precos: Dict[int, Dinheiro] = {}
+        pesos: Dict[float, float] = {}
+        por_sku: Dict[str, Produto] = {}
+        for produto in produtos:
+            preco = precos.setdefault(produto.preco.centavos, produto.preco)
+            peso = pesos.setdefault(produto.peso_kg, produto.peso_kg)
+            categoria = sys.intern(produto.categoria)
+            if preco is not produto.preco or peso is not produto.peso_kg or categoria is not produto.categoria:
+                produto = Produto(
+                    sku=produto.sku,
+                    nome=produto.nome,
+                    preco=preco,
+                    peso_kg=peso,
+                    categoria=categoria,
+                    ativo=produto.ativo,
+                )
+            por_sku[produto.sku] = produto
+        self._por_sku = por_sku
+        por_categoria: Dict[str, List[str]] = {}
+        ativos: List[str] = []
+        nomes: List[Tuple[str, str]] = []
+        for sku, produto in por_sku.items():
+            por_categoria.setdefault(produto.categoria, []).append(sku)
+            if produto.ativo:
+                ativos.append(sku)
+            nomes.append((_normalizar_nome(produto.nome), sku))
+        nomes.sort()
+        self._por_categoria: Dict[str, Tuple[str, ...]] = {
+            categoria: tuple(skus) for categoria, skus in por_categoria.items()
+        }
+        self._ativos = frozenset(ativos)
+        self._nomes = [nome for nome, _ in nomes]
+        self._skus_por_nome = [sku for _, sku in nomes]
+
+    @classmethod
+    def carregar(cls, caminho: Union[str, Path]) -> "Catalogo":
+        """Carrega um arquivo CSV (com cabeçalho) ou JSON Lines (``.jsonl``)."""
+        caminho = Path(caminho)
+        with caminho.open(encoding="utf-8", newline="") as arquivo:
+            if caminho.suffix in (".jsonl", ".ndjson"):
+                registros: Iterable[Mapping[str, object]] = (json.loads(linha) for linha in arquivo if linha.strip())
+            else:
+                registros = csv.DictReader(arquivo)
+            return cls(produto_de_registro(registro) for registro in registros)
+
+    def __len__(self) -> int:
+        return len(self._por_sku)
+
+    def __contains__(self, sku: object) -> bool:
+        return sku in self._por_sku
+
+    def __iter__(self) -> Iterator[Produto]:
+        return iter(self._por_sku.values())
+
+    def obter(self, sku: str) -> Produto:
+        produto = self._por_sku.get(sku)
+        if produto is None:
+            raise ProdutoInexistenteError(sku)
+        return produto
+
+    def buscar(self, sku: str) -> Optional[Produto]:
+        return self._por_sku.get(sku)
+
+    @property
+    def categorias(self) -> Tuple[str, ...]:
+        return tuple(self._por_categoria)
+
+    def por_categoria(self, categoria: str, *, somente_ativos: bool = False) -> List[Produto]:
+        skus = self._por_categoria.get(categoria, ())
+        if somente_ativos:
+            return [self._por_sku[sku] for sku in skus if sku in self._ativos]
+        return [self._por_sku[sku] for sku in skus]
+
+    def ativos(self) -> List[Produto]:
+        return [self._por_sku[sku] for sku in self._ativos]
+
+    def esta_ativo(self, sku: str) -> bool:
+        return sku in self._ativos
+
+    def buscar_por_prefixo(self, prefixo: str, *, limite: Optional[int] = None) -> List[Produto]:
+        """Produtos cujo nome começa com ``prefixo`` (sem diferenciar maiúsculas), em ordem de nome."""
+        chave = _normalizar_nome(prefixo)
+        inicio = bisect_left(self._nomes, chave)
+        resultado: List[Produto] = []
+        for indice in range(inicio, len(self._nomes)):
+            if not self._nomes[indice].startswith(chave) or (limite is not None and len(resultado) >= limite):
+                break
+            resultado.append(self._por_sku[self._skus_por_nome[indice]])
+        return resultado
+
+
+def produto_de_registro(registro: Mapping[str, object]) -> Produto:
+    # Ausente, nulo ou em branco (célula CSV vazia) vale como ativo, igual nos dois formatos.
+    ativo = registro.get("ativo")
+    if isinstance(ativo, str):
+        ativo = ativo.strip()
+        ativo = ativo.lower() in _VERDADEIROS if ativo else None
+    return Produto(
+        sku=str(registro["sku"]),
+        nome=str(registro["nome"]),
+        preco=Dinheiro(str(registro["preco"])),
+        peso_kg=float(registro["peso_kg"]),  # type: ignore[arg-type]
+        categoria=str(registro.get("categoria") or "geral"),
+        ativo=True if ativo is None else bool(ativo),
+    )
@@ -0,0 +1,197 @@
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .dinheiro import Dinheiro
+from .entities import Produto
+from .exceptions import ProdutoInexistenteError
+
+MAGICO = b"CARCOL01"
+VERSAO = 1
+
+# Cabeçalho: mágico, versão, produtos, categorias e o deslocamento de cada seção.
+_SECOES = (
+    "sku_offsets",
+    "sku_dados",
+    "nome_offsets",
+    "nome_dados",
+    "preco",
+    "peso",
+    "categoria",
+    "ativo",
+    "categoria_offsets",
+    "categoria_dados",
+)
+_CABECALHO = struct.Struct("<8sIII" + "Q" * len(_SECOES))
+
+
+def _alinhar(arquivo: BinaryIO) -> int:
+    posicao = arquivo.tell()
+    resto = posicao % 8
+    if resto:
+        arquivo.write(b"\0" * (8 - resto))
+        posicao += 8 - resto
+    return posicao
+
+
+def _strings(valores: Iterable[str]) -> Tuple[array, bytes]:
+    offsets = array("Q", [0])
+    dados = bytearray()
+    for valor in valores:
+        dados += valor.encode("utf-8")
+        offsets.append(len(dados))
+    return offsets, bytes(dados)
+
+
+def exportar_colunar(produtos: Iterable[Produto], caminho: Union[str, Path]) -> int:
+    """Grava os produtos no formato colunar, ordenados por SKU, e retorna quantos foram gravados."""
+    por_sku: Dict[str, Produto] = {produto.sku: produto for produto in produtos}
+    ordenados = [por_sku[sku] for sku in sorted(por_sku)]
+    categorias: Dict[str, int] = {}
+    codigos = array("I", (categorias.setdefault(p.categoria, len(categorias)) for p in ordenados))
+    if len(categorias) > 2**32 - 1:
+        raise ValueError("Categorias demais para o formato colunar")
+    colunas = {
+        "preco": array("q", (p.preco.centavos for p in ordenados)),
+        "peso": array("d", (p.peso_kg for p in ordenados)),
+        "categoria": codigos,
+        "ativo": array("B", (1 if p.ativo else 0 for p in ordenados)),
+    }
+    colunas["sku_offsets"], colunas["sku_dados"] = _strings(p.sku for p in ordenados)
+    colunas["nome_offsets"], colunas["nome_dados"] = _strings(p.nome for p in ordenados)
+    colunas["categoria_offsets"], colunas["categoria_dados"] = _strings(categorias)
+
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(b"\0" * _CABECALHO.size)
+        deslocamentos = []
+        for secao in _SECOES:
+            deslocamentos.append(_alinhar(arquivo))
+            conteudo = colunas[secao]
+            arquivo.write(conteudo if isinstance(conteudo, bytes) else conteudo.tobytes())
+        _alinhar(arquivo)
+        arquivo.seek(0)
+        arquivo.write(_CABECALHO.pack(MAGICO, VERSAO, len(ordenados), len(categorias), *deslocamentos))
+    return len(ordenados)
+
+
+class CatalogoColunar:
+    """Leitor do formato colunar via ``mmap``.
+
+    Abrir o arquivo só lê o cabeçalho; as colunas são ``memoryview`` sobre
+    páginas mapeadas somente leitura, compartilhadas entre processos que
+    abrem o mesmo arquivo. ``Produto`` é montado sob demanda a cada acesso,
+    e a busca por SKU é binária sobre a coluna de SKUs ordenados.
+    """
+
+    def __init__(self, caminho: Union[str, Path]) -> None:
+        with open(caminho, "rb") as arquivo:
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, versao, self._quantidade, quantidade_categorias, *deslocamentos = _CABECALHO.unpack_from(
+            self._mmap
+        )
+        if magico != MAGICO or versao != VERSAO:
+            self._mmap.close()
+            raise ValueError(f"Arquivo {caminho} não é um catálogo colunar compatível")
+        n = self._quantidade
+        visao = memoryview(self._mmap)
+        secoes = dict(zip(_SECOES, deslocamentos))
+
+        def coluna(nome: str, formato: str, itens: int) -> memoryview:
+            inicio = secoes[nome]
+            return visao[inicio : inicio + itens * struct.calcsize(formato)].cast(formato)
+
+        self._sku_offsets = coluna("sku_offsets", "Q", n + 1)
+        self._nome_offsets = coluna("nome_offsets", "Q", n + 1)
+        self._precos = coluna("preco", "q", n)
+        self._pesos = coluna("peso", "d", n)
+        self._categorias = coluna("categoria", "I", n)
+        self._ativos = coluna("ativo", "B", n)
+        self._sku_dados = visao[secoes["sku_dados"] :]
+        self._nome_dados = visao[secoes["nome_dados"] :]
+        categoria_offsets = coluna("categoria_offsets", "Q", quantidade_categorias + 1)
+        categoria_dados = visao[secoes["categoria_dados"] :]
+        self._nomes_categoria: List[str] = [
+            bytes(categoria_dados[categoria_offsets[i] : categoria_offsets[i + 1]]).decode("utf-8")
+            for i in range(quantidade_categorias)
+        ]
+        categoria_offsets.release()
+        categoria_dados.release()
+        self._visao = visao
+
+    def fechar(self) -> None:
+        for atributo in (
+            "_sku_offsets", "_nome_offsets", "_precos", "_pesos", "_categorias",
+            "_ativos", "_sku_dados", "_nome_dados", "_visao",
+        ):
+            getattr(self, atributo).release()
+        self._mmap.close()
+
+    def __enter__(self) -> "CatalogoColunar":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    def __len__(self) -> int:
+        return self._quantidade
+
+    def __contains__(self, sku: object) -> bool:
+        return isinstance(sku, str) and self._indice(sku) is not None
+
+    def __getitem__(self, indice: int) -> Produto:
+        if not -self._quantidade <= indice < self._quantidade:
+            raise IndexError(indice)
+        return self._produto(indice % self._quantidade)
+
+    def __iter__(self) -> Iterator[Produto]:
+        return (self._produto(indice) for indice in range(self._quantidade))
+
+    @property
+    def categorias(self) -> Tuple[str, ...]:
+        return tuple(self._nomes_categoria)
+
+    def obter(self, sku: str) -> Produto:
+        indice = self._indice(sku)
+        if indice is None:
+            raise ProdutoInexistenteError(sku)
+        return self._produto(indice)
+
+    def buscar(self, sku: str) -> Optional[Produto]:
+        indice = self._indice(sku)
+        return None if indice is None else self._produto(indice)
+
+    def por_categoria(self, categoria: str) -> List[Produto]:
+        try:
+            codigo = self._nomes_categoria.index(categoria)
+        except ValueError:
+            return []
+        return [self._produto(i) for i, valor in enumerate(self._categorias) if valor == codigo]
+
+    def _sku(self, indice: int) -> bytes:
+        return self._sku_dados[self._sku_offsets[indice] : self._sku_offsets[indice + 1]].tobytes()
+
+    def _indice(self, sku: str) -> Optional[int]:
+        alvo = sku.encode("utf-8")
+        baixo, alto = 0, self._quantidade
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._sku(meio) < alvo:
+                baixo = meio + 1
+            else:
+                alto = meio
+        if baixo < self._quantidade and self._sku(baixo) == alvo:
+            return baixo
+        return None
+
+    def _produto(self, indice: int) -> Produto:
+        nome = self._nome_dados[self._nome_offsets[indice] : self._nome_offsets[indice + 1]]
+        return Produto(
+            sku=self._sku(indice).decode("utf-8"),
+            nome=nome.tobytes().decode("utf-8"),
+            preco=Dinheiro.de_centavos(self._precos[indice]),
+            peso_kg=self._pesos[indice],
+            categoria=self._nomes_categoria[self._categorias[indice]],
+            ativo=bool(self._ativos[indice]),
+        )
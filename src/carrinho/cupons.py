@@ -0,0 +1,154 @@
+import heapq
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from .entities import Cupom
+from .exceptions import CupomEsgotadoError, CupomInexistenteError
+
+
+class _EntradaCupom:
+    __slots__ = ("cupom", "limite_global", "limite_por_cliente", "usos", "usos_por_cliente")
+
+    def __init__(self, cupom: Cupom, limite_global: Optional[int], limite_por_cliente: Optional[int]) -> None:
+        self.cupom = cupom
+        self.limite_global = limite_global
+        self.limite_por_cliente = limite_por_cliente
+        self.usos = 0
+        # Só cupons com limite por cliente pagam pelo dicionário de contadores.
+        self.usos_por_cliente: Optional[Dict[str, int]] = {} if limite_por_cliente is not None else None
+
+
+class RegistroCupons:
+    """Cadastro de cupons com busca por código, expurgo por validade e limites de uso.
+
+    A busca é um acesso a dicionário, então não depende do tamanho do
+    cadastro. Um índice por data de expiração (heap de datas + códigos de
+    cada data) permite remover de uma vez todos os cupons vencidos. Os
+    resgates usam locks listrados por código: verificar o limite global e o
+    do cliente e incrementar os contadores é atômico, e resgates de códigos
+    diferentes raramente disputam a mesma trava.
+    """
+
+    def __init__(self, cupons: Iterable[Cupom] = (), *, listras: int = 64) -> None:
+        if listras <= 0:
+            raise ValueError("Número de listras deve ser positivo")
+        self._entradas: Dict[str, _EntradaCupom] = {}
+        self._por_expiracao: Dict[date, set] = {}
+        self._datas: List[date] = []
+        self._estrutura = threading.Lock()
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(listras)]
+        for cupom in cupons:
+            self.cadastrar(cupom)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, codigo: object) -> bool:
+        return codigo in self._entradas
+
+    def cadastrar(
+        self,
+        cupom: Cupom,
+        *,
+        limite_global: Optional[int] = None,
+        limite_por_cliente: Optional[int] = None,
+    ) -> None:
+        for limite in (limite_global, limite_por_cliente):
+            if limite is not None and limite <= 0:
+                raise ValueError("Limite de uso deve ser positivo")
+        with self._estrutura:
+            anterior = self._entradas.get(cupom.codigo)
+            if anterior is not None:
+                self._desindexar(anterior.cupom)
+            self._entradas[cupom.codigo] = _EntradaCupom(cupom, limite_global, limite_por_cliente)
+            codigos = self._por_expiracao.get(cupom.expira_em)
+            if codigos is None:
+                codigos = self._por_expiracao[cupom.expira_em] = set()
+                heapq.heappush(self._datas, cupom.expira_em)
+            codigos.add(cupom.codigo)
+
+    def obter(self, codigo: str) -> Cupom:
+        entrada = self._entradas.get(codigo)
+        if entrada is None:
+            raise CupomInexistenteError(codigo)
+        return entrada.cupom
+
+    def buscar(self, codigo: str) -> Optional[Cupom]:
+        entrada = self._entradas.get(codigo)
+        return entrada.cupom if entrada is not None else None
+
+    def verificar(self, codigo: str, referencia: date, cliente: Optional[str] = None) -> Cupom:
+        """Valida cupom e limites sem consumir um uso (a garantia vem em ``resgatar``)."""
+        entrada = self._entrada(codigo)
+        entrada.cupom.validar(referencia)
+        self._exigir_disponivel(entrada, cliente)
+        return entrada.cupom
+
+    def resgatar(self, codigo: str, referencia: date, cliente: Optional[str] = None) -> Cupom:
+        entrada = self._entrada(codigo)
+        entrada.cupom.validar(referencia)
+        with self._lock_para(codigo):
+            self._exigir_disponivel(entrada, cliente)
+            entrada.usos += 1
+            if entrada.usos_por_cliente is not None and cliente is not None:
+                entrada.usos_por_cliente[cliente] = entrada.usos_por_cliente.get(cliente, 0) + 1
+        return entrada.cupom
+
+    def estornar(self, codigo: str, cliente: Optional[str] = None) -> None:
+        """Devolve um uso resgatado (por exemplo, quando o checkout falha depois do resgate)."""
+        entrada = self._entrada(codigo)
+        with self._lock_para(codigo):
+            if entrada.usos == 0:
+                raise ValueError(f"Cupom {codigo} não tem usos para estornar")
+            entrada.usos -= 1
+            if entrada.usos_por_cliente is not None and cliente is not None:
+                restantes = entrada.usos_por_cliente.get(cliente, 0) - 1
+                if restantes > 0:
+                    entrada.usos_por_cliente[cliente] = restantes
+                else:
+                    entrada.usos_por_cliente.pop(cliente, None)
+
+    def usos(self, codigo: str, cliente: Optional[str] = None) -> int:
+        entrada = self._entrada(codigo)
+        if cliente is None:
+            return entrada.usos
+        return (entrada.usos_por_cliente or {}).get(cliente, 0)
+
+    def expurgar(self, referencia: date) -> int:
+        """Remove os cupons já vencidos em ``referencia`` e devolve quantos saíram."""
+        removidos = 0
+        with self._estrutura:
+            while self._datas and self._datas[0] < referencia:
+                expira_em = heapq.heappop(self._datas)
+                for codigo in self._por_expiracao.pop(expira_em, ()):
+                    del self._entradas[codigo]
+                    removidos += 1
+        return removidos
+
+    def _entrada(self, codigo: str) -> _EntradaCupom:
+        entrada = self._entradas.get(codigo)
+        if entrada is None:
+            raise CupomInexistenteError(codigo)
+        return entrada
+
+    def _lock_para(self, codigo: str) -> threading.Lock:
+        return self._locks[hash(codigo) % len(self._locks)]
+
+    def _desindexar(self, cupom: Cupom) -> None:
+        codigos = self._por_expiracao.get(cupom.expira_em)
+        if codigos is not None:
+            codigos.discard(cupom.codigo)
+            # A data fica no heap; expurgar só encontra um conjunto vazio.
+
+    @staticmethod
+    def _exigir_disponivel(entrada: _EntradaCupom, cliente: Optional[str]) -> None:
+        codigo = entrada.cupom.codigo
+        if entrada.limite_global is not None and entrada.usos >= entrada.limite_global:
+            raise CupomEsgotadoError(codigo, entrada.limite_global)
+        if entrada.usos_por_cliente is not None:
+            assert entrada.limite_por_cliente is not None
+            if cliente is None:
+                raise ValueError(f"Cupom {codigo} tem limite por cliente e exige o cliente")
+            if entrada.usos_por_cliente.get(cliente, 0) >= entrada.limite_por_cliente:
+                raise CupomEsgotadoError(codigo, entrada.limite_por_cliente, cliente)
@@ -0,0 +1,188 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Union
+
+CENT = Decimal("0.01")
+
+ValorMonetario = Union["Dinheiro", Decimal, int, str]
+
+
+def _dividir_half_up(numerador: int, denominador: int) -> int:
+    """Divisão inteira arredondando meio para longe do zero, como ``ROUND_HALF_UP``."""
+    quociente, resto = divmod(abs(numerador), denominador)
+    if 2 * resto >= denominador:
+        quociente += 1
+    return quociente if numerador >= 0 else -quociente
+
+
+def _percentual_half_up(centavos: int, percentual: int) -> int:
+    """``centavos * percentual / 100`` arredondado half-up (valores não-negativos)."""
+    return (centavos * percentual + 50) // 100
+
+
+class Dinheiro:
+    """Valor monetário imutável armazenado em centavos inteiros.
+
+    Soma, subtração e multiplicação por inteiros ficam em aritmética inteira,
+    sem quantização. A interface pública imita ``Decimal``: compara e opera
+    com ``Decimal``/``int`` (operações mistas devolvem ``Decimal``), formata
+    como ``"12.34"`` e aceita ``quantize``. Use ``decimal`` para converter.
+    """
+
+    __slots__ = ("_centavos",)
+
+    def __init__(self, valor: ValorMonetario = 0) -> None:
+        if isinstance(valor, Dinheiro):
+            self._centavos = valor._centavos
+        elif isinstance(valor, int):
+            self._centavos = valor * 100
+        else:
+            self._centavos = int(Decimal(valor).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+    @classmethod
+    def de_centavos(cls, centavos: int) -> "Dinheiro":
+        dinheiro = object.__new__(cls)
+        dinheiro._centavos = centavos
+        return dinheiro
+
+    @classmethod
+    def de(cls, valor: ValorMonetario) -> "Dinheiro":
+        """Converte ``valor`` reaproveitando a instância se já for ``Dinheiro``."""
+        return valor if isinstance(valor, Dinheiro) else cls(valor)
+
+    @property
+    def centavos(self) -> int:
+        return self._centavos
+
+    @property
+    def decimal(self) -> Decimal:
+        return Decimal(self._centavos).scaleb(-2)
+
+    def percentual(self, percentual: Union[int, Decimal]) -> "Dinheiro":
+        """``self * percentual / 100`` arredondado half-up para centavos."""
+        if isinstance(percentual, int):
+            return Dinheiro.de_centavos(_dividir_half_up(self._centavos * percentual, 100))
+        return self.multiplicar(Decimal(percentual) / 100)
+
+    def multiplicar(self, fator: Union[int, Decimal, str]) -> "Dinheiro":
+        """Multiplica por ``fator`` arredondando half-up para centavos."""
+        if isinstance(fator, int):
+            return Dinheiro.de_centavos(self._centavos * fator)
+        return Dinheiro(self.decimal * Decimal(fator))
+
+    def quantize(self, exp: Decimal, rounding: str | None = None) -> Union["Dinheiro", Decimal]:
+        if exp == CENT:
+            return self
+        return self.decimal.quantize(exp, rounding=rounding)
+
+    def __add__(self, outro: object) -> Union["Dinheiro", Decimal]:
+        if isinstance(outro, Dinheiro):
+            return Dinheiro.de_centavos(self._centavos + outro._centavos)
+        if isinstance(outro, int):
+            return Dinheiro.de_centavos(self._centavos + outro * 100)
+        if isinstance(outro, Decimal):
+            return self.decimal + outro
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, outro: object) -> Union["Dinheiro", Decimal]:
+        if isinstance(outro, Dinheiro):
+            return Dinheiro.de_centavos(self._centavos - outro._centavos)
+        if isinstance(outro, int):
+            return Dinheiro.de_centavos(self._centavos - outro * 100)
+        if isinstance(outro, Decimal):
+            return self.decimal - outro
+        return NotImplemented
+
+    def __rsub__(self, outro: object) -> Union["Dinheiro", Decimal]:
+        if isinstance(outro, int):
+            return Dinheiro.de_centavos(outro * 100 - self._centavos)
+        if isinstance(outro, Decimal):
+            return outro - self.decimal
+        return NotImplemented
+
+    def __mul__(self, outro: object) -> Union["Dinheiro", Decimal]:
+        if isinstance(outro, int) and not isinstance(outro, bool):
+            return Dinheiro.de_centavos(self._centavos * outro)
+        if isinstance(outro, Decimal):
+            return self.decimal * outro
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, outro: object) -> Decimal:
+        if isinstance(outro, Dinheiro):
+            return self.decimal / outro.decimal
+        if isinstance(outro, (int, Decimal)):
+            return self.decimal / outro
+        return NotImplemented
+
+    def __neg__(self) -> "Dinheiro":
+        return Dinheiro.de_centavos(-self._centavos)
+
+    def __pos__(self) -> "Dinheiro":
+        return self
+
+    def __abs__(self) -> "Dinheiro":
+        return Dinheiro.de_centavos(abs(self._centavos))
+
+    def __bool__(self) -> bool:
+        return self._centavos != 0
+
+    def __int__(self) -> int:
+        return int(self.decimal)
+
+    def __float__(self) -> float:
+        return self._centavos / 100
+
+    def _comparavel(self, outro: object):
+        if isinstance(outro, Dinheiro):
+            return self._centavos, outro._centavos
+        if isinstance(outro, int):
+            return self._centavos, outro * 100
+        if isinstance(outro, (Decimal, float)):
+            return self.decimal, outro
+        return None
+
+    def __eq__(self, outro: object) -> bool:
+        pares = self._comparavel(outro)
+        return NotImplemented if pares is None else pares[0] == pares[1]
+
+    def __lt__(self, outro: object) -> bool:
+        pares = self._comparavel(outro)
+        return NotImplemented if pares is None else pares[0] < pares[1]
+
+    def __le__(self, outro: object) -> bool:
+        pares = self._comparavel(outro)
+        return NotImplemented if pares is None else pares[0] <= pares[1]
+
+    def __gt__(self, outro: object) -> bool:
+        pares = self._comparavel(outro)
+        return NotImplemented if pares is None else pares[0] > pares[1]
+
+    def __ge__(self, outro: object) -> bool:
+        pares = self._comparavel(outro)
+        return NotImplemented if pares is None else pares[0] >= pares[1]
+
+    def __hash__(self) -> int:
+        # Precisa coincidir com o hash do Decimal equivalente, já que comparam iguais.
+        if self._centavos % 100 == 0:
+            return hash(self._centavos // 100)
+        return hash(self.decimal)
+
+    def __str__(self) -> str:
+        sinal = "-" if self._centavos < 0 else ""
+        inteiro, centavos = divmod(abs(self._centavos), 100)
+        return f"{sinal}{inteiro}.{centavos:02d}"
+
+    def __repr__(self) -> str:
+        return f"Dinheiro('{self}')"
+
+    def __format__(self, especificacao: str) -> str:
+        return str(self) if not especificacao else format(self.decimal, especificacao)
+
+    def __reduce__(self):
+        return Dinheiro.de_centavos, (self._centavos,)
+
+
+ZERO = Dinheiro.de_centavos(0)
@@ -1,20 +1,16 @@
+import os
 from dataclasses import dataclass, field
 from datetime import date
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Optional
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from .dinheiro import ZERO, Dinheiro, ValorMonetario
 from .exceptions import CupomExpiradoError, CupomInvalidoError, ItemInexistenteError
 
-CENT = Decimal("0.01")
-
-def _quantizar(valor: Decimal) -> Decimal:
-    """Arredonda valores monetários para 2 casas utilizando half-up."""
-    return valor.quantize(CENT, rounding=ROUND_HALF_UP)
-
 @dataclass(frozen=True, slots=True)
 class Produto:
     sku: str
     nome: str
-    preco: Decimal
+    preco: Dinheiro
     peso_kg: float
     categoria: str = "geral"
     ativo: bool = True
@@ -22,11 +18,17 @@ class Produto:
     def __post_init__(self) -> None:
         if not self.sku:
             raise ValueError("SKU não pode ser vazio")
-        if self.preco <= 0:
+        preco = Dinheiro.de(self.preco)
+        if preco <= 0:
             raise ValueError("Preço deve ser positivo")
         if self.peso_kg <= 0:
             raise ValueError("Peso deve ser positivo")
-        object.__setattr__(self, "preco", _quantizar(Decimal(self.preco)))
+        object.__setattr__(self, "preco", preco)
+
+    @property
+    def peso_mg(self) -> int:
+        """Peso em miligramas inteiros, a unidade em que o carrinho acumula pesos."""
+        return round(self.peso_kg * 1_000_000)
 
 
 @dataclass(slots=True)
@@ -49,8 +51,8 @@ class CarrinhoItem:
         self.quantidade = quantidade
 
     @property
-    def subtotal(self) -> Decimal:
-        return _quantizar(self.produto.preco * self.quantidade)
+    def subtotal(self) -> Dinheiro:
+        return self.produto.preco * self.quantidade
 
 
 @dataclass(frozen=True, slots=True)
@@ -59,18 +61,50 @@ class Cupom:
     percentual: int
     expira_em: date
 
-    def calcular_desconto(self, valor: Decimal, referencia: date) -> Decimal:
+    def validar(self, referencia: date) -> None:
         if not 0 < self.percentual <= 100:
             raise CupomInvalidoError(f"Percentual inválido para cupom {self.codigo!r}")
         if referencia > self.expira_em:
             raise CupomExpiradoError(self.codigo, self.expira_em, referencia)
-        return _quantizar(valor * Decimal(self.percentual) / Decimal(100))
+
+    def calcular_desconto(self, valor: ValorMonetario, referencia: date) -> Dinheiro:
+        self.validar(referencia)
+        if isinstance(valor, Dinheiro):
+            return valor.percentual(self.percentual)
+        # Valores com mais de duas casas só são arredondados no resultado.
+        return Dinheiro(Decimal(valor) * self.percentual / 100)
 
 
 @dataclass(slots=True)
 class Carrinho:
+    """Carrinho com totais mantidos incrementalmente a cada mutação.
+
+    Com ``validar_totais=True`` toda leitura de total é conferida contra um
+    recálculo completo dos itens (modo de verificação usado nos testes).
+    Alterações feitas diretamente em ``itens`` ou em um ``CarrinhoItem`` não
+    passam pelos contadores; use ``sincronizar_totais`` nesses casos.
+
+    ``versao`` muda a cada mutação (itens, cupom ou limpeza) e serve de chave
+    para quem memoriza cálculos derivados do carrinho.
+
+    O peso é acumulado em miligramas inteiros, como o valor em centavos: somas
+    e subtrações de ``float`` acumulariam resíduo e poderiam cruzar o limite
+    de uma faixa de frete que um carrinho recém-montado não cruza.
+    """
+
     itens: Dict[str, CarrinhoItem] = field(default_factory=dict)
     cupom: Optional[Cupom] = None
+    # 128 bits aleatórios em hexadecimal, como uuid4().hex, sem importar uuid (e platform).
+    identificador: str = field(default_factory=lambda: os.urandom(16).hex(), compare=False)
+    validar_totais: bool = field(default=False, repr=False, compare=False)
+    _quantidade_total: int = field(default=0, init=False, repr=False, compare=False)
+    _valor_bruto_centavos: int = field(default=0, init=False, repr=False, compare=False)
+    _peso_total_mg: int = field(default=0, init=False, repr=False, compare=False)
+    _versao: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.itens:
+            self.sincronizar_totais()
 
     def adicionar(self, produto: Produto, quantidade: int) -> None:
         if quantidade <= 0:
@@ -80,6 +114,8 @@ class Carrinho:
             existente.aumentar(quantidade)
         else:
             self.itens[produto.sku] = CarrinhoItem(produto=produto, quantidade=quantidade)
+        self._acumular(produto, quantidade)
+        self._versao += 1
 
     def alterar_quantidade(self, sku: str, quantidade: int) -> None:
         if quantidade <= 0:
@@ -87,28 +123,43 @@ class Carrinho:
         item = self.itens.get(sku)
         if item is None:
             raise ItemInexistenteError(sku)
+        delta = quantidade - item.quantidade
         item.reduzir_para(quantidade)
+        self._acumular(item.produto, delta)
+        self._versao += 1
 
     def remover(self, sku: str) -> None:
         if sku not in self.itens:
             raise ItemInexistenteError(sku)
-        self.itens.pop(sku)
+        item = self.itens.pop(sku)
+        self._acumular(item.produto, -item.quantidade)
+        self._versao += 1
 
     def registrar_cupom(self, cupom: Cupom) -> None:
         self.cupom = cupom
+        self._versao += 1
+
+    @property
+    def versao(self) -> int:
+        return self._versao
 
     @property
     def quantidade_total(self) -> int:
-        return sum(item.quantidade for item in self.itens.values())
+        if self.validar_totais:
+            self.verificar_totais()
+        return self._quantidade_total
 
     @property
-    def valor_bruto(self) -> Decimal:
-        total = sum(item.subtotal for item in self.itens.values())
-        return _quantizar(total)
+    def valor_bruto(self) -> Dinheiro:
+        if self.validar_totais:
+            self.verificar_totais()
+        return Dinheiro.de_centavos(self._valor_bruto_centavos)
 
     @property
     def peso_total(self) -> float:
-        return sum(item.produto.peso_kg * item.quantidade for item in self.itens.values())
+        if self.validar_totais:
+            self.verificar_totais()
+        return self._peso_total_mg / 1_000_000
 
     def esta_vazio(self) -> bool:
         return not self.itens
@@ -116,3 +167,42 @@ class Carrinho:
     def limpar(self) -> None:
         self.itens.clear()
         self.cupom = None
+        self._zerar_totais()
+        self._versao += 1
+
+    def recalcular_totais(self) -> Tuple[int, Dinheiro, float]:
+        """Percorre todos os itens e devolve (quantidade, valor bruto, peso)."""
+        quantidade = sum(item.quantidade for item in self.itens.values())
+        valor = sum((item.subtotal for item in self.itens.values()), ZERO)
+        peso_mg = sum(item.produto.peso_mg * item.quantidade for item in self.itens.values())
+        return quantidade, valor, peso_mg / 1_000_000
+
+    def sincronizar_totais(self) -> None:
+        """Reconstrói os totais em cache a partir dos itens."""
+        self._quantidade_total, valor, peso = self.recalcular_totais()
+        self._valor_bruto_centavos = valor.centavos
+        self._peso_total_mg = round(peso * 1_000_000)
+        self._versao += 1
+
+    def verificar_totais(self) -> None:
+        quantidade, valor, peso = self.recalcular_totais()
+        if (
+            quantidade != self._quantidade_total
+            or valor.centavos != self._valor_bruto_centavos
+            or peso != self._peso_total_mg / 1_000_000
+        ):
+            raise AssertionError(
+                "Totais do carrinho divergentes: "
+                f"cache=({self._quantidade_total}, {Dinheiro.de_centavos(self._valor_bruto_centavos)}, {self._peso_total_mg / 1_000_000}) "
+                f"recalculado=({quantidade}, {valor}, {peso})"
+            )
+
+    def _acumular(self, produto: Produto, quantidade: int) -> None:
+        self._quantidade_total += quantidade
+        self._valor_bruto_centavos += produto.preco.centavos * quantidade
+        self._peso_total_mg += produto.peso_mg * quantidade
+
+    def _zerar_totais(self) -> None:
+        self._quantidade_total = 0
+        self._valor_bruto_centavos = 0
+        self._peso_total_mg = 0
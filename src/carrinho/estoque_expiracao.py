@@ -0,0 +1,259 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from .entities import Carrinho
+from .exceptions import EstoqueInsuficienteError
+from .repositories import EstoqueRepository
+
+AoExpirar = Callable[[str, Dict[str, int]], None]
+
+_logger = logging.getLogger(__name__)
+
+
+class _Reservas:
+    __slots__ = ("quantidades", "expira_em")
+
+    def __init__(self, expira_em: float) -> None:
+        self.quantidades: Dict[str, int] = {}
+        self.expira_em = expira_em
+
+
+class EstoqueComExpiracao:
+    """Decorador de ``EstoqueRepository`` que expira reservas de carrinhos abandonados.
+
+    Reservas feitas pela visão ``para(dono)`` ficam associadas ao dono (o
+    identificador do carrinho) e vencem ``ttl`` segundos após a última
+    atividade dele. Os prazos ficam em um heap com invalidação preguiçosa:
+    renovar custa O(log n) e expirar cada dono também, devolvendo suas
+    unidades com um único ``liberar_lote``. Reservas feitas direto neste
+    objeto, sem dono, nunca expiram. Um dono só libera ou confirma o que
+    ainda tem reservado; depois de expirar, ``finalizar`` falha com
+    ``EstoqueInsuficienteError``. O lock interno protege só a contabilidade
+    dos donos; as chamadas ao estoque decorado acontecem fora dele, então
+    a concorrência fica a cargo do estoque (por exemplo, locks listrados).
+    """
+
+    def __init__(
+        self,
+        estoque: EstoqueRepository,
+        *,
+        ttl: float = 1800.0,
+        relogio: Callable[[], float] = time.monotonic,
+        ao_expirar: Optional[AoExpirar] = None,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("TTL deve ser positivo")
+        self._estoque = estoque
+        self._ttl = ttl
+        self._relogio = relogio
+        self._ao_expirar = ao_expirar
+        self._donos: Dict[str, _Reservas] = {}
+        self._prazos: List[Tuple[float, int, str]] = []
+        self._sequencia = itertools.count()
+        self._lock = threading.RLock()
+        self._varredor: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def para(self, dono: str) -> "EstoqueDoDono":
+        return EstoqueDoDono(self, dono)
+
+    def para_carrinho(self, carrinho: Carrinho) -> "EstoqueDoDono":
+        """Atalho para ``CarrinhoService(..., estoque_por_carrinho=expiracao.para_carrinho)``."""
+        return EstoqueDoDono(self, carrinho.identificador)
+
+    def reservas_de(self, dono: str) -> Dict[str, int]:
+        with self._lock:
+            reservas = self._donos.get(dono)
+            return dict(reservas.quantidades) if reservas else {}
+
+    def __len__(self) -> int:
+        return len(self._donos)
+
+    # Protocolo EstoqueRepository para uso sem dono.
+    def registrar(self, sku: str, quantidade: int) -> None:
+        self._estoque.registrar(sku, quantidade)
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        self._estoque.reservar(sku, quantidade)
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        self._estoque.liberar(sku, quantidade)
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self._estoque.confirmar_reserva(sku, quantidade)
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        return self._estoque.quantidade_disponivel(sku)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.reservar_lote(itens)
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.liberar_lote(itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._estoque.confirmar_lote(itens)
+
+    def expirar(self) -> int:
+        """Devolve ao estoque as reservas vencidas e retorna quantos donos expiraram."""
+        agora = self._relogio()
+        expirados = 0
+        while True:
+            with self._lock:
+                if not self._prazos or self._prazos[0][0] > agora:
+                    break
+                prazo, _, dono = heapq.heappop(self._prazos)
+                reservas = self._donos.get(dono)
+                if reservas is None or reservas.expira_em != prazo:
+                    continue  # entrada obsoleta: o dono foi renovado ou já saiu
+                del self._donos[dono]
+            if reservas.quantidades:
+                try:
+                    self._estoque.liberar_lote(reservas.quantidades)
+                except BaseException:
+                    self._restaurar(dono, reservas)
+                    raise
+            expirados += 1
+            if self._ao_expirar is not None:
+                self._ao_expirar(dono, reservas.quantidades)
+        return expirados
+
+    def iniciar_varredor(self, intervalo: float = 1.0) -> None:
+        """Inicia uma thread daemon que chama ``expirar`` a cada ``intervalo`` segundos.
+
+        Falhas de uma varredura vão para o log e não interrompem as seguintes.
+        """
+        if self._varredor is not None:
+            raise RuntimeError("Varredor já está em execução")
+        self._parar.clear()
+        self._varredor = threading.Thread(
+            target=self._varrer, args=(intervalo,), name="varredor-reservas", daemon=True
+        )
+        self._varredor.start()
+
+    def parar_varredor(self) -> None:
+        if self._varredor is None:
+            return
+        self._parar.set()
+        self._varredor.join()
+        self._varredor = None
+
+    def _varrer(self, intervalo: float) -> None:
+        while not self._parar.wait(intervalo):
+            try:
+                self.expirar()
+            except Exception:
+                _logger.exception("Falha ao expirar reservas; nova tentativa em %.3fs", intervalo)
+
+    def _restaurar(self, dono: str, reservas: _Reservas) -> None:
+        # A liberação falhou: o dono volta com o mesmo prazo para a próxima
+        # varredura tentar de novo, somando-se ao que ele reservou nesse meio tempo.
+        with self._lock:
+            atual = self._donos.get(dono)
+            if atual is None:
+                self._donos[dono] = reservas
+                heapq.heappush(self._prazos, (reservas.expira_em, next(self._sequencia), dono))
+                return
+            for sku, quantidade in reservas.quantidades.items():
+                atual.quantidades[sku] = atual.quantidades.get(sku, 0) + quantidade
+
+    def _efetivar_do_dono(
+        self, dono: str, itens: Mapping[str, int], operacao: Callable[[Mapping[str, int]], None]
+    ) -> None:
+        # As unidades saem da conta do dono antes da chamada ao estoque, para que
+        # uma varredura concorrente não as devolva de novo, e voltam se ela falhar.
+        # O lock só protege a contabilidade: o estoque subjacente tem a sua própria.
+        with self._lock:
+            self._exigir_reservado(dono, itens)
+            self._baixar_reserva(dono, itens)
+        try:
+            operacao(itens)
+        except BaseException:
+            self._registrar_reserva(dono, itens)
+            raise
+
+    def _registrar_reserva(self, dono: str, itens: Mapping[str, int]) -> None:
+        with self._lock:
+            reservas = self._donos.get(dono)
+            if reservas is None:
+                reservas = self._donos[dono] = _Reservas(0.0)
+            for sku, quantidade in itens.items():
+                reservas.quantidades[sku] = reservas.quantidades.get(sku, 0) + quantidade
+            self._renovar(dono, reservas)
+
+    def _exigir_reservado(self, dono: str, itens: Mapping[str, int]) -> None:
+        # Um dono expirado não pode consumir unidades reservadas por outros carrinhos.
+        reservas = self._donos.get(dono)
+        for sku, quantidade in itens.items():
+            if reservas is None or reservas.quantidades.get(sku, 0) < quantidade:
+                raise EstoqueInsuficienteError(sku, quantidade, 0)
+
+    def _baixar_reserva(self, dono: str, itens: Mapping[str, int]) -> None:
+        with self._lock:
+            reservas = self._donos.get(dono)
+            if reservas is None:
+                return
+            for sku, quantidade in itens.items():
+                restante = reservas.quantidades.get(sku, 0) - quantidade
+                if restante > 0:
+                    reservas.quantidades[sku] = restante
+                else:
+                    reservas.quantidades.pop(sku, None)
+            if reservas.quantidades:
+                self._renovar(dono, reservas)
+            else:
+                del self._donos[dono]
+
+    def _renovar(self, dono: str, reservas: _Reservas) -> None:
+        reservas.expira_em = self._relogio() + self._ttl
+        heapq.heappush(self._prazos, (reservas.expira_em, next(self._sequencia), dono))
+        # Entradas obsoletas se acumulam a cada renovação; compacta quando dominam o heap.
+        if len(self._prazos) > 2 * len(self._donos) + 1024:
+            self._prazos = [
+                (r.expira_em, next(self._sequencia), d) for d, r in self._donos.items()
+            ]
+            heapq.heapify(self._prazos)
+
+
+class EstoqueDoDono:
+    """Visão de ``EstoqueComExpiracao`` que atribui as reservas a um dono."""
+
+    __slots__ = ("_expiracao", "_dono")
+
+    def __init__(self, expiracao: EstoqueComExpiracao, dono: str) -> None:
+        self._expiracao = expiracao
+        self._dono = dono
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        self._expiracao.registrar(sku, quantidade)
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        self.reservar_lote({sku: quantidade})
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        self.liberar_lote({sku: quantidade})
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self.confirmar_lote({sku: quantidade})
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        return self._expiracao.quantidade_disponivel(sku)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        estoque = self._expiracao._estoque
+        estoque.reservar_lote(itens)
+        try:
+            self._expiracao._registrar_reserva(self._dono, itens)
+        except BaseException:
+            estoque.liberar_lote(itens)
+            raise
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._expiracao._efetivar_do_dono(self._dono, itens, self._expiracao._estoque.liberar_lote)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._expiracao._efetivar_do_dono(self._dono, itens, self._expiracao._estoque.confirmar_lote)
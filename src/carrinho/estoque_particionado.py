@@ -0,0 +1,439 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+from bisect import bisect_right
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .repositories import ConcurrentEstoqueRepository, _EstoqueItem, _Travas, _validar_lote
+
+_Pedido = Tuple[str, tuple]
+
+
+def _hash64(texto: str) -> int:
+    # Estável entre processos e execuções, ao contrário de hash().
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class AnelConsistente:
+    """Anel de hashing consistente com ``vnodes`` pontos virtuais por nó.
+
+    Incluir um nó move para ele só as chaves que caem nos seus arcos (em
+    média 1/N do total); as demais continuam onde estavam.
+    """
+
+    def __init__(self, nos: Iterable[int] = (), *, vnodes: int = 128) -> None:
+        if vnodes <= 0:
+            raise ValueError("vnodes deve ser positivo")
+        self._vnodes = vnodes
+        self._nos: List[int] = []
+        self._pontos: List[int] = []
+        self._donos: List[int] = []
+        for no in nos:
+            self.adicionar(no)
+
+    @property
+    def nos(self) -> Tuple[int, ...]:
+        return tuple(self._nos)
+
+    @property
+    def vnodes(self) -> int:
+        return self._vnodes
+
+    def adicionar(self, no: int) -> None:
+        if no in self._nos:
+            raise ValueError(f"Nó {no} já está no anel")
+        self._nos.append(no)
+        pares = sorted(
+            list(zip(self._pontos, self._donos)) + [(_hash64(f"no-{no}#{v}"), no) for v in range(self._vnodes)]
+        )
+        self._pontos = [ponto for ponto, _ in pares]
+        self._donos = [dono for _, dono in pares]
+
+    def no_de(self, chave: str) -> int:
+        if not self._pontos:
+            raise LookupError("Anel vazio")
+        posicao = bisect_right(self._pontos, _hash64(chave))
+        return self._donos[posicao % len(self._pontos)]
+
+
+class _EstoqueDoShard(ConcurrentEstoqueRepository):
+    """Estoque mantido por um processo dono de shard, com as operações de apoio do coordenador."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._preparados: Dict[int, Tuple[str, Dict[str, int]]] = {}
+        self._tokens = itertools.count(1)
+
+    def preparar(self, operacao: str, itens: Mapping[str, int]) -> int:
+        """Retira as unidades de ``reservado`` e as retém para ``efetivar`` ou ``abortar``.
+
+        Enquanto retidas, nenhum outro cliente consegue liberá-las ou confirmá-las.
+        """
+        if operacao not in ("liberar_lote", "confirmar_lote"):
+            raise ValueError(f"Operação não preparável: {operacao}")
+        with _Travas(self._locks_para(itens)):
+            self._exigir_reservado(itens)
+            for sku, quantidade in itens.items():
+                self._itens[sku].reservado -= quantidade
+        token = next(self._tokens)
+        self._preparados[token] = (operacao, dict(itens))
+        return token
+
+    def efetivar(self, token: int) -> None:
+        operacao, itens = self._preparados.pop(token)
+        if operacao == "liberar_lote":
+            with _Travas(self._locks_para(itens)):
+                for sku, quantidade in itens.items():
+                    self._itens[sku].disponivel += quantidade
+
+    def abortar(self, token: int) -> None:
+        _, itens = self._preparados.pop(token)
+        with _Travas(self._locks_para(itens)):
+            for sku, quantidade in itens.items():
+                self._itens[sku].reservado += quantidade
+
+    def extrair(self, nos: Sequence[int], vnodes: int, proprio: int) -> Dict[str, Tuple[int, int]]:
+        """Remove e devolve os SKUs que, no anel ``nos``, não pertencem mais a este shard."""
+        anel = AnelConsistente(nos, vnodes=vnodes)
+        with _Travas(self._locks):
+            saindo = [sku for sku in self._itens if anel.no_de(sku) != proprio]
+            return {sku: (item.disponivel, item.reservado) for sku, item in ((s, self._itens.pop(s)) for s in saindo)}
+
+    def importar(self, estado: Mapping[str, Tuple[int, int]]) -> None:
+        with _Travas(self._locks):
+            for sku, (disponivel, reservado) in estado.items():
+                self._itens[sku] = _EstoqueItem(disponivel=disponivel, reservado=reservado)
+
+
+_OPERACOES = frozenset(
+    {
+        "registrar",
+        "reservar",
+        "liberar",
+        "confirmar_reserva",
+        "quantidade_disponivel",
+        "reservar_lote",
+        "liberar_lote",
+        "confirmar_lote",
+        "preparar",
+        "efetivar",
+        "abortar",
+        "snapshot",
+        "extrair",
+        "importar",
+    }
+)
+
+
+def _atender(conexao: Connection, estoque: _EstoqueDoShard) -> None:
+    # Cada mensagem é um lote de pedidos; a resposta traz (ok, valor ou erro) por pedido.
+    try:
+        while True:
+            respostas: List[Tuple[bool, Any]] = []
+            for operacao, argumentos in conexao.recv():
+                try:
+                    if operacao not in _OPERACOES:
+                        raise ValueError(f"Operação desconhecida: {operacao}")
+                    respostas.append((True, getattr(estoque, operacao)(*argumentos)))
+                except Exception as erro:
+                    respostas.append((False, erro))
+            conexao.send(respostas)
+    except (EOFError, OSError):
+        pass
+    finally:
+        conexao.close()
+
+
+def _dono_do_shard(controle: Connection, authkey: bytes) -> None:
+    estoque = _EstoqueDoShard()
+    ouvinte = Listener(authkey=authkey)
+    controle.send(ouvinte.address)
+
+    def aceitar() -> None:
+        while True:
+            try:
+                conexao = ouvinte.accept()
+            except OSError:
+                return
+            threading.Thread(target=_atender, args=(conexao, estoque), daemon=True).start()
+
+    threading.Thread(target=aceitar, daemon=True).start()
+    try:
+        controle.recv()  # qualquer mensagem (ou o fim do pipe) encerra o shard
+    except EOFError:
+        pass
+    ouvinte.close()
+
+
+class _Shard:
+    __slots__ = ("endereco", "conexao", "pid", "lock")
+
+    def __init__(self, endereco: Any) -> None:
+        self.endereco = endereco
+        self.conexao: Optional[Connection] = None
+        self.pid = 0
+        self.lock = threading.Lock()
+
+
+class EstoqueParticionado:
+    """``EstoqueRepository`` particionado por SKU entre processos donos de shard.
+
+    Cada shard é um processo com um ``ConcurrentEstoqueRepository`` próprio,
+    atendendo conexões de ``multiprocessing.connection`` (uma thread por
+    cliente). Os SKUs são distribuídos por hashing consistente. O objeto pode
+    ser enviado (pickle) a outros processos: a cópia se conecta aos mesmos
+    shards, e só quem os criou pode encerrá-los.
+
+    Operações em lote mandam uma única mensagem por shard envolvido, todas
+    antes de esperar as respostas. Um lote que cruza shards continua
+    tudo-ou-nada: reservas são desfeitas nos shards que aceitaram se outro
+    recusar, e liberações/confirmações usam duas fases. Na primeira cada
+    shard retém as unidades reservadas, longe de outros clientes; só quando
+    todos retiveram a operação é efetivada, senão as retenções são
+    devolvidas. Se o coordenador morrer entre as fases, as unidades retidas
+    ficam presas no shard até ele ser reiniciado.
+    """
+
+    def __init__(self, shards: int = 2, *, vnodes: int = 128, contexto: Optional[Any] = None) -> None:
+        if shards <= 0:
+            raise ValueError("Número de shards deve ser positivo")
+        self._contexto = contexto or multiprocessing.get_context()
+        self._authkey = os.urandom(32)
+        self._anel = AnelConsistente(vnodes=vnodes)
+        self._shards: Dict[int, _Shard] = {}
+        self._processos: Dict[int, Tuple[Any, Connection]] = {}
+        self._cache: Dict[str, int] = {}
+        for no in range(shards):
+            self._iniciar_shard(no)
+
+    def __getstate__(self) -> dict:
+        return {
+            "authkey": self._authkey,
+            "nos": self._anel.nos,
+            "vnodes": self._anel.vnodes,
+            "enderecos": {no: shard.endereco for no, shard in self._shards.items()},
+        }
+
+    def __setstate__(self, estado: dict) -> None:
+        self._authkey = estado["authkey"]
+        self._anel = AnelConsistente(estado["nos"], vnodes=estado["vnodes"])
+        self._shards = {no: _Shard(endereco) for no, endereco in estado["enderecos"].items()}
+        self._processos = {}
+        self._cache = {}
+
+    @property
+    def shards(self) -> Tuple[int, ...]:
+        return self._anel.nos
+
+    def shard_de(self, sku: str) -> int:
+        no = self._cache.get(sku)
+        if no is None:
+            no = self._cache[sku] = self._anel.no_de(sku)
+        return no
+
+    # --- EstoqueRepository -----------------------------------------------------------
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        self._um(sku, "registrar", (sku, quantidade))
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        self._um(sku, "reservar", (sku, quantidade))
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        self._um(sku, "liberar", (sku, quantidade))
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self._um(sku, "confirmar_reserva", (sku, quantidade))
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        return self._um(sku, "quantidade_disponivel", (sku,))
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        _validar_lote(itens)
+        partes = self._particionar(itens)
+        if len(partes) == 1:
+            ((no, parte),) = partes.items()
+            self._um_no(no, "reservar_lote", (parte,))
+            return
+        resultados = self._difundir({no: [("reservar_lote", (parte,))] for no, parte in partes.items()})
+        falhas = [(no, resposta[0][1]) for no, resposta in resultados.items() if not resposta[0][0]]
+        if falhas:
+            aceitos = {no: [("liberar_lote", (partes[no],))] for no, resposta in resultados.items() if resposta[0][0]}
+            raise self._desfazer(aceitos, self._primeira_falha(itens, falhas))
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._verificar_e_aplicar("liberar_lote", itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._verificar_e_aplicar("confirmar_lote", itens)
+
+    def executar_lote(self, pedidos: Sequence[Tuple[str, str, int]]) -> List[Optional[BaseException]]:
+        """Executa (operação, SKU, quantidade) agrupando por shard em uma mensagem cada.
+
+        Cada pedido é independente: devolve ``None`` ou o erro de cada um, na ordem.
+        """
+        por_no: Dict[int, List[int]] = {}
+        for indice, (_, sku, _) in enumerate(pedidos):
+            por_no.setdefault(self.shard_de(sku), []).append(indice)
+        resultados = self._difundir(
+            {no: [(pedidos[i][0], (pedidos[i][1], pedidos[i][2])) for i in indices] for no, indices in por_no.items()}
+        )
+        erros: List[Optional[BaseException]] = [None] * len(pedidos)
+        for no, indices in por_no.items():
+            for indice, (ok, valor) in zip(indices, resultados[no]):
+                if not ok:
+                    erros[indice] = valor
+        return erros
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        estado: Dict[str, Dict[str, int]] = {}
+        for resposta in self._difundir({no: [("snapshot", ())] for no in self._shards}).values():
+            estado.update(self._valor(resposta[0]))
+        return estado
+
+    # --- shards ----------------------------------------------------------------------
+
+    def adicionar_shard(self) -> int:
+        """Inclui um shard e move para ele as chaves que passam a pertencer a ele.
+
+        Deve ser chamado sem operações em andamento; cópias deste objeto em
+        outros processos precisam ser reenviadas para conhecer o shard novo.
+        """
+        if not self._processos:
+            raise RuntimeError("Só o processo que criou os shards pode adicionar outros")
+        antigos = [no for no in self._anel.nos]
+        no = max(antigos) + 1
+        self._iniciar_shard(no)
+        self._cache.clear()
+        nos = self._anel.nos
+        extraidos = self._difundir({antigo: [("extrair", (nos, self._anel.vnodes, antigo))] for antigo in antigos})
+        movidos: Dict[str, Tuple[int, int]] = {}
+        for resposta in extraidos.values():
+            movidos.update(self._valor(resposta[0]))
+        if movidos:
+            self._um_no(no, "importar", (movidos,))
+        return no
+
+    def fechar(self) -> None:
+        for shard in self._shards.values():
+            if shard.conexao is not None and shard.pid == os.getpid():
+                shard.conexao.close()
+                shard.conexao = None
+        for processo, controle in self._processos.values():
+            try:
+                controle.send(None)
+            except OSError:
+                pass
+            processo.join(timeout=5)
+            if processo.is_alive():
+                processo.terminate()
+            controle.close()
+        self._processos.clear()
+
+    def __enter__(self) -> "EstoqueParticionado":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    # --- internos --------------------------------------------------------------------
+
+    def _iniciar_shard(self, no: int) -> None:
+        controle, remoto = self._contexto.Pipe()
+        processo = self._contexto.Process(
+            target=_dono_do_shard, args=(remoto, self._authkey), name=f"estoque-shard-{no}", daemon=True
+        )
+        processo.start()
+        remoto.close()
+        self._shards[no] = _Shard(controle.recv())
+        self._processos[no] = (processo, controle)
+        self._anel.adicionar(no)
+
+    def _conexao(self, shard: _Shard) -> Connection:
+        # Conexões não são compartilhadas entre processos: cada pid abre a sua.
+        if shard.conexao is None or shard.pid != os.getpid():
+            shard.conexao = Client(shard.endereco, authkey=self._authkey)
+            shard.pid = os.getpid()
+        return shard.conexao
+
+    def _um(self, sku: str, operacao: str, argumentos: tuple) -> Any:
+        return self._um_no(self.shard_de(sku), operacao, argumentos)
+
+    def _um_no(self, no: int, operacao: str, argumentos: tuple) -> Any:
+        shard = self._shards[no]
+        with shard.lock:
+            conexao = self._conexao(shard)
+            conexao.send([(operacao, argumentos)])
+            (resposta,) = conexao.recv()
+        return self._valor(resposta)
+
+    def _difundir(self, pedidos: Mapping[int, List[_Pedido]]) -> Dict[int, List[Tuple[bool, Any]]]:
+        """Envia um lote a cada shard e só então coleta as respostas (em paralelo entre shards)."""
+        nos = sorted(pedidos)
+        shards = [self._shards[no] for no in nos]
+        with _Travas([shard.lock for shard in shards]):
+            conexoes = [self._conexao(shard) for shard in shards]
+            for no, conexao in zip(nos, conexoes):
+                conexao.send(pedidos[no])
+            return {no: conexao.recv() for no, conexao in zip(nos, conexoes)}
+
+    def _particionar(self, itens: Mapping[str, int]) -> Dict[int, Dict[str, int]]:
+        partes: Dict[int, Dict[str, int]] = {}
+        for sku, quantidade in itens.items():
+            partes.setdefault(self.shard_de(sku), {})[sku] = quantidade
+        return partes
+
+    def _verificar_e_aplicar(self, operacao: str, itens: Mapping[str, int]) -> None:
+        _validar_lote(itens)
+        partes = self._particionar(itens)
+        if len(partes) == 1:
+            ((no, parte),) = partes.items()
+            self._um_no(no, operacao, (parte,))
+            return
+        resultados = self._difundir({no: [("preparar", (operacao, parte))] for no, parte in partes.items()})
+        retidos = {no: resposta[0][1] for no, resposta in resultados.items() if resposta[0][0]}
+        falhas = [(no, resposta[0][1]) for no, resposta in resultados.items() if not resposta[0][0]]
+        if falhas:
+            abortos = {no: [("abortar", (token,))] for no, token in retidos.items()}
+            raise self._desfazer(abortos, self._primeira_falha(itens, falhas))
+        for resposta in self._difundir({no: [("efetivar", (token,))] for no, token in retidos.items()}).values():
+            self._valor(resposta[0])
+
+    def _desfazer(self, pedidos: Mapping[int, List[_Pedido]], erro: BaseException) -> BaseException:
+        """Desfaz o lote nos shards que o aceitaram e devolve ``erro`` para ser levantado.
+
+        Se algum shard não conseguir desfazer, o erro dele fica encadeado em
+        ``erro`` (``__context__``) com uma nota dizendo quais shards ficaram
+        com unidades reservadas ou retidas.
+        """
+        if not pedidos:
+            return erro
+        try:
+            resultados = self._difundir(pedidos)
+        except (EOFError, OSError) as falha:
+            resultados = {no: [(False, falha)] for no in pedidos}
+        falhas = [(no, valor) for no, respostas in sorted(resultados.items()) for ok, valor in respostas if not ok]
+        if falhas:
+            shards = ", ".join(str(no) for no, _ in falhas)
+            erro.add_note(f"Falha ao desfazer o lote nos shards {shards}; as unidades podem ter ficado presas")
+            erro.__context__ = falhas[0][1]
+        return erro
+
+    def _primeira_falha(self, itens: Mapping[str, int], falhas: List[Tuple[int, BaseException]]) -> BaseException:
+        # Mesmo erro que um repositório único daria: o do primeiro SKU do lote que falhou.
+        por_no = dict(falhas)
+        for sku in itens:
+            erro = por_no.get(self.shard_de(sku))
+            if erro is not None and getattr(erro, "sku", sku) == sku:
+                return erro
+        return falhas[0][1]
+
+    @staticmethod
+    def _valor(resposta: Tuple[bool, Any]) -> Any:
+        ok, valor = resposta
+        if not ok:
+            raise valor
+        return valor
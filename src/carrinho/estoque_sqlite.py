@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, Mapping, Tuple
+
+from .exceptions import EstoqueInsuficienteError
+from .repositories import _validar_lote
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estoque (
+    sku TEXT PRIMARY KEY,
+    disponivel INTEGER NOT NULL CHECK (disponivel >= 0),
+    reservado INTEGER NOT NULL DEFAULT 0 CHECK (reservado >= 0)
+) WITHOUT ROWID
+"""
+
+_RESERVAR = (
+    "UPDATE estoque SET disponivel = disponivel - ?1, reservado = reservado + ?1 "
+    "WHERE sku = ?2 AND disponivel >= ?1"
+)
+_LIBERAR = (
+    "UPDATE estoque SET disponivel = disponivel + ?1, reservado = reservado - ?1 "
+    "WHERE sku = ?2 AND reservado >= ?1"
+)
+_CONFIRMAR = "UPDATE estoque SET reservado = reservado - ?1 WHERE sku = ?2 AND reservado >= ?1"
+
+
+class SQLiteEstoqueRepository:
+    """Repositório de estoque persistente em SQLite (modo WAL).
+
+    Cada reserva, liberação ou confirmação é um único ``UPDATE`` condicional,
+    atômico por construção; operações em lote rodam em uma transação e são
+    desfeitas inteiras se algum SKU falhar.
+    """
+
+    def __init__(self, caminho: str = ":memory:", *, sincronizacao: str = "NORMAL") -> None:
+        self._conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        if caminho != ":memory:":
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(f"PRAGMA synchronous={sincronizacao}")
+        self._conexao.execute(_ESQUEMA)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+    def __enter__(self) -> "SQLiteEstoqueRepository":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        if quantidade < 0:
+            raise ValueError("Quantidade de registro deve ser não-negativa")
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO estoque (sku, disponivel, reservado) VALUES (?, ?, 0)",
+                (sku, quantidade),
+            )
+
+    def registrar_em_massa(self, itens: Iterable[Tuple[str, int]], *, tamanho_lote: int = 50_000) -> int:
+        """Carrega (SKU, quantidade) em transações de ``tamanho_lote`` linhas via ``executemany``."""
+        total = 0
+        lote = []
+        for sku, quantidade in itens:
+            if quantidade < 0:
+                raise ValueError("Quantidade de registro deve ser não-negativa")
+            lote.append((sku, quantidade))
+            if len(lote) >= tamanho_lote:
+                total += self._inserir(lote)
+                lote = []
+        if lote:
+            total += self._inserir(lote)
+        return total
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser positiva")
+        with self._lock:
+            if self._conexao.execute(_RESERVAR, (quantidade, sku)).rowcount == 0:
+                raise EstoqueInsuficienteError(sku, quantidade, self._disponivel(sku))
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser positiva")
+        with self._lock:
+            if self._conexao.execute(_LIBERAR, (quantidade, sku)).rowcount == 0:
+                raise EstoqueInsuficienteError(sku, quantidade, 0)
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        with self._lock:
+            if self._conexao.execute(_CONFIRMAR, (quantidade, sku)).rowcount == 0:
+                raise EstoqueInsuficienteError(sku, quantidade, 0)
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        with self._lock:
+            return self._disponivel(sku)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar_lote(_RESERVAR, itens, informar_disponivel=True)
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar_lote(_LIBERAR, itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar_lote(_CONFIRMAR, itens)
+
+    def iterar_snapshot(self, *, tamanho_lote: int = 10_000) -> Iterator[Tuple[str, int, int]]:
+        """Percorre (SKU, disponível, reservado) em ordem de SKU sem materializar tudo."""
+        # Paginação por chave: cada página é uma consulta curta, sem cursor aberto entre elas.
+        consulta = "SELECT sku, disponivel, reservado FROM estoque ORDER BY sku LIMIT ?"
+        parametros: tuple = (tamanho_lote,)
+        while True:
+            with self._lock:
+                linhas = self._conexao.execute(consulta, parametros).fetchall()
+            yield from linhas
+            if len(linhas) < tamanho_lote:
+                return
+            consulta = "SELECT sku, disponivel, reservado FROM estoque WHERE sku > ? ORDER BY sku LIMIT ?"
+            parametros = (linhas[-1][0], tamanho_lote)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {
+            sku: {"disponivel": disponivel, "reservado": reservado}
+            for sku, disponivel, reservado in self.iterar_snapshot()
+        }
+
+    def _inserir(self, lote: list) -> int:
+        with self._lock:
+            self._conexao.execute("BEGIN")
+            try:
+                self._conexao.executemany(
+                    "INSERT OR REPLACE INTO estoque (sku, disponivel, reservado) VALUES (?, ?, 0)",
+                    lote,
+                )
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+        return len(lote)
+
+    def _disponivel(self, sku: str) -> int:
+        linha = self._conexao.execute("SELECT disponivel FROM estoque WHERE sku = ?", (sku,)).fetchone()
+        return 0 if linha is None else linha[0]
+
+    def _executar_lote(self, comando: str, itens: Mapping[str, int], *, informar_disponivel: bool = False) -> None:
+        _validar_lote(itens)
+        parametros = [(quantidade, sku) for sku, quantidade in itens.items()]
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for quantidade, sku in parametros:
+                    if self._conexao.execute(comando, (quantidade, sku)).rowcount == 0:
+                        disponivel = self._disponivel(sku) if informar_disponivel else 0
+                        raise EstoqueInsuficienteError(sku, quantidade, disponivel)
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
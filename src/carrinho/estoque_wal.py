@@ -0,0 +1,397 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .repositories import InMemoryEstoqueRepository, _EstoqueItem
+
+MAGICO_SNAPSHOT = b"CARWAL01"
+
+_REGISTRAR, _RESERVAR, _LIBERAR, _CONFIRMAR = 1, 2, 3, 4
+
+# O log é uma sequência de grupos, um por escrita: crc32 e tamanho do corpo,
+# seguidos dos registros. Cada registro traz operação e número de itens, e
+# cada item, quantidade, tamanho do SKU e o SKU em UTF-8. O CRC por grupo
+# casa com a unidade de fsync: um grupo incompleto nunca foi confirmado.
+_GRUPO = struct.Struct("<II")
+_REGISTRO = struct.Struct("<BH")
+_ITEM = struct.Struct("<qH")
+_UNITARIO = struct.Struct("<BHqH")
+_CABECALHO_SNAPSHOT = struct.Struct("<8sQQ")
+_ITEM_SNAPSHOT = struct.Struct("<qqH")
+_MAX_ITENS_POR_REGISTRO = 0xFFFF
+_MAX_BYTES_SKU = 0xFFFF
+
+_Itens = Sequence[Tuple[str, int]]
+
+
+@dataclass(frozen=True, slots=True)
+class Recuperacao:
+    geracao_snapshot: int
+    itens_snapshot: int
+    registros_reaplicados: int
+    bytes_descartados: int
+
+
+def _sku_codificado(sku: str) -> bytes:
+    codificado = sku.encode("utf-8")
+    if len(codificado) > _MAX_BYTES_SKU:
+        raise ValueError(f"SKU com mais de {_MAX_BYTES_SKU} bytes não cabe no log: {sku[:32]}...")
+    return codificado
+
+
+def _codificar(operacao: int, itens: _Itens) -> bytes:
+    """Registros de uma operação, ou ``ValueError`` se algum item não couber no formato.
+
+    Lotes com mais de 65535 itens viram vários registros consecutivos; como
+    entram no mesmo grupo, a recuperação os reaplica juntos ou não reaplica.
+    """
+    try:
+        if len(itens) == 1:
+            sku, quantidade = itens[0]
+            codificado = _sku_codificado(sku)
+            return _UNITARIO.pack(operacao, 1, quantidade, len(codificado)) + codificado
+        corpo = bytearray()
+        for inicio in range(0, len(itens), _MAX_ITENS_POR_REGISTRO):
+            parte = itens[inicio : inicio + _MAX_ITENS_POR_REGISTRO]
+            corpo += _REGISTRO.pack(operacao, len(parte))
+            for sku, quantidade in parte:
+                codificado = _sku_codificado(sku)
+                corpo += _ITEM.pack(quantidade, len(codificado))
+                corpo += codificado
+        return bytes(corpo)
+    except struct.error as erro:
+        raise ValueError(f"Quantidade fora do intervalo do log em {itens[:3]!r}") from erro
+
+
+def _ler_grupos(dados: bytes) -> Iterator[Tuple[int, List[Tuple[str, int]], int]]:
+    """Percorre os registros dos grupos íntegros devolvendo (operação, itens, fim do grupo).
+
+    Para no primeiro grupo truncado ou com CRC divergente.
+    """
+    posicao = 0
+    while posicao + _GRUPO.size <= len(dados):
+        crc, tamanho = _GRUPO.unpack_from(dados, posicao)
+        inicio = posicao + _GRUPO.size
+        fim = inicio + tamanho
+        if fim > len(dados) or zlib.crc32(dados[inicio:fim]) != crc:
+            return
+        while inicio < fim:
+            operacao, quantidade_itens = _REGISTRO.unpack_from(dados, inicio)
+            inicio += _REGISTRO.size
+            itens = []
+            for _ in range(quantidade_itens):
+                quantidade, tamanho_sku = _ITEM.unpack_from(dados, inicio)
+                inicio += _ITEM.size
+                itens.append((dados[inicio : inicio + tamanho_sku].decode("utf-8"), quantidade))
+                inicio += tamanho_sku
+            yield operacao, itens, fim
+        posicao = fim
+
+
+def _fsync_diretorio(diretorio: Path) -> None:
+    if os.name != "posix":
+        return
+    descritor = os.open(diretorio, os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+class EstoqueDuravel(InMemoryEstoqueRepository):
+    """Estoque em memória com write-ahead log e snapshots para sobreviver a quedas.
+
+    Toda operação aceita é aplicada em memória e anexada, na mesma seção
+    crítica, a um buffer do log. Com ``duravel_ao_retornar=True`` a chamada
+    só retorna depois que o registro passou por ``fsync``: a primeira thread
+    que chega grava e sincroniza de uma vez tudo que estiver no buffer
+    (group commit), e as demais esperam por ela. Com ``False`` o buffer é
+    gravado quando passa de ``bytes_por_grupo`` e, por uma thread de fundo,
+    a cada ``intervalo_fsync`` segundos: a janela de perda fica limitada a
+    esse intervalo mesmo sem novas escritas; ``sincronizar`` força a gravação.
+
+    Se uma escrita ou ``fsync`` do log falhar, o estoque para de aceitar
+    operações (``RuntimeError``), pois a memória pode conter registros que
+    não chegaram ao disco; reabra o diretório para recuperar o estado durável.
+
+    A cada ``registros_por_snapshot`` registros o estado é compactado em um
+    snapshot e o log recomeça em uma nova geração. A recuperação lê o último
+    snapshot, reaplica os logs a partir da geração dele e descarta uma cauda
+    truncada ou corrompida no último log.
+    """
+
+    def __init__(
+        self,
+        diretorio: Union[str, Path],
+        *,
+        duravel_ao_retornar: bool = True,
+        intervalo_fsync: float = 0.005,
+        bytes_por_grupo: int = 1 << 20,
+        registros_por_snapshot: int = 200_000,
+    ) -> None:
+        super().__init__()
+        if intervalo_fsync <= 0:
+            raise ValueError("Intervalo de fsync deve ser positivo")
+        self._diretorio = Path(diretorio)
+        self._diretorio.mkdir(parents=True, exist_ok=True)
+        self._duravel_ao_retornar = duravel_ao_retornar
+        self._intervalo_fsync = intervalo_fsync
+        self._bytes_por_grupo = bytes_por_grupo
+        self._registros_por_snapshot = registros_por_snapshot
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._compactacao = threading.Lock()
+        self._buffer = bytearray()
+        self._sequencia = 0
+        self._duravel = 0
+        self._gravando = False
+        self._ultimo_fsync = time.monotonic()
+        self._registros_no_log = 0
+        self.recuperacao = self._recuperar()
+        self._arquivo = open(self._caminho_log(self._geracao), "ab", buffering=0)
+        self._fechado = False
+        self._falha: Optional[BaseException] = None
+        self._parar = threading.Event()
+        self._descarregador: Optional[threading.Thread] = None
+        if not duravel_ao_retornar:
+            self._descarregador = threading.Thread(
+                target=self._descarregar_periodicamente, name="wal-estoque", daemon=True
+            )
+            self._descarregador.start()
+
+    # --- operações -----------------------------------------------------------------
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        self._executar(_REGISTRAR, ((sku, quantidade),), super().registrar, sku, quantidade)
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        self._executar(_RESERVAR, ((sku, quantidade),), super().reservar, sku, quantidade)
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        self._executar(_LIBERAR, ((sku, quantidade),), super().liberar, sku, quantidade)
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self._executar(_CONFIRMAR, ((sku, quantidade),), super().confirmar_reserva, sku, quantidade)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar(_RESERVAR, tuple(itens.items()), super().reservar_lote, itens)
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar(_LIBERAR, tuple(itens.items()), super().liberar_lote, itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._executar(_CONFIRMAR, tuple(itens.items()), super().confirmar_lote, itens)
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        with self._lock:
+            return super().quantidade_disponivel(sku)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return super().snapshot()
+
+    # --- durabilidade --------------------------------------------------------------
+
+    def sincronizar(self) -> None:
+        """Grava e sincroniza tudo que já foi aceito."""
+        with self._cond:
+            self._aguardar(self._sequencia)
+
+    def compactar(self) -> None:
+        """Grava um snapshot do estado atual e inicia uma nova geração do log."""
+        with self._compactacao:
+            self._compactar()
+
+    def _compactar(self) -> None:
+        # Chamado com self._compactacao adquirido.
+        with self._cond:
+            self._aguardar(self._sequencia)
+            estado = [(sku, item.disponivel, item.reservado) for sku, item in self._itens.items()]
+            anterior = self._arquivo
+            self._geracao += 1
+            self._arquivo = open(self._caminho_log(self._geracao), "ab", buffering=0)
+            self._registros_no_log = 0
+        anterior.close()
+        # Até o snapshot novo existir, a recuperação usa o antigo e todos os logs.
+        self._gravar_snapshot(self._geracao, estado)
+        for caminho, geracao in self._logs():
+            if geracao < self._geracao:
+                caminho.unlink()
+
+    def fechar(self) -> None:
+        self._parar.set()
+        if self._descarregador is not None:
+            self._descarregador.join()
+        with self._lock:
+            if self._fechado:
+                return
+            try:
+                if self._falha is None:
+                    self._aguardar(self._sequencia)
+            finally:
+                self._fechado = True
+                self._arquivo.close()
+
+    def __enter__(self) -> "EstoqueDuravel":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    def _executar(self, operacao: int, itens: _Itens, aplicar: Callable[..., None], *argumentos: object) -> None:
+        with self._lock:
+            if self._fechado:
+                raise ValueError("Estoque já foi fechado")
+            self._exigir_log_integro()
+            # Codifica antes de aplicar: um item que não cabe no formato falha
+            # sem deixar a memória à frente do log.
+            registro = _codificar(operacao, itens)
+            aplicar(*argumentos)
+            self._buffer += registro
+            self._sequencia += 1
+            self._registros_no_log += 1
+            if self._duravel_ao_retornar:
+                self._aguardar(self._sequencia)
+            elif (
+                len(self._buffer) >= self._bytes_por_grupo
+                or time.monotonic() - self._ultimo_fsync >= self._intervalo_fsync
+            ) and not self._gravando:
+                self._gravar_grupo()
+            compactar = self._registros_no_log >= self._registros_por_snapshot
+        if compactar and self._compactacao.acquire(blocking=False):
+            try:
+                self._compactar()
+            finally:
+                self._compactacao.release()
+
+    def _aguardar(self, sequencia: int) -> None:
+        # Chamado com self._cond adquirido.
+        while self._duravel < sequencia:
+            self._exigir_log_integro()
+            if self._gravando:
+                self._cond.wait()
+            else:
+                self._gravar_grupo()
+
+    def _gravar_grupo(self) -> None:
+        # Chamado com self._cond adquirido; solta o lock durante a escrita para
+        # que outras threads continuem acumulando o próximo grupo.
+        self._gravando = True
+        dados, alvo, arquivo = bytes(self._buffer), self._sequencia, self._arquivo
+        self._buffer.clear()
+        self._cond.release()
+        falha = None
+        try:
+            arquivo.write(_GRUPO.pack(zlib.crc32(dados), len(dados)) + dados)
+            os.fsync(arquivo.fileno())
+        except BaseException as erro:
+            falha = erro
+        self._cond.acquire()
+        self._gravando = False
+        self._cond.notify_all()
+        if falha is not None:
+            # Não há como saber o que chegou ao disco: ninguém mais é confirmado.
+            self._falha = falha
+            self._exigir_log_integro()
+        self._duravel = alvo
+        self._ultimo_fsync = time.monotonic()
+
+    def _exigir_log_integro(self) -> None:
+        if self._falha is not None:
+            raise RuntimeError("Falha ao gravar o log do estoque; reabra o diretório para recuperar") from self._falha
+
+    def _descarregar_periodicamente(self) -> None:
+        while not self._parar.wait(self._intervalo_fsync):
+            with self._cond:
+                if self._fechado or self._falha is not None:
+                    return
+                if self._buffer and not self._gravando:
+                    try:
+                        self._gravar_grupo()
+                    except RuntimeError:
+                        return  # a falha fica registrada e sobe na próxima operação
+
+    # --- arquivos e recuperação ----------------------------------------------------
+
+    def _caminho_log(self, geracao: int) -> Path:
+        return self._diretorio / f"estoque-{geracao:010d}.wal"
+
+    def _logs(self) -> List[Tuple[Path, int]]:
+        logs = [(caminho, int(caminho.stem.split("-")[1])) for caminho in self._diretorio.glob("estoque-*.wal")]
+        return sorted(logs, key=lambda par: par[1])
+
+    def _gravar_snapshot(self, geracao: int, estado: Sequence[Tuple[str, int, int]]) -> None:
+        corpo = bytearray(_CABECALHO_SNAPSHOT.pack(MAGICO_SNAPSHOT, geracao, len(estado)))
+        for sku, disponivel, reservado in estado:
+            codificado = sku.encode("utf-8")
+            corpo += _ITEM_SNAPSHOT.pack(disponivel, reservado, len(codificado))
+            corpo += codificado
+        corpo += struct.pack("<I", zlib.crc32(corpo))
+        temporario = self._diretorio / "estoque.snap.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(corpo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self._diretorio / "estoque.snap")
+        _fsync_diretorio(self._diretorio)
+
+    def _ler_snapshot(self) -> Tuple[int, int]:
+        caminho = self._diretorio / "estoque.snap"
+        if not caminho.exists():
+            return 0, 0
+        dados = caminho.read_bytes()
+        if len(dados) < _CABECALHO_SNAPSHOT.size + 4 or zlib.crc32(dados[:-4]) != struct.unpack("<I", dados[-4:])[0]:
+            raise ValueError(f"Snapshot corrompido: {caminho}")
+        magico, geracao, quantidade = _CABECALHO_SNAPSHOT.unpack_from(dados)
+        if magico != MAGICO_SNAPSHOT:
+            raise ValueError(f"Arquivo não é um snapshot de estoque: {caminho}")
+        posicao = _CABECALHO_SNAPSHOT.size
+        for _ in range(quantidade):
+            disponivel, reservado, tamanho = _ITEM_SNAPSHOT.unpack_from(dados, posicao)
+            posicao += _ITEM_SNAPSHOT.size
+            sku = dados[posicao : posicao + tamanho].decode("utf-8")
+            posicao += tamanho
+            self._itens[sku] = _EstoqueItem(disponivel=disponivel, reservado=reservado)
+        return geracao, quantidade
+
+    def _recuperar(self) -> Recuperacao:
+        geracao_snapshot, itens_snapshot = self._ler_snapshot()
+        logs = [(caminho, geracao) for caminho, geracao in self._logs() if geracao >= geracao_snapshot]
+        for caminho, geracao in self._logs():
+            if geracao < geracao_snapshot:
+                caminho.unlink()  # sobra de uma compactação interrompida antes da limpeza
+        aplicar = {
+            _REGISTRAR: (InMemoryEstoqueRepository.registrar, None),
+            _RESERVAR: (InMemoryEstoqueRepository.reservar, InMemoryEstoqueRepository.reservar_lote),
+            _LIBERAR: (InMemoryEstoqueRepository.liberar, InMemoryEstoqueRepository.liberar_lote),
+            _CONFIRMAR: (
+                InMemoryEstoqueRepository.confirmar_reserva,
+                InMemoryEstoqueRepository.confirmar_lote,
+            ),
+        }
+        reaplicados = descartados = 0
+        for indice, (caminho, _) in enumerate(logs):
+            dados = caminho.read_bytes()
+            fim = 0
+            for operacao, itens, fim in _ler_grupos(dados):
+                individual, lote = aplicar[operacao]
+                if lote is None or len(itens) == 1:
+                    for sku, quantidade in itens:
+                        individual(self, sku, quantidade)
+                else:
+                    lote(self, dict(itens))
+                reaplicados += 1
+            if fim < len(dados):
+                if indice != len(logs) - 1:
+                    raise ValueError(f"Log corrompido antes do fim: {caminho}")
+                # Cauda de uma escrita interrompida: nunca foi confirmada ao chamador.
+                descartados = len(dados) - fim
+                os.truncate(caminho, fim)
+        self._geracao = max([geracao_snapshot, 1] + [geracao for _, geracao in logs])
+        self._registros_no_log = reaplicados
+        return Recuperacao(geracao_snapshot, itens_snapshot, reaplicados, descartados)
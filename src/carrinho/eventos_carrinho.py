@@ -0,0 +1,359 @@
+import hashlib
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+from .dinheiro import Dinheiro
+from .entities import Carrinho, Cupom, Produto
+
+MAGICO_LOG = b"CARLOG01"
+MAGICO_SNAPSHOT = b"CAREVT01"
+
+_PRODUTO, _ADICIONAR, _ALTERAR, _REMOVER, _CUPOM, _LIMPAR = 1, 2, 3, 4, 5, 6
+
+# Eventos (little-endian, primeiro byte é o tipo). Os produtos de um carrinho
+# são gravados uma vez e referenciados pela posição na ordem de gravação, então
+# adicionar/alterar custam 9 bytes e remover, 5.
+_EV_PRODUTO = struct.Struct("<BqdBHHH")
+_EV_QUANTIDADE = struct.Struct("<BIi")
+_EV_REMOVER = struct.Struct("<BI")
+_EV_CUPOM = struct.Struct("<BHIB")
+_EV_LIMPAR = struct.Struct("<B")
+_CABECALHO = struct.Struct("<8sQ")
+_CONTAGEM = struct.Struct("<I")
+_ITEM_SNAPSHOT = struct.Struct("<Ii")
+
+_NOME_SEGURO = re.compile(r"[A-Za-z0-9_.-]{1,100}")
+
+
+def _codificar_produto(produto: Produto) -> bytes:
+    sku, nome, categoria = (texto.encode("utf-8") for texto in (produto.sku, produto.nome, produto.categoria))
+    return (
+        _EV_PRODUTO.pack(
+            _PRODUTO, produto.preco.centavos, produto.peso_kg, produto.ativo, len(sku), len(nome), len(categoria)
+        )
+        + sku
+        + nome
+        + categoria
+    )
+
+
+def _codificar_cupom(cupom: Cupom) -> bytes:
+    codigo = cupom.codigo.encode("utf-8")
+    return _EV_CUPOM.pack(_CUPOM, cupom.percentual, cupom.expira_em.toordinal(), len(codigo)) + codigo
+
+
+def _ler_produto(dados: bytes, posicao: int) -> Tuple[Produto, int]:
+    _, centavos, peso, ativo, tam_sku, tam_nome, tam_categoria = _EV_PRODUTO.unpack_from(dados, posicao)
+    posicao += _EV_PRODUTO.size
+    fim = posicao + tam_sku + tam_nome + tam_categoria
+    if fim > len(dados):
+        raise struct.error("produto truncado")
+    texto = dados[posicao:fim]
+    produto = Produto(
+        sku=texto[:tam_sku].decode("utf-8"),
+        nome=texto[tam_sku : tam_sku + tam_nome].decode("utf-8"),
+        preco=Dinheiro.de_centavos(centavos),
+        peso_kg=peso,
+        categoria=texto[tam_sku + tam_nome :].decode("utf-8"),
+        ativo=bool(ativo),
+    )
+    return produto, fim
+
+
+def _ler_cupom(dados: bytes, posicao: int) -> Tuple[Cupom, int]:
+    _, percentual, ordinal, tamanho = _EV_CUPOM.unpack_from(dados, posicao)
+    posicao += _EV_CUPOM.size
+    if posicao + tamanho > len(dados):
+        raise struct.error("cupom truncado")
+    codigo = dados[posicao : posicao + tamanho].decode("utf-8")
+    return Cupom(codigo=codigo, percentual=percentual, expira_em=date.fromordinal(ordinal)), posicao + tamanho
+
+
+class _Fluxo:
+    """Estado de escrita de um carrinho: log aberto, tabela de produtos e contagem desde o snapshot."""
+
+    __slots__ = ("arquivo", "geracao", "produtos", "indices", "eventos")
+
+    def __init__(self, arquivo: BinaryIO, geracao: int, produtos: List[Produto], eventos: int) -> None:
+        self.arquivo = arquivo
+        self.geracao = geracao
+        self.produtos = produtos
+        self.indices: Dict[str, int] = {produto.sku: indice for indice, produto in enumerate(produtos)}
+        self.eventos = eventos
+
+
+class DiarioCarrinhos:
+    """Persistência de carrinhos por eventos binários com snapshots periódicos.
+
+    Cada carrinho tem um log só de acréscimo (``<id>.log``) e, depois do
+    primeiro snapshot, um ``<id>.snap``. Registrar uma mutação grava alguns
+    bytes no fim do log; a cada ``eventos_por_snapshot`` eventos o estado
+    inteiro vai para o snapshot e o log recomeça. ``reconstruir`` carrega o
+    snapshot e reaplica o log.
+
+    O snapshot e o log levam uma geração: um log de geração anterior à do
+    snapshot (queda entre gravar o snapshot e reiniciar o log) já está contido
+    nele e é descartado. Um evento incompleto no fim do log é cortado.
+
+    No máximo ``fluxos_abertos`` logs ficam abertos (LRU); o de um carrinho
+    também é fechado depois de ``registrar_limpeza``. Um carrinho que já
+    tinha itens quando o diário passou a acompanhá-lo ganha um snapshot do
+    estado atual na primeira mutação que o log sozinho não explicaria.
+    """
+
+    def __init__(
+        self, diretorio: Union[str, Path], *, eventos_por_snapshot: int = 1_000, fluxos_abertos: int = 128
+    ) -> None:
+        if eventos_por_snapshot <= 0:
+            raise ValueError("eventos_por_snapshot deve ser positivo")
+        if fluxos_abertos <= 0:
+            raise ValueError("fluxos_abertos deve ser positivo")
+        self._diretorio = Path(diretorio)
+        self._diretorio.mkdir(parents=True, exist_ok=True)
+        self._eventos_por_snapshot = eventos_por_snapshot
+        self._fluxos_abertos = fluxos_abertos
+        self._fluxos: "OrderedDict[str, _Fluxo]" = OrderedDict()
+
+    # --- registro --------------------------------------------------------------------
+
+    def registrar_adicao(self, carrinho: Carrinho, produto: Produto, quantidade: int) -> None:
+        fluxo = self._fluxo(carrinho.identificador)
+        if _sem_historico(fluxo) and any(sku != produto.sku for sku in carrinho.itens):
+            self.salvar_snapshot(carrinho)
+            return
+        indice = fluxo.indices.get(produto.sku)
+        prefixo = b""
+        if indice is None or fluxo.produtos[indice] != produto:
+            # SKU novo neste carrinho (ou com dados alterados): grava o produto antes.
+            indice = len(fluxo.produtos)
+            fluxo.produtos.append(produto)
+            fluxo.indices[produto.sku] = indice
+            prefixo = _codificar_produto(produto)
+        self._anexar(carrinho, fluxo, prefixo + _EV_QUANTIDADE.pack(_ADICIONAR, indice, quantidade))
+
+    def registrar_alteracao(self, carrinho: Carrinho, sku: str, quantidade: int) -> None:
+        fluxo = self._fluxo(carrinho.identificador)
+        indice = fluxo.indices.get(sku)
+        if indice is None:
+            # Item anterior ao diário: o estado atual já inclui a alteração.
+            self.salvar_snapshot(carrinho)
+            return
+        self._anexar(carrinho, fluxo, _EV_QUANTIDADE.pack(_ALTERAR, indice, quantidade))
+
+    def registrar_remocao(self, carrinho: Carrinho, sku: str) -> None:
+        fluxo = self._fluxo(carrinho.identificador)
+        indice = fluxo.indices.get(sku)
+        if indice is None:
+            self.salvar_snapshot(carrinho)
+            return
+        self._anexar(carrinho, fluxo, _EV_REMOVER.pack(_REMOVER, indice))
+
+    def registrar_cupom(self, carrinho: Carrinho, cupom: Cupom) -> None:
+        fluxo = self._fluxo(carrinho.identificador)
+        if _sem_historico(fluxo) and carrinho.itens:
+            self.salvar_snapshot(carrinho)
+            return
+        self._anexar(carrinho, fluxo, _codificar_cupom(cupom))
+
+    def registrar_limpeza(self, carrinho: Carrinho) -> None:
+        """Registra o carrinho esvaziado e fecha o log dele, que dificilmente volta a ser usado."""
+        self._anexar(carrinho, self._fluxo(carrinho.identificador), _EV_LIMPAR.pack(_LIMPAR))
+        self._fechar_fluxo(carrinho.identificador)
+
+    def salvar_snapshot(self, carrinho: Carrinho) -> None:
+        """Grava o estado atual de ``carrinho`` e reinicia o log dele."""
+        fluxo = self._fluxo(carrinho.identificador)
+        produtos: List[Produto] = []
+        indices: Dict[str, int] = {}
+        itens = bytearray()
+        for sku, item in carrinho.itens.items():
+            indices[sku] = len(produtos)
+            produtos.append(item.produto)
+            itens += _ITEM_SNAPSHOT.pack(indices[sku], item.quantidade)
+        corpo = bytearray(_CABECALHO.pack(MAGICO_SNAPSHOT, fluxo.geracao + 1))
+        corpo += _CONTAGEM.pack(len(produtos))
+        for produto in produtos:
+            corpo += _codificar_produto(produto)
+        corpo += _CONTAGEM.pack(len(carrinho.itens)) + itens
+        corpo += _codificar_cupom(carrinho.cupom) if carrinho.cupom is not None else _EV_LIMPAR.pack(0)
+        corpo += _CONTAGEM.pack(zlib.crc32(corpo))
+        _gravar_atomico(self._caminho(carrinho.identificador, ".snap"), bytes(corpo))
+
+        fluxo.arquivo.close()
+        fluxo.geracao += 1
+        fluxo.arquivo = self._reiniciar_log(carrinho.identificador, fluxo.geracao)
+        fluxo.produtos, fluxo.indices, fluxo.eventos = produtos, indices, 0
+
+    # --- leitura ---------------------------------------------------------------------
+
+    def reconstruir(self, identificador: str) -> Carrinho:
+        carrinho, _, _, _ = self._carregar(identificador)
+        return carrinho
+
+    def eventos_pendentes(self, identificador: str) -> int:
+        """Eventos no log desde o último snapshot."""
+        fluxo = self._fluxos.get(identificador)
+        if fluxo is not None:
+            return fluxo.eventos
+        return self._carregar(identificador)[3]
+
+    def existe(self, identificador: str) -> bool:
+        return (
+            self._caminho(identificador, ".log").exists() or self._caminho(identificador, ".snap").exists()
+        )
+
+    def fechar(self) -> None:
+        for fluxo in self._fluxos.values():
+            fluxo.arquivo.close()
+        self._fluxos.clear()
+
+    def __enter__(self) -> "DiarioCarrinhos":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    # --- internos --------------------------------------------------------------------
+
+    def _anexar(self, carrinho: Carrinho, fluxo: _Fluxo, evento: bytes) -> None:
+        fluxo.arquivo.write(evento)
+        fluxo.eventos += 1
+        if fluxo.eventos >= self._eventos_por_snapshot:
+            self.salvar_snapshot(carrinho)
+
+    def _fluxo(self, identificador: str) -> _Fluxo:
+        fluxo = self._fluxos.get(identificador)
+        if fluxo is not None:
+            self._fluxos.move_to_end(identificador)
+            return fluxo
+        _, geracao, produtos, eventos = self._carregar(identificador)
+        caminho = self._caminho(identificador, ".log")
+        if not caminho.exists():
+            arquivo = self._reiniciar_log(identificador, geracao)
+        else:
+            arquivo = open(caminho, "ab", buffering=0)
+        fluxo = self._fluxos[identificador] = _Fluxo(arquivo, geracao, produtos, eventos)
+        while len(self._fluxos) > self._fluxos_abertos:
+            _, antigo = self._fluxos.popitem(last=False)
+            antigo.arquivo.close()  # o estado volta do disco se o carrinho reaparecer
+        return fluxo
+
+    def _fechar_fluxo(self, identificador: str) -> None:
+        fluxo = self._fluxos.pop(identificador, None)
+        if fluxo is not None:
+            fluxo.arquivo.close()
+
+    def _carregar(self, identificador: str) -> Tuple[Carrinho, int, List[Produto], int]:
+        """Devolve (carrinho, geração, tabela de produtos do log, eventos no log)."""
+        carrinho = Carrinho(identificador=identificador)
+        geracao, produtos = self._ler_snapshot(identificador, carrinho)
+        caminho = self._caminho(identificador, ".log")
+        if not caminho.exists():
+            return carrinho, geracao, produtos, 0
+        dados = caminho.read_bytes()
+        if len(dados) < _CABECALHO.size:
+            caminho.unlink()
+            return carrinho, geracao, produtos, 0
+        magico, geracao_log = _CABECALHO.unpack_from(dados)
+        if magico != MAGICO_LOG:
+            raise ValueError(f"Arquivo não é um log de carrinho: {caminho}")
+        if geracao_log < geracao:
+            caminho.unlink()  # já contido no snapshot
+            return carrinho, geracao, produtos, 0
+        eventos, fim = self._reaplicar(dados, _CABECALHO.size, carrinho, produtos)
+        if fim < len(dados):
+            os.truncate(caminho, fim)
+        return carrinho, geracao, produtos, eventos
+
+    def _ler_snapshot(self, identificador: str, carrinho: Carrinho) -> Tuple[int, List[Produto]]:
+        caminho = self._caminho(identificador, ".snap")
+        if not caminho.exists():
+            return 0, []
+        dados = caminho.read_bytes()
+        if zlib.crc32(dados[:-4]) != _CONTAGEM.unpack_from(dados, len(dados) - 4)[0]:
+            raise ValueError(f"Snapshot de carrinho corrompido: {caminho}")
+        magico, geracao = _CABECALHO.unpack_from(dados)
+        if magico != MAGICO_SNAPSHOT:
+            raise ValueError(f"Arquivo não é um snapshot de carrinho: {caminho}")
+        posicao = _CABECALHO.size
+        (quantidade,) = _CONTAGEM.unpack_from(dados, posicao)
+        posicao += _CONTAGEM.size
+        produtos = []
+        for _ in range(quantidade):
+            produto, posicao = _ler_produto(dados, posicao)
+            produtos.append(produto)
+        (quantidade,) = _CONTAGEM.unpack_from(dados, posicao)
+        posicao += _CONTAGEM.size
+        for _ in range(quantidade):
+            indice, unidades = _ITEM_SNAPSHOT.unpack_from(dados, posicao)
+            posicao += _ITEM_SNAPSHOT.size
+            carrinho.adicionar(produtos[indice], unidades)
+        if dados[posicao] == _CUPOM:
+            cupom, posicao = _ler_cupom(dados, posicao)
+            carrinho.registrar_cupom(cupom)
+        return geracao, produtos
+
+    @staticmethod
+    def _reaplicar(dados: bytes, posicao: int, carrinho: Carrinho, produtos: List[Produto]) -> Tuple[int, int]:
+        eventos = 0
+        tamanho = len(dados)
+        try:
+            while posicao < tamanho:
+                tipo = dados[posicao]
+                if tipo == _ADICIONAR or tipo == _ALTERAR:
+                    _, indice, quantidade = _EV_QUANTIDADE.unpack_from(dados, posicao)
+                    fim = posicao + _EV_QUANTIDADE.size
+                    if tipo == _ADICIONAR:
+                        carrinho.adicionar(produtos[indice], quantidade)
+                    else:
+                        carrinho.alterar_quantidade(produtos[indice].sku, quantidade)
+                elif tipo == _REMOVER:
+                    _, indice = _EV_REMOVER.unpack_from(dados, posicao)
+                    fim = posicao + _EV_REMOVER.size
+                    carrinho.remover(produtos[indice].sku)
+                elif tipo == _PRODUTO:
+                    produto, fim = _ler_produto(dados, posicao)
+                    produtos.append(produto)
+                    # O produto sempre vem colado ao evento que o usa; conta como um só.
+                    eventos -= 1
+                elif tipo == _CUPOM:
+                    cupom, fim = _ler_cupom(dados, posicao)
+                    carrinho.registrar_cupom(cupom)
+                elif tipo == _LIMPAR:
+                    fim = posicao + _EV_LIMPAR.size
+                    carrinho.limpar()
+                else:
+                    raise ValueError(f"Evento de carrinho desconhecido: {tipo}")
+                posicao = fim
+                eventos += 1
+        except struct.error:
+            pass  # evento incompleto no fim: a escrita foi interrompida
+        return eventos, posicao
+
+    def _reiniciar_log(self, identificador: str, geracao: int) -> BinaryIO:
+        caminho = self._caminho(identificador, ".log")
+        _gravar_atomico(caminho, _CABECALHO.pack(MAGICO_LOG, geracao))
+        return open(caminho, "ab", buffering=0)
+
+    def _caminho(self, identificador: str, sufixo: str) -> Path:
+        if _NOME_SEGURO.fullmatch(identificador) is None:
+            identificador = hashlib.sha1(identificador.encode("utf-8")).hexdigest()
+        return self._diretorio / f"{identificador}{sufixo}"
+
+
+def _sem_historico(fluxo: _Fluxo) -> bool:
+    """Nada deste carrinho foi gravado ainda: para o diário, ele está vazio."""
+    return fluxo.geracao == 0 and fluxo.eventos == 0 and not fluxo.produtos
+
+
+def _gravar_atomico(caminho: Path, dados: bytes) -> None:
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
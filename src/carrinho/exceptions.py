@@ -10,12 +10,28 @@ class EstoqueInsuficienteError(RuntimeError):
         self.solicitado = solicitado
         self.disponivel = disponivel
 
+    # Os __reduce__ permitem que os erros atravessem processos (pickle) com os mesmos campos.
+    def __reduce__(self):
+        return type(self), (self.sku, self.solicitado, self.disponivel)
+
 
 class ItemInexistenteError(LookupError):
     def __init__(self, sku: str) -> None:
         super().__init__(f"Item com SKU {sku} não está presente no carrinho.")
         self.sku = sku
 
+    def __reduce__(self):
+        return type(self), (self.sku,)
+
+
+class ProdutoInexistenteError(LookupError):
+    def __init__(self, sku: str) -> None:
+        super().__init__(f"Produto com SKU {sku} não existe no catálogo.")
+        self.sku = sku
+
+    def __reduce__(self):
+        return type(self), (self.sku,)
+
 
 class CupomExpiradoError(ValueError):
     def __init__(self, codigo: str, expira_em: date, referencia: date) -> None:
@@ -27,11 +43,38 @@ class CupomExpiradoError(ValueError):
         self.expira_em = expira_em
         self.referencia = referencia
 
+    def __reduce__(self):
+        return type(self), (self.codigo, self.expira_em, self.referencia)
+
 class CupomInvalidoError(ValueError):
     def __init__(self, mensagem: str) -> None:
         super().__init__(mensagem)
 
+class CupomInexistenteError(LookupError):
+    def __init__(self, codigo: str) -> None:
+        super().__init__(f"Cupom {codigo} não está cadastrado.")
+        self.codigo = codigo
+
+    def __reduce__(self):
+        return type(self), (self.codigo,)
+
+
+class CupomEsgotadoError(ValueError):
+    def __init__(self, codigo: str, limite: int, cliente: str | None = None) -> None:
+        alvo = f" para o cliente {cliente}" if cliente is not None else ""
+        super().__init__(f"Cupom {codigo} atingiu o limite de {limite} uso(s){alvo}.")
+        self.codigo = codigo
+        self.limite = limite
+        self.cliente = cliente
+
+    def __reduce__(self):
+        return type(self), (self.codigo, self.limite, self.cliente)
+
+
 class FreteIndisponivelError(RuntimeError):
     def __init__(self, cep_destino: str) -> None:
         super().__init__(f"Não foi possível obter frete para o CEP {cep_destino}.")
         self.cep_destino = cep_destino
+
+    def __reduce__(self):
+        return type(self), (self.cep_destino,)
@@ -1,17 +1,16 @@
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_HALF_UP
 from typing import Protocol
 
+from .dinheiro import Dinheiro
 from .exceptions import FreteIndisponivelError
 
-CENT = Decimal("0.01")
-
 @dataclass(frozen=True, slots=True)
 class Frete:
-    valor: Decimal
+    valor: Dinheiro
     prazo_dias: int
 
     def __post_init__(self) -> None:
+        object.__setattr__(self, "valor", Dinheiro.de(self.valor))
         if self.valor < 0:
             raise ValueError("Valor do frete não pode ser negativo")
         if self.prazo_dias <= 0:
@@ -33,12 +32,15 @@ class TabelaFreteLocal:
         if peso_total <= 0:
             raise FreteIndisponivelError(cep_destino)
         faixa = self._selecionar_faixa(peso_total)
-        valor = (Decimal("12.50") + Decimal(faixa) * Decimal("4.80")).quantize(
-            CENT, rounding=ROUND_HALF_UP
-        )
+        valor = Dinheiro.de_centavos(1250 + faixa * 480)
         prazo = self._prazo_base + int(max(1, peso_total // 5))
         return Frete(valor=valor, prazo_dias=prazo)
 
+    @classmethod
+    def chave_faixa(cls, peso: float) -> tuple[int, int]:
+        """Agrupa pesos que recebem exatamente a mesma cotação desta tabela."""
+        return cls._selecionar_faixa(peso), int(max(1, peso // 5))
+
     @staticmethod
     def _selecionar_faixa(peso: float) -> int:
         if peso <= 3:
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from .frete import Frete, FreteAPI
+
+ChaveCotacao = Tuple[str, str, Hashable]
+
+
+@dataclass(slots=True)
+class EstatisticasCache:
+    acertos: int = 0
+    falhas: int = 0
+    expulsoes: int = 0
+    expiracoes: int = 0
+    compartilhadas: int = 0
+
+
+class _Voo:
+    __slots__ = ("concluido", "frete", "erro")
+
+    def __init__(self) -> None:
+        self.concluido = threading.Event()
+        self.frete: Optional[Frete] = None
+        self.erro: Optional[BaseException] = None
+
+
+class FreteComCache:
+    """Decorador de ``FreteAPI`` com cache LRU/TTL e single-flight.
+
+    A chave é (CEP de origem, CEP de destino ou seu prefixo, peso). Por
+    padrão o peso entra exato; ``faixa_peso`` só deve ser informado quando
+    agrupa pesos que *este* backend cota de forma idêntica (por exemplo,
+    ``TabelaFreteLocal.chave_faixa`` para ``TabelaFreteLocal``). Consultas
+    simultâneas com a mesma chave aguardam uma única chamada ao backend.
+    """
+
+    def __init__(
+        self,
+        backend: FreteAPI,
+        *,
+        ttl: float = 300.0,
+        tamanho_maximo: int = 10_000,
+        prefixo_cep: Optional[int] = None,
+        faixa_peso: Optional[Callable[[float], Hashable]] = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("TTL deve ser positivo")
+        if tamanho_maximo <= 0:
+            raise ValueError("Tamanho máximo deve ser positivo")
+        self._backend = backend
+        self._ttl = ttl
+        self._tamanho_maximo = tamanho_maximo
+        self._prefixo_cep = prefixo_cep
+        self._faixa_peso = faixa_peso
+        self._relogio = relogio
+        self._entradas: "OrderedDict[ChaveCotacao, Tuple[Frete, float]]" = OrderedDict()
+        self._em_voo: Dict[ChaveCotacao, _Voo] = {}
+        self._lock = threading.Lock()
+        self._estatisticas = EstatisticasCache()
+
+    @property
+    def estatisticas(self) -> EstatisticasCache:
+        with self._lock:
+            return replace(self._estatisticas)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def chave(self, cep_origem: str, cep_destino: str, peso_total: float) -> ChaveCotacao:
+        destino = cep_destino
+        if self._prefixo_cep is not None:
+            destino = "".join(c for c in cep_destino if c.isdigit())[: self._prefixo_cep]
+        return cep_origem, destino, peso_total if self._faixa_peso is None else self._faixa_peso(peso_total)
+
+    def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        chave = self.chave(cep_origem, cep_destino, peso_total)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                frete, expira_em = entrada
+                if expira_em > self._relogio():
+                    self._entradas.move_to_end(chave)
+                    self._estatisticas.acertos += 1
+                    return frete
+                del self._entradas[chave]
+                self._estatisticas.expiracoes += 1
+            voo = self._em_voo.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._em_voo[chave] = _Voo()
+                self._estatisticas.falhas += 1
+            else:
+                self._estatisticas.compartilhadas += 1
+
+        if not lider:
+            voo.concluido.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.frete  # type: ignore[return-value]
+
+        try:
+            frete = self._backend.cotacao(cep_origem, cep_destino, peso_total)
+        except BaseException as erro:
+            voo.erro = erro
+            with self._lock:
+                del self._em_voo[chave]
+            voo.concluido.set()
+            raise
+        voo.frete = frete
+        with self._lock:
+            del self._em_voo[chave]
+            if frete is not None:
+                self._armazenar(chave, frete)
+        voo.concluido.set()
+        return frete
+
+    def _armazenar(self, chave: ChaveCotacao, frete: Frete) -> None:
+        self._entradas[chave] = (frete, self._relogio() + self._ttl)
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self._tamanho_maximo:
+            self._entradas.popitem(last=False)
+            self._estatisticas.expulsoes += 1
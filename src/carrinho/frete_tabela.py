@@ -0,0 +1,134 @@
+import csv
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .dinheiro import Dinheiro
+from .exceptions import FreteIndisponivelError
+from .frete import Frete
+
+COLUNAS = ("cep_inicio", "cep_fim", "peso_ate", "valor", "prazo_dias")
+
+
+def cep_numerico(cep: str) -> int:
+    """Converte ``"88000-000"`` ou ``"88000000"`` para o inteiro ``88000000``."""
+    digitos = cep[:5] + cep[6:] if len(cep) == 9 and cep[5] == "-" else cep
+    if len(digitos) != 8 or not digitos.isdigit():
+        raise ValueError(f"CEP inválido: {cep!r}")
+    return int(digitos)
+
+
+@dataclass(frozen=True, slots=True)
+class _Indice:
+    """Faixas de CEP ordenadas e, para cada uma, os limites de peso e os fretes já montados."""
+
+    inicios: array
+    fins: array
+    limites: Tuple[Tuple[float, ...], ...]
+    fretes: Tuple[Tuple[Frete, ...], ...]
+
+
+def _montar_indice(linhas: Iterable[Mapping[str, str]]) -> _Indice:
+    faixas: Dict[Tuple[int, int], List[Tuple[float, Frete]]] = {}
+    fretes_unicos: Dict[Tuple[int, int], Frete] = {}
+    for numero, linha in enumerate(linhas, start=2):
+        try:
+            inicio, fim = cep_numerico(linha["cep_inicio"]), cep_numerico(linha["cep_fim"])
+            peso_ate = float(linha["peso_ate"])
+            valor = Dinheiro(linha["valor"])
+            prazo = int(linha["prazo_dias"])
+        except (KeyError, ValueError, ArithmeticError) as erro:
+            raise ValueError(f"Linha {numero} da tabela de frete inválida: {erro}") from erro
+        if inicio > fim or peso_ate <= 0:
+            raise ValueError(f"Linha {numero} da tabela de frete inválida: faixa vazia")
+        # Tabelas reais repetem os mesmos preços em milhares de faixas.
+        chave_frete = (valor.centavos, prazo)
+        frete = fretes_unicos.get(chave_frete)
+        if frete is None:
+            frete = fretes_unicos[chave_frete] = Frete(valor=valor, prazo_dias=prazo)
+        faixas.setdefault((inicio, fim), []).append((peso_ate, frete))
+
+    inicios, fins = array("l"), array("l")
+    limites: List[Tuple[float, ...]] = []
+    fretes: List[Tuple[Frete, ...]] = []
+    compartilhadas: Dict[Tuple, Tuple] = {}
+    for inicio, fim in sorted(faixas):
+        if fins and inicio <= fins[-1]:
+            raise ValueError(f"Faixas de CEP sobrepostas em {inicio:08d}")
+        bandas = sorted(faixas[(inicio, fim)], key=lambda banda: banda[0])
+        pesos = tuple(peso for peso, _ in bandas)
+        if len(set(pesos)) != len(pesos):
+            raise ValueError(f"Limite de peso repetido na faixa {inicio:08d}-{fim:08d}")
+        inicios.append(inicio)
+        fins.append(fim)
+        limites.append(compartilhadas.setdefault(pesos, pesos))
+        valores = tuple(frete for _, frete in bandas)
+        fretes.append(compartilhadas.setdefault(valores, valores))
+    return _Indice(inicios, fins, tuple(limites), tuple(fretes))
+
+
+class TabelaFreteCEP:
+    """``FreteAPI`` por tabela: faixa de CEP de destino × faixa de peso.
+
+    O CSV tem as colunas ``cep_inicio, cep_fim, peso_ate, valor, prazo_dias``;
+    cada linha cobre os pesos até ``peso_ate`` (inclusive) acima da banda
+    anterior da mesma faixa de CEP. A tabela vale para uma origem, então
+    ``cep_origem`` é ignorado. A cotação faz duas buscas binárias e devolve
+    um ``Frete`` montado na carga, sem alocar nada.
+
+    ``recarregar`` monta o índice novo por fora e troca a referência de uma
+    vez: cotações em andamento terminam com a tabela antiga, as seguintes já
+    usam a nova, e nenhuma delas espera por lock.
+    """
+
+    def __init__(self, linhas: Iterable[Mapping[str, str]] = ()) -> None:
+        self._indice = _montar_indice(linhas)
+        self._caminho: Optional[Path] = None
+        self._modificado_em: Optional[int] = None
+
+    @classmethod
+    def de_csv(cls, caminho: Union[str, Path]) -> "TabelaFreteCEP":
+        tabela = cls()
+        tabela.recarregar(caminho)
+        return tabela
+
+    def __len__(self) -> int:
+        return len(self._indice.inicios)
+
+    def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        indice = self._indice
+        if peso_total <= 0:
+            raise FreteIndisponivelError(cep_destino)
+        cep = cep_numerico(cep_destino)
+        posicao = bisect_right(indice.inicios, cep) - 1
+        if posicao < 0 or cep > indice.fins[posicao]:
+            raise FreteIndisponivelError(cep_destino)
+        limites = indice.limites[posicao]
+        banda = bisect_left(limites, peso_total)
+        if banda == len(limites):
+            raise FreteIndisponivelError(cep_destino)
+        return indice.fretes[posicao][banda]
+
+    def recarregar(self, caminho: Optional[Union[str, Path]] = None) -> None:
+        """Relê o CSV (o último carregado, se ``caminho`` for omitido) e troca a tabela."""
+        caminho = Path(caminho) if caminho is not None else self._caminho
+        if caminho is None:
+            raise ValueError("Nenhum arquivo de tabela para recarregar")
+        modificado_em = os.stat(caminho).st_mtime_ns
+        with caminho.open(encoding="utf-8", newline="") as arquivo:
+            indice = _montar_indice(csv.DictReader(arquivo))
+        # Uma única atribuição: leitores veem a tabela antiga ou a nova inteira.
+        self._indice = indice
+        self._caminho, self._modificado_em = caminho, modificado_em
+
+    def recarregar_se_modificado(self) -> bool:
+        """Recarrega se o arquivo mudou desde a última carga; devolve se recarregou."""
+        if self._caminho is None:
+            return False
+        if os.stat(self._caminho).st_mtime_ns == self._modificado_em:
+            return False
+        self.recarregar()
+        return True
@@ -0,0 +1,277 @@
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+from .entities import Carrinho
+from .frete import Frete, FreteAPI
+from .repositories import EstoqueRepository
+
+LIMITES_PADRAO: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histograma:
+    """Histograma de durações com baldes fixos (em segundos), no estilo Prometheus."""
+
+    __slots__ = ("limites", "baldes", "contagem", "soma", "minimo", "maximo")
+
+    def __init__(self, limites: Sequence[float] = LIMITES_PADRAO) -> None:
+        self.limites = tuple(limites)
+        self.baldes = [0] * (len(self.limites) + 1)
+        self.contagem = 0
+        self.soma = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+
+    def observar(self, duracao: float) -> None:
+        self.baldes[bisect_left(self.limites, duracao)] += 1
+        self.contagem += 1
+        self.soma += duracao
+        if duracao < self.minimo:
+            self.minimo = duracao
+        if duracao > self.maximo:
+            self.maximo = duracao
+
+    def percentil(self, p: float) -> float:
+        """Estimativa pelo limite superior do balde que contém o percentil ``p``."""
+        if not self.contagem:
+            return 0.0
+        alvo = p / 100 * self.contagem
+        acumulado = 0
+        for indice, quantidade in enumerate(self.baldes):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return self.limites[indice] if indice < len(self.limites) else self.maximo
+        return self.maximo
+
+    def copiar(self) -> "Histograma":
+        copia = Histograma(self.limites)
+        copia.baldes = list(self.baldes)
+        copia.contagem, copia.soma = self.contagem, self.soma
+        copia.minimo, copia.maximo = self.minimo, self.maximo
+        return copia
+
+
+class Sink(Protocol):
+    def exportar(self, histogramas: Mapping[str, Histograma]) -> None:
+        ...
+
+
+class Instrumentacao:
+    """Registro de tempos e contagens por operação, com destinos plugáveis.
+
+    ``medir`` e ``registrar`` só acumulam em memória; ``exportar`` envia um
+    retrato dos histogramas a cada sink configurado.
+    """
+
+    def __init__(self, sinks: Sequence[Sink] = (), *, limites: Sequence[float] = LIMITES_PADRAO) -> None:
+        self._sinks = list(sinks)
+        self._limites = tuple(limites)
+        self._histogramas: Dict[str, Histograma] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, operacao: str, duracao: float) -> None:
+        with self._lock:
+            histograma = self._histogramas.get(operacao)
+            if histograma is None:
+                histograma = self._histogramas[operacao] = Histograma(self._limites)
+            histograma.observar(duracao)
+
+    @contextmanager
+    def medir(self, operacao: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(operacao, time.perf_counter() - inicio)
+
+    def histogramas(self) -> Dict[str, Histograma]:
+        with self._lock:
+            return {operacao: h.copiar() for operacao, h in self._histogramas.items()}
+
+    def contagens(self) -> Dict[str, int]:
+        with self._lock:
+            return {operacao: h.contagem for operacao, h in self._histogramas.items()}
+
+    def exportar(self) -> None:
+        retrato = self.histogramas()
+        for sink in self._sinks:
+            sink.exportar(retrato)
+
+    def zerar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+
+
+class SinkMemoria:
+    def __init__(self) -> None:
+        self.exportacoes: List[Dict[str, Histograma]] = []
+
+    def exportar(self, histogramas: Mapping[str, Histograma]) -> None:
+        self.exportacoes.append(dict(histogramas))
+
+
+class SinkLogging:
+    def __init__(self, logger: Optional[logging.Logger] = None, *, nivel: int = logging.INFO) -> None:
+        self._logger = logger or logging.getLogger("carrinho.instrumentacao")
+        self._nivel = nivel
+
+    def exportar(self, histogramas: Mapping[str, Histograma]) -> None:
+        for operacao, h in sorted(histogramas.items()):
+            self._logger.log(
+                self._nivel,
+                "%s n=%d media=%.6fs p50<=%.6fs p99<=%.6fs max=%.6fs",
+                operacao, h.contagem, h.soma / h.contagem if h.contagem else 0.0,
+                h.percentil(50), h.percentil(99), h.maximo,
+            )
+
+
+class SinkPrometheus:
+    """Grava as métricas em formato texto do Prometheus (para o textfile collector)."""
+
+    def __init__(self, caminho: str, *, metrica: str = "carrinho_operacao_segundos") -> None:
+        self._caminho = caminho
+        self._metrica = metrica
+
+    def exportar(self, histogramas: Mapping[str, Histograma]) -> None:
+        linhas = [
+            f"# HELP {self._metrica} Duração das operações do carrinho em segundos.",
+            f"# TYPE {self._metrica} histogram",
+        ]
+        for operacao, h in sorted(histogramas.items()):
+            rotulo = f'operacao="{operacao}"'
+            acumulado = 0
+            for limite, quantidade in zip(h.limites, h.baldes):
+                acumulado += quantidade
+                linhas.append(f'{self._metrica}_bucket{{{rotulo},le="{limite:g}"}} {acumulado}')
+            linhas.append(f'{self._metrica}_bucket{{{rotulo},le="+Inf"}} {h.contagem}')
+            linhas.append(f"{self._metrica}_sum{{{rotulo}}} {h.soma:.9f}")
+            linhas.append(f"{self._metrica}_count{{{rotulo}}} {h.contagem}")
+        temporario = f"{self._caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(linhas) + "\n")
+        os.replace(temporario, self._caminho)
+
+
+class EstoqueInstrumentado:
+    """``EstoqueRepository`` que mede cada chamada ao repositório decorado."""
+
+    def __init__(self, estoque: EstoqueRepository, instrumentacao: Instrumentacao) -> None:
+        self._estoque = estoque
+        self._registrar = instrumentacao.registrar
+
+    def _medir(self, operacao: str, metodo: Callable, *argumentos):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*argumentos)
+        finally:
+            self._registrar(operacao, time.perf_counter() - inicio)
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        self._medir("estoque.registrar", self._estoque.registrar, sku, quantidade)
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        self._medir("estoque.reservar", self._estoque.reservar, sku, quantidade)
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        self._medir("estoque.liberar", self._estoque.liberar, sku, quantidade)
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        self._medir("estoque.confirmar_reserva", self._estoque.confirmar_reserva, sku, quantidade)
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        return self._medir("estoque.quantidade_disponivel", self._estoque.quantidade_disponivel, sku)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        self._medir("estoque.reservar_lote", self._estoque.reservar_lote, itens)
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        self._medir("estoque.liberar_lote", self._estoque.liberar_lote, itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        self._medir("estoque.confirmar_lote", self._estoque.confirmar_lote, itens)
+
+
+class FreteInstrumentado:
+    """``FreteAPI`` que mede cada cotação da API decorada."""
+
+    def __init__(self, frete_api: FreteAPI, instrumentacao: Instrumentacao) -> None:
+        self._frete_api = frete_api
+        self._registrar = instrumentacao.registrar
+
+    def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        inicio = time.perf_counter()
+        try:
+            return self._frete_api.cotacao(cep_origem, cep_destino, peso_total)
+        finally:
+            self._registrar("frete.cotacao", time.perf_counter() - inicio)
+
+
+@dataclass(frozen=True, slots=True)
+class Perfil:
+    estatisticas: pstats.Stats
+    duracao: float
+
+    def texto(self, linhas: int = 20, ordenar_por: str = "cumulative") -> str:
+        import io
+
+        saida = io.StringIO()
+        self.estatisticas.stream = saida  # type: ignore[attr-defined]
+        self.estatisticas.sort_stats(ordenar_por).print_stats(linhas)
+        return saida.getvalue()
+
+
+def perfilar_resumos(service, carrinho: Carrinho, cep_destino: str, n: int = 1_000) -> Perfil:
+    """Captura um perfil ``cProfile`` de ``n`` chamadas a ``calcular_resumo``."""
+    perfilador = cProfile.Profile()
+    inicio = time.perf_counter()
+    perfilador.enable()
+    try:
+        for _ in range(n):
+            service.calcular_resumo(carrinho, cep_destino)
+    finally:
+        perfilador.disable()
+    return Perfil(pstats.Stats(perfilador), time.perf_counter() - inicio)
+
+
+def amostrar_pilhas(funcao: Callable[[], object], *, intervalo: float = 0.001) -> Counter:
+    """Executa ``funcao`` enquanto uma thread amostra a pilha a cada ``intervalo``.
+
+    Devolve a contagem de pilhas no formato "collapsed" (``a;b;c``), pronto
+    para ferramentas de flame graph. Custa bem menos que ``cProfile`` em
+    execuções longas, ao preço de ser estatístico.
+    """
+    alvo = threading.get_ident()
+    amostras: Counter = Counter()
+    parar = threading.Event()
+
+    def amostrador() -> None:
+        while not parar.wait(intervalo):
+            quadro = sys._current_frames().get(alvo)
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                quadro = quadro.f_back
+            if pilha:
+                amostras[";".join(reversed(pilha))] += 1
+
+    thread = threading.Thread(target=amostrador, name="amostrador-pilhas", daemon=True)
+    thread.start()
+    try:
+        funcao()
+    finally:
+        parar.set()
+        thread.join()
+    return amostras
@@ -0,0 +1,25 @@
+import math
+from typing import Dict, Iterable, List, Sequence
+
+
+def percentil(ordenados: Sequence[float], p: float) -> float:
+    """Percentil ``p`` (0-100) por nearest-rank de uma sequência já ordenada."""
+    if not ordenados:
+        return 0.0
+    posicao = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[min(posicao, len(ordenados)) - 1]
+
+
+def resumir_latencias(latencias: Iterable[float]) -> Dict[str, float]:
+    """Contagem, média, p50/p95/p99 e máximo de uma série de latências em segundos."""
+    ordenadas: List[float] = sorted(latencias)
+    if not ordenadas:
+        return {"n": 0, "media": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "n": len(ordenadas),
+        "media": sum(ordenadas) / len(ordenadas),
+        "p50": percentil(ordenadas, 50),
+        "p95": percentil(ordenadas, 95),
+        "p99": percentil(ordenadas, 99),
+        "max": ordenadas[-1],
+    }
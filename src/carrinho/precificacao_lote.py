@@ -0,0 +1,100 @@
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Sequence, Union
+
+from .dinheiro import Dinheiro, _percentual_half_up
+from .entities import Carrinho
+from .exceptions import FreteIndisponivelError
+from .frete import Frete, FreteAPI
+from .promocoes import PROMOCOES_PADRAO, MotorPromocoes
+from .services import CEP_ORIGEM_PADRAO, ResumoPedido
+
+
+@dataclass(frozen=True, slots=True)
+class ResumosEmLote:
+    """Resumos de vários carrinhos em colunas de centavos inteiros."""
+
+    valor_bruto: array
+    desconto_promocional: array
+    desconto_cupom: array
+    frete: array
+    total: array
+    fretes: List[Frete]
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def resumo(self, indice: int) -> ResumoPedido:
+        return ResumoPedido(
+            valor_bruto=Dinheiro.de_centavos(self.valor_bruto[indice]),
+            desconto_promocional=Dinheiro.de_centavos(self.desconto_promocional[indice]),
+            desconto_cupom=Dinheiro.de_centavos(self.desconto_cupom[indice]),
+            frete=self.fretes[indice],
+            total=Dinheiro.de_centavos(self.total[indice]),
+        )
+
+
+def calcular_resumos_em_lote(
+    carrinhos: Sequence[Carrinho],
+    cep_destino: Union[str, Sequence[str]],
+    frete_api: FreteAPI,
+    *,
+    referencia: date,
+    cep_origem: str = CEP_ORIGEM_PADRAO,
+    promocoes: MotorPromocoes = PROMOCOES_PADRAO,
+) -> ResumosEmLote:
+    """Precifica muitos carrinhos de uma vez, com o mesmo resultado de ``calcular_resumo``.
+
+    Cada carrinho contribui apenas com seus totais já mantidos (valor bruto,
+    quantidade e peso); promoção, cupom e total são calculados coluna a coluna
+    em centavos inteiros, com arredondamento half-up exato. Promoções que
+    dependem dos itens (por categoria ou SKU) são avaliadas carrinho a
+    carrinho. ``cep_destino`` pode ser um CEP único ou um por carrinho.
+    """
+    ceps = [cep_destino] * len(carrinhos) if isinstance(cep_destino, str) else list(cep_destino)
+    if len(ceps) != len(carrinhos):
+        raise ValueError("Informe um CEP de destino por carrinho")
+
+    brutos = array("q")
+    quantidades = array("q")
+    percentuais_cupom = array("q")
+    fretes: List[Frete] = []
+    for carrinho, cep in zip(carrinhos, ceps):
+        if carrinho.esta_vazio():
+            raise ValueError("Carrinho não pode estar vazio ao calcular resumo")
+        brutos.append(carrinho.valor_bruto.centavos)
+        quantidades.append(carrinho.quantidade_total)
+        percentuais_cupom.append(_percentual_cupom(carrinho, referencia))
+        frete = frete_api.cotacao(cep_origem, cep, carrinho.peso_total)
+        if frete is None:
+            raise FreteIndisponivelError(cep)
+        fretes.append(frete)
+
+    if promocoes.depende_apenas_de_totais:
+        por_totais = promocoes.desconto_por_totais
+        descontos = array(
+            "q", [min(por_totais(v, q), v) for v, q in zip(brutos, quantidades)]
+        )
+    else:
+        descontos = array("q", [promocoes.desconto_centavos(c) for c in carrinhos])
+    cupons = array(
+        "q",
+        [_percentual_half_up(v - p, c) for v, p, c in zip(brutos, descontos, percentuais_cupom)],
+    )
+    valores_frete = array("q", [frete.valor.centavos for frete in fretes])
+    totais = array(
+        "q",
+        [v - p - c + f for v, p, c, f in zip(brutos, descontos, cupons, valores_frete)],
+    )
+    if any(total < 0 for total in totais):
+        raise ValueError("Total não pode ser negativo")
+    return ResumosEmLote(brutos, descontos, cupons, valores_frete, totais, fretes)
+
+
+def _percentual_cupom(carrinho: Carrinho, referencia: date) -> int:
+    cupom = carrinho.cupom
+    if cupom is None:
+        return 0
+    cupom.validar(referencia)
+    return cupom.percentual
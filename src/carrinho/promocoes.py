@@ -0,0 +1,212 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+from .dinheiro import Dinheiro, _percentual_half_up
+from .entities import Carrinho
+
+
+def _validar_percentual(percentual: int) -> None:
+    if not 0 < percentual <= 100:
+        raise ValueError("Percentual de promoção deve estar entre 1 e 100")
+
+
+@dataclass(frozen=True, slots=True)
+class FaixaQuantidade:
+    """Percentual sobre o valor bruto a partir de ``minimo`` unidades no carrinho."""
+
+    minimo: int
+    percentual: int
+
+
+@dataclass(frozen=True, slots=True)
+class FaixaValor:
+    """Percentual sobre o valor bruto a partir de um valor mínimo de carrinho."""
+
+    minimo: Dinheiro
+    percentual: int
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "minimo", Dinheiro.de(self.minimo))
+
+
+@dataclass(frozen=True, slots=True)
+class FaixaCategoria:
+    """Percentual sobre o subtotal da categoria a partir de ``minimo`` unidades dela."""
+
+    categoria: str
+    minimo: int
+    percentual: int
+
+
+@dataclass(frozen=True, slots=True)
+class DescontoSku:
+    """Percentual sobre o subtotal do SKU a partir de ``minimo`` unidades."""
+
+    sku: str
+    percentual: int
+    minimo: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class LeveXPagueY:
+    """A cada ``leve`` unidades do SKU, paga-se apenas ``pague``."""
+
+    sku: str
+    leve: int
+    pague: int
+
+
+RegraPromocao = Union[FaixaQuantidade, FaixaValor, FaixaCategoria, DescontoSku, LeveXPagueY]
+
+_TIPOS: Dict[str, type] = {
+    "faixa_quantidade": FaixaQuantidade,
+    "faixa_valor": FaixaValor,
+    "faixa_categoria": FaixaCategoria,
+    "desconto_sku": DescontoSku,
+    "leve_x_pague_y": LeveXPagueY,
+}
+
+
+def regra_de_dados(dados: Mapping[str, Any]) -> RegraPromocao:
+    """Constrói uma regra a partir de um dicionário com a chave ``tipo``."""
+    campos = dict(dados)
+    tipo = campos.pop("tipo", None)
+    if tipo not in _TIPOS:
+        raise ValueError(f"Tipo de promoção desconhecido: {tipo!r}")
+    return _TIPOS[tipo](**campos)
+
+
+class _TabelaFaixas:
+    """Faixas ordenadas por mínimo; a faixa vigente é achada por bisect."""
+
+    __slots__ = ("minimos", "percentuais")
+
+    def __init__(self, faixas: Iterable[Tuple[int, int]]) -> None:
+        melhores: Dict[int, int] = {}
+        for minimo, percentual in faixas:
+            _validar_percentual(percentual)
+            melhores[minimo] = max(percentual, melhores.get(minimo, 0))
+        self.minimos: List[int] = sorted(melhores)
+        self.percentuais: List[int] = [melhores[minimo] for minimo in self.minimos]
+
+    def __bool__(self) -> bool:
+        return bool(self.minimos)
+
+    def percentual(self, quantidade: int) -> int:
+        indice = bisect_right(self.minimos, quantidade) - 1
+        return self.percentuais[indice] if indice >= 0 else 0
+
+
+class MotorPromocoes:
+    """Regras de promoção compiladas em estruturas de consulta.
+
+    Faixas globais (por quantidade ou valor) viram tabelas ordenadas
+    consultadas por bisect; regras por categoria e por SKU ficam em índices
+    por chave, de modo que avaliar um carrinho custa O(itens + regras
+    aplicáveis). Cada regra arredonda seu desconto half-up; os descontos se
+    somam e nunca passam do valor bruto.
+    """
+
+    def __init__(self, regras: Iterable[RegraPromocao] = ()) -> None:
+        self.regras: Tuple[RegraPromocao, ...] = tuple(regras)
+        faixas_quantidade: List[Tuple[int, int]] = []
+        faixas_valor: List[Tuple[int, int]] = []
+        faixas_categoria: Dict[str, List[Tuple[int, int]]] = {}
+        self._por_sku: Dict[str, List[Tuple[int, int, int]]] = {}
+        for regra in self.regras:
+            if isinstance(regra, FaixaQuantidade):
+                faixas_quantidade.append((regra.minimo, regra.percentual))
+            elif isinstance(regra, FaixaValor):
+                faixas_valor.append((regra.minimo.centavos, regra.percentual))
+            elif isinstance(regra, FaixaCategoria):
+                faixas_categoria.setdefault(regra.categoria, []).append((regra.minimo, regra.percentual))
+            elif isinstance(regra, DescontoSku):
+                _validar_percentual(regra.percentual)
+                self._por_sku.setdefault(regra.sku, []).append((regra.minimo, regra.percentual, 0))
+            elif isinstance(regra, LeveXPagueY):
+                if not 0 <= regra.pague < regra.leve:
+                    raise ValueError("Leve X pague Y exige 0 <= Y < X")
+                self._por_sku.setdefault(regra.sku, []).append((regra.leve, 0, regra.pague))
+            else:
+                raise TypeError(f"Regra de promoção não suportada: {regra!r}")
+        self._faixas_quantidade = _TabelaFaixas(faixas_quantidade)
+        self._faixas_valor = _TabelaFaixas(faixas_valor)
+        self._por_categoria = {
+            categoria: _TabelaFaixas(faixas) for categoria, faixas in faixas_categoria.items()
+        }
+        self._apenas_totais = not self._por_categoria and not self._por_sku
+
+    @classmethod
+    def de_dados(cls, dados: Iterable[Mapping[str, Any]]) -> "MotorPromocoes":
+        return cls(regra_de_dados(item) for item in dados)
+
+    @property
+    def depende_apenas_de_totais(self) -> bool:
+        """Verdadeiro quando só há faixas globais, avaliáveis sem percorrer itens."""
+        return self._apenas_totais
+
+    def desconto_por_totais(self, valor_bruto: int, quantidade_total: int) -> int:
+        """Desconto em centavos das faixas globais de quantidade e de valor."""
+        desconto = 0
+        faixas = self._faixas_quantidade
+        if faixas.minimos:
+            indice = bisect_right(faixas.minimos, quantidade_total) - 1
+            if indice >= 0:
+                desconto += _percentual_half_up(valor_bruto, faixas.percentuais[indice])
+        faixas = self._faixas_valor
+        if faixas.minimos:
+            indice = bisect_right(faixas.minimos, valor_bruto) - 1
+            if indice >= 0:
+                desconto += _percentual_half_up(valor_bruto, faixas.percentuais[indice])
+        return desconto
+
+    def desconto_centavos(self, carrinho: Carrinho) -> int:
+        valor_bruto = carrinho.valor_bruto.centavos
+        desconto = self.desconto_por_totais(valor_bruto, carrinho.quantidade_total)
+        if not self._apenas_totais:
+            desconto += self._desconto_por_itens(carrinho)
+        return desconto if desconto < valor_bruto else valor_bruto
+
+    def calcular(self, carrinho: Carrinho) -> Dinheiro:
+        return Dinheiro.de_centavos(self.desconto_centavos(carrinho))
+
+    def _desconto_por_itens(self, carrinho: Carrinho) -> int:
+        desconto = 0
+        categorias: Dict[str, List[int]] = {}
+        por_sku = self._por_sku
+        por_categoria = self._por_categoria
+        for sku, item in carrinho.itens.items():
+            produto = item.produto
+            quantidade = item.quantidade
+            if por_categoria and produto.categoria in por_categoria:
+                acumulado = categorias.setdefault(produto.categoria, [0, 0])
+                acumulado[0] += quantidade
+                acumulado[1] += produto.preco.centavos * quantidade
+            regras = por_sku.get(sku)
+            if regras:
+                desconto += _desconto_sku(regras, produto.preco.centavos, quantidade)
+        for categoria, (quantidade, subtotal) in categorias.items():
+            desconto += _percentual_half_up(subtotal, por_categoria[categoria].percentual(quantidade))
+        return desconto
+
+
+def _desconto_sku(regras: Sequence[Tuple[int, int, int]], preco: int, quantidade: int) -> int:
+    desconto = 0
+    for limite, percentual, pague in regras:
+        if quantidade < limite:
+            continue
+        if percentual:
+            desconto += _percentual_half_up(preco * quantidade, percentual)
+        else:
+            desconto += (quantidade // limite) * (limite - pague) * preco
+    return desconto
+
+
+PROMOCOES_PADRAO = MotorPromocoes(
+    [
+        FaixaQuantidade(minimo=3, percentual=5),
+        FaixaQuantidade(minimo=5, percentual=10),
+        FaixaQuantidade(minimo=10, percentual=15),
+    ]
+)
@@ -0,0 +1,236 @@
+import argparse
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from multiprocessing.managers import BaseManager
+from typing import Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .entities import Carrinho
+from .frete import TabelaFreteLocal
+from .metricas import resumir_latencias
+from .repositories import ConcurrentEstoqueRepository
+from .services import CarrinhoService, ResumoPedido
+
+
+class _GerenciadorEstoque(BaseManager):
+    pass
+
+
+_GerenciadorEstoque.register("Estoque", ConcurrentEstoqueRepository)
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoReplay:
+    identificador: str
+    resumo: Optional[ResumoPedido]
+    erro: Optional[str]
+    latencia: float
+
+    @property
+    def sucesso(self) -> bool:
+        return self.erro is None
+
+
+@dataclass(slots=True)
+class RelatorioReplay:
+    processos: int
+    carrinhos: int = 0
+    sucessos: int = 0
+    falhas: Dict[str, int] = field(default_factory=dict)
+    duracao: float = 0.0
+    latencias: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def vazao(self) -> float:
+        return self.carrinhos / self.duracao if self.duracao else 0.0
+
+    def formatar(self) -> str:
+        return (
+            f"{self.carrinhos} carrinhos em {self.duracao:.2f}s com {self.processos} processo(s): "
+            f"{self.vazao:,.0f} carrinhos/s | sucessos {self.sucessos} | falhas {dict(self.falhas)} | "
+            f"p50 {self.latencias.get('p50', 0) * 1e3:.2f}ms "
+            f"p95 {self.latencias.get('p95', 0) * 1e3:.2f}ms "
+            f"p99 {self.latencias.get('p99', 0) * 1e3:.2f}ms"
+        )
+
+
+# Estado de cada processo trabalhador, montado pelo initializer do pool.
+_service: Optional[CarrinhoService] = None
+_estoque = None
+_cep_destino = ""
+
+
+def _inicializar_trabalhador(estoque, referencia: date, cep_destino: str) -> None:
+    global _service, _estoque, _cep_destino
+    _service = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: referencia)
+    _estoque = estoque
+    _cep_destino = cep_destino
+
+
+def _processar_fatia(fatia: Sequence[Tuple[int, Carrinho]]) -> List[Tuple[int, ResultadoReplay]]:
+    return [(indice, _processar_carrinho(pedido)) for indice, pedido in fatia]
+
+
+def _processar_carrinho(pedido: Carrinho) -> ResultadoReplay:
+    assert _service is not None
+    carrinho = Carrinho(identificador=pedido.identificador)
+    inicio = time.perf_counter()
+    try:
+        _service.adicionar_itens(
+            carrinho, [(item.produto, item.quantidade) for item in pedido.itens.values()]
+        )
+        if pedido.cupom is not None:
+            _service.aplicar_cupom(carrinho, pedido.cupom)
+        resumo = _service.finalizar(carrinho, _cep_destino)
+    except Exception as erro:
+        falha = type(erro).__name__
+        reservados = {sku: item.quantidade for sku, item in carrinho.itens.items()}
+        if reservados:
+            # Devolve o que ficou reservado para não contaminar os pedidos seguintes;
+            # se nem isso der certo, a falha da limpeza entra no resultado do pedido.
+            try:
+                _estoque.liberar_lote(reservados)
+            except Exception as erro_limpeza:
+                falha = f"{falha} (limpeza: {type(erro_limpeza).__name__})"
+        return ResultadoReplay(pedido.identificador, None, falha, time.perf_counter() - inicio)
+    return ResultadoReplay(pedido.identificador, resumo, None, time.perf_counter() - inicio)
+
+
+def shard_de(identificador: str, shards: int) -> int:
+    """Shard estável (independente de ``PYTHONHASHSEED``) de um carrinho."""
+    return zlib.crc32(identificador.encode("utf-8")) % shards
+
+
+class ReplayPedidos:
+    """Reexecuta pedidos (itens, cupom e ``finalizar``) em vários processos.
+
+    Os carrinhos são lidos em blocos e distribuídos entre os processos pelo
+    identificador; cada shard tem um pool próprio de um processo, então um
+    mesmo carrinho sempre cai no mesmo trabalhador. O estoque pertence ao
+    coordenador (um ``ConcurrentEstoqueRepository`` servido por um
+    ``BaseManager``) e cada pedido faz só duas chamadas a ele, graças às
+    operações em lote. Os resultados saem na ordem de entrada.
+    """
+
+    def __init__(
+        self,
+        estoque_inicial: Mapping[str, int],
+        *,
+        processos: int = 2,
+        cep_destino: str = "88000-000",
+        referencia: Optional[date] = None,
+        tamanho_bloco: int = 512,
+        blocos_em_voo: int = 4,
+    ) -> None:
+        if processos <= 0:
+            raise ValueError("Número de processos deve ser positivo")
+        self._estoque_inicial = dict(estoque_inicial)
+        self._processos = processos
+        self._cep_destino = cep_destino
+        self._referencia = referencia or date.today()
+        self._tamanho_bloco = tamanho_bloco
+        self._blocos_em_voo = blocos_em_voo
+        self.relatorio = RelatorioReplay(processos=processos)
+        self.estoque_final: Dict[str, Dict[str, int]] = {}
+
+    def executar(self, carrinhos: Iterable[Carrinho]) -> Iterator[ResultadoReplay]:
+        self.relatorio = relatorio = RelatorioReplay(processos=self._processos)
+        latencias: List[float] = []
+        with _GerenciadorEstoque() as gerenciador:
+            estoque = gerenciador.Estoque()  # type: ignore[attr-defined]
+            for sku, quantidade in self._estoque_inicial.items():
+                estoque.registrar(sku, quantidade)
+            pools = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_inicializar_trabalhador,
+                    initargs=(estoque, self._referencia, self._cep_destino),
+                )
+                for _ in range(self._processos)
+            ]
+            try:
+                inicio = time.perf_counter()
+                for resultado in self._executar_em_blocos(pools, carrinhos):
+                    relatorio.carrinhos += 1
+                    latencias.append(resultado.latencia)
+                    if resultado.sucesso:
+                        relatorio.sucessos += 1
+                    else:
+                        relatorio.falhas[resultado.erro] = relatorio.falhas.get(resultado.erro, 0) + 1  # type: ignore[index]
+                    yield resultado
+                relatorio.duracao = time.perf_counter() - inicio
+                relatorio.latencias = resumir_latencias(latencias)
+                self.estoque_final = estoque.snapshot()
+            finally:
+                for pool in pools:
+                    pool.shutdown(cancel_futures=True)
+
+    def _executar_em_blocos(
+        self, pools: Sequence[ProcessPoolExecutor], carrinhos: Iterable[Carrinho]
+    ) -> Iterator[ResultadoReplay]:
+        em_voo: Deque[List[Future]] = deque()
+        for bloco in _blocos(carrinhos, self._tamanho_bloco):
+            fatias: List[List[Tuple[int, Carrinho]]] = [[] for _ in pools]
+            for posicao, carrinho in enumerate(bloco):
+                fatias[shard_de(carrinho.identificador, len(pools))].append((posicao, carrinho))
+            em_voo.append([pool.submit(_processar_fatia, fatia) for pool, fatia in zip(pools, fatias) if fatia])
+            if len(em_voo) >= self._blocos_em_voo:
+                yield from _ordenar(em_voo.popleft())
+        while em_voo:
+            yield from _ordenar(em_voo.popleft())
+
+
+def _blocos(carrinhos: Iterable[Carrinho], tamanho: int) -> Iterator[List[Carrinho]]:
+    bloco: List[Carrinho] = []
+    for carrinho in carrinhos:
+        bloco.append(carrinho)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _ordenar(futuros: List[Future]) -> Iterator[ResultadoReplay]:
+    resultados = [par for futuro in futuros for par in futuro.result()]
+    resultados.sort(key=lambda par: par[0])
+    return (resultado for _, resultado in resultados)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import csv
+
+    from .serializacao import exportar_resumos, importar_carrinhos
+
+    parser = argparse.ArgumentParser(description="Reexecuta um log de pedidos em JSON Lines.")
+    parser.add_argument("pedidos", help="arquivo JSON Lines de carrinhos (formato de carrinho.serializacao)")
+    parser.add_argument("--estoque", required=True, help="CSV com colunas sku,quantidade")
+    parser.add_argument("--processos", type=int, default=2)
+    parser.add_argument("--cep", default="88000-000")
+    parser.add_argument("--data", type=date.fromisoformat, default=None, help="data de referência (AAAA-MM-DD)")
+    parser.add_argument("--saida", help="grava os resumos em JSON Lines")
+    argumentos = parser.parse_args(argv)
+
+    with open(argumentos.estoque, encoding="utf-8", newline="") as arquivo:
+        estoque = {linha["sku"]: int(linha["quantidade"]) for linha in csv.DictReader(arquivo)}
+    replay = ReplayPedidos(
+        estoque, processos=argumentos.processos, cep_destino=argumentos.cep, referencia=argumentos.data
+    )
+    with open(argumentos.pedidos, encoding="utf-8") as pedidos:
+        resumos = (r.resumo for r in replay.executar(importar_carrinhos(pedidos)) if r.resumo is not None)
+        if argumentos.saida:
+            with open(argumentos.saida, "w", encoding="utf-8") as saida:
+                exportar_resumos(resumos, saida)
+        else:
+            for _ in resumos:
+                pass
+    print(replay.relatorio.formatar())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
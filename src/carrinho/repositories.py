@@ -1,5 +1,6 @@
+import threading
 from dataclasses import dataclass
-from typing import Dict, Protocol, runtime_checkable
+from typing import Dict, Iterable, List, Mapping, Protocol, runtime_checkable
 
 from .exceptions import EstoqueInsuficienteError
 
@@ -21,11 +22,27 @@ class EstoqueRepository(Protocol):
     def quantidade_disponivel(self, sku: str) -> int:
         ...
 
+    # Operações em lote são tudo-ou-nada: se um SKU falhar nenhum é alterado.
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        ...
+
 @dataclass
 class _EstoqueItem:
     disponivel: int
     reservado: int = 0
 
+def _validar_lote(itens: Mapping[str, int]) -> None:
+    for quantidade in itens.values():
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser positiva")
+
+
 class InMemoryEstoqueRepository:
     """Repositório de estoque com reservas atômicas para uso em testes."""
 
@@ -69,9 +86,116 @@ class InMemoryEstoqueRepository:
             return 0
         return item.disponivel
 
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        _validar_lote(itens)
+        for sku, quantidade in itens.items():
+            item = self._itens.get(sku)
+            if item is None:
+                raise EstoqueInsuficienteError(sku, quantidade, 0)
+            if item.disponivel < quantidade:
+                raise EstoqueInsuficienteError(sku, quantidade, item.disponivel)
+        for sku, quantidade in itens.items():
+            item = self._itens[sku]
+            item.disponivel -= quantidade
+            item.reservado += quantidade
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        _validar_lote(itens)
+        self._exigir_reservado(itens)
+        for sku, quantidade in itens.items():
+            item = self._itens[sku]
+            item.disponivel += quantidade
+            item.reservado -= quantidade
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        _validar_lote(itens)
+        self._exigir_reservado(itens)
+        for sku, quantidade in itens.items():
+            self._itens[sku].reservado -= quantidade
+
+    def _exigir_reservado(self, itens: Mapping[str, int]) -> None:
+        for sku, quantidade in itens.items():
+            item = self._itens.get(sku)
+            if item is None or item.reservado < quantidade:
+                raise EstoqueInsuficienteError(sku, quantidade, 0)
+
     # Auxiliar usado em testes de integração para inspecionar o estado.
     def snapshot(self) -> Dict[str, Dict[str, int]]:
         return {
             sku: {"disponivel": dados.disponivel, "reservado": dados.reservado}
             for sku, dados in self._itens.items()
         }
+
+
+class ConcurrentEstoqueRepository(InMemoryEstoqueRepository):
+    """Variante thread-safe com locks listrados por SKU.
+
+    Cada SKU é mapeado para uma de ``listras`` travas; operações em SKUs de
+    listras diferentes não disputam o mesmo lock e o verificar-e-alterar de
+    um mesmo SKU é atômico. ``listras=1`` equivale a um lock global.
+    """
+
+    def __init__(self, *, listras: int = 64) -> None:
+        if listras <= 0:
+            raise ValueError("Número de listras deve ser positivo")
+        super().__init__()
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(listras)]
+
+    def _lock_para(self, sku: str) -> threading.Lock:
+        return self._locks[hash(sku) % len(self._locks)]
+
+    def registrar(self, sku: str, quantidade: int) -> None:
+        with self._lock_para(sku):
+            super().registrar(sku, quantidade)
+
+    def reservar(self, sku: str, quantidade: int) -> None:
+        with self._lock_para(sku):
+            super().reservar(sku, quantidade)
+
+    def liberar(self, sku: str, quantidade: int) -> None:
+        with self._lock_para(sku):
+            super().liberar(sku, quantidade)
+
+    def confirmar_reserva(self, sku: str, quantidade: int) -> None:
+        with self._lock_para(sku):
+            super().confirmar_reserva(sku, quantidade)
+
+    def quantidade_disponivel(self, sku: str) -> int:
+        with self._lock_para(sku):
+            return super().quantidade_disponivel(sku)
+
+    def reservar_lote(self, itens: Mapping[str, int]) -> None:
+        with _Travas(self._locks_para(itens)):
+            super().reservar_lote(itens)
+
+    def liberar_lote(self, itens: Mapping[str, int]) -> None:
+        with _Travas(self._locks_para(itens)):
+            super().liberar_lote(itens)
+
+    def confirmar_lote(self, itens: Mapping[str, int]) -> None:
+        with _Travas(self._locks_para(itens)):
+            super().confirmar_lote(itens)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with _Travas(self._locks):
+            return super().snapshot()
+
+    def _locks_para(self, skus: Iterable[str]) -> List[threading.Lock]:
+        # Ordem fixa de aquisição evita deadlock entre lotes concorrentes.
+        indices = sorted({hash(sku) % len(self._locks) for sku in skus})
+        return [self._locks[indice] for indice in indices]
+
+
+class _Travas:
+    """Adquire uma sequência de locks na ordem dada e libera na ordem inversa."""
+
+    def __init__(self, locks: List[threading.Lock]) -> None:
+        self._locks = locks
+
+    def __enter__(self) -> None:
+        for lock in self._locks:
+            lock.acquire()
+
+    def __exit__(self, *_: object) -> None:
+        for lock in reversed(self._locks):
+            lock.release()
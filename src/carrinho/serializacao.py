@@ -0,0 +1,167 @@
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Union
+
+from .dinheiro import Dinheiro
+from .entities import Carrinho, CarrinhoItem, Cupom, Produto
+from .frete import Frete
+from .services import ResumoPedido
+
+Registro = Dict[str, Any]
+
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def produto_para_dict(produto: Produto) -> Registro:
+    return {
+        "tipo": "produto",
+        "sku": produto.sku,
+        "nome": produto.nome,
+        "preco": str(produto.preco),
+        "peso_kg": produto.peso_kg,
+        "categoria": produto.categoria,
+        "ativo": produto.ativo,
+    }
+
+
+def produto_de_dict(dados: Registro) -> Produto:
+    return Produto(
+        sku=dados["sku"],
+        nome=dados["nome"],
+        preco=Dinheiro(dados["preco"]),
+        peso_kg=dados["peso_kg"],
+        categoria=dados.get("categoria", "geral"),
+        ativo=dados.get("ativo", True),
+    )
+
+
+def cupom_para_dict(cupom: Cupom) -> Registro:
+    return {"codigo": cupom.codigo, "percentual": cupom.percentual, "expira_em": cupom.expira_em.isoformat()}
+
+
+def cupom_de_dict(dados: Registro) -> Cupom:
+    return Cupom(
+        codigo=dados["codigo"],
+        percentual=dados["percentual"],
+        expira_em=date.fromisoformat(dados["expira_em"]),
+    )
+
+
+def item_para_lista(item: CarrinhoItem) -> list:
+    """Item como ``[sku, quantidade]``; os dados do produto vão em um registro próprio."""
+    return [item.produto.sku, item.quantidade]
+
+
+def resumo_para_dict(resumo: ResumoPedido) -> Registro:
+    return {
+        "tipo": "resumo",
+        "valor_bruto": str(resumo.valor_bruto),
+        "desconto_promocional": str(resumo.desconto_promocional),
+        "desconto_cupom": str(resumo.desconto_cupom),
+        "frete": {"valor": str(resumo.frete.valor), "prazo_dias": resumo.frete.prazo_dias},
+        "total": str(resumo.total),
+    }
+
+
+def resumo_de_dict(dados: Registro) -> ResumoPedido:
+    return ResumoPedido(
+        valor_bruto=Dinheiro(dados["valor_bruto"]),
+        desconto_promocional=Dinheiro(dados["desconto_promocional"]),
+        desconto_cupom=Dinheiro(dados["desconto_cupom"]),
+        frete=Frete(valor=Dinheiro(dados["frete"]["valor"]), prazo_dias=dados["frete"]["prazo_dias"]),
+        total=Dinheiro(dados["total"]),
+    )
+
+
+class EscritorCarrinhos:
+    """Serializa carrinhos em JSON Lines, emitindo cada produto uma única vez.
+
+    Um registro ``produto`` é escrito antes do primeiro carrinho que o usa
+    (ou de novo, se os dados do SKU mudarem); os carrinhos referenciam
+    produtos apenas pelo SKU. A memória cresce só com o número de SKUs
+    distintos, não com o número de carrinhos.
+    """
+
+    def __init__(self, destino: TextIO) -> None:
+        self._destino = destino
+        self._emitidos: Dict[str, Produto] = {}
+        self.carrinhos = 0
+
+    def escrever(self, carrinho: Carrinho) -> None:
+        for registro in self.registros(carrinho):
+            self._destino.write(_codificar(registro))
+            self._destino.write("\n")
+        self.carrinhos += 1
+
+    def registros(self, carrinho: Carrinho) -> Iterator[Registro]:
+        for item in carrinho.itens.values():
+            produto = item.produto
+            if self._emitidos.get(produto.sku) != produto:
+                self._emitidos[produto.sku] = produto
+                yield produto_para_dict(produto)
+        registro: Registro = {
+            "tipo": "carrinho",
+            "id": carrinho.identificador,
+            "itens": [item_para_lista(item) for item in carrinho.itens.values()],
+        }
+        if carrinho.cupom is not None:
+            registro["cupom"] = cupom_para_dict(carrinho.cupom)
+        yield registro
+
+
+def exportar_carrinhos(carrinhos: Iterable[Carrinho], destino: TextIO) -> int:
+    escritor = EscritorCarrinhos(destino)
+    for carrinho in carrinhos:
+        escritor.escrever(carrinho)
+    return escritor.carrinhos
+
+
+def importar_carrinhos(linhas: Iterable[str]) -> Iterator[Carrinho]:
+    """Reconstrói carrinhos de um fluxo JSON Lines, um por vez."""
+    produtos: Dict[str, Produto] = {}
+    for registro in _registros(linhas):
+        tipo = registro.get("tipo")
+        if tipo == "produto":
+            produto = produto_de_dict(registro)
+            produtos[produto.sku] = produto
+        elif tipo == "carrinho":
+            yield _carrinho_de_dict(registro, produtos)
+        else:
+            raise ValueError(f"Registro de tipo desconhecido: {tipo!r}")
+
+
+def exportar_resumos(resumos: Iterable[ResumoPedido], destino: TextIO) -> int:
+    quantidade = 0
+    for resumo in resumos:
+        destino.write(_codificar(resumo_para_dict(resumo)))
+        destino.write("\n")
+        quantidade += 1
+    return quantidade
+
+
+def importar_resumos(linhas: Iterable[str]) -> Iterator[ResumoPedido]:
+    for registro in _registros(linhas):
+        if registro.get("tipo") != "resumo":
+            raise ValueError(f"Registro de tipo desconhecido: {registro.get('tipo')!r}")
+        yield resumo_de_dict(registro)
+
+
+def _registros(linhas: Iterable[Union[str, bytes]]) -> Iterator[Registro]:
+    for numero, linha in enumerate(linhas, start=1):
+        if not linha.strip():
+            continue
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError as erro:
+            raise ValueError(f"Linha {numero} não é JSON válido") from erro
+
+
+def _carrinho_de_dict(registro: Registro, produtos: Dict[str, Produto]) -> Carrinho:
+    cupom: Optional[Cupom] = cupom_de_dict(registro["cupom"]) if registro.get("cupom") else None
+    carrinho = Carrinho(cupom=cupom, identificador=registro["id"])
+    for sku, quantidade in registro["itens"]:
+        produto = produtos.get(sku)
+        if produto is None:
+            raise ValueError(f"Carrinho {registro['id']} referencia SKU {sku} sem registro de produto")
+        carrinho.adicionar(produto, quantidade)
+    return carrinho
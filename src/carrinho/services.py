@@ -1,30 +1,91 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import date
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Callable
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, Optional, Tuple
 
+from .dinheiro import Dinheiro
 from .entities import Carrinho, Cupom, Produto
 from .exceptions import FreteIndisponivelError
 from .frete import Frete, FreteAPI
+from .promocoes import PROMOCOES_PADRAO, MotorPromocoes
 from .repositories import EstoqueRepository
 
-CENT = Decimal("0.01")
+# Colaboradores opcionais: só são importados por quem os usa.
+if TYPE_CHECKING:
+    from .cupons import RegistroCupons
+    from .eventos_carrinho import DiarioCarrinhos
+    from .instrumentacao import Instrumentacao
+
 CEP_ORIGEM_PADRAO = "01000-000"
 
 
 @dataclass(frozen=True, slots=True)
 class ResumoPedido:
-    valor_bruto: Decimal
-    desconto_promocional: Decimal
-    desconto_cupom: Decimal
+    valor_bruto: Dinheiro
+    desconto_promocional: Dinheiro
+    desconto_cupom: Dinheiro
     frete: Frete
-    total: Decimal
+    total: Dinheiro
 
     def __post_init__(self) -> None:
         if self.total < 0:
             raise ValueError("Total não pode ser negativo")
 
 
+def _calcular_descontos(
+    carrinho: Carrinho, referencia: date, promocoes: MotorPromocoes
+) -> Tuple[int, int, int]:
+    """Devolve (valor bruto, desconto promocional, desconto do cupom) em centavos."""
+    valor_bruto = carrinho.valor_bruto.centavos
+    desconto_promocional = promocoes.desconto_centavos(carrinho)
+    desconto_cupom = (
+        carrinho.cupom.calcular_desconto(
+            Dinheiro.de_centavos(valor_bruto - desconto_promocional), referencia
+        ).centavos
+        if carrinho.cupom
+        else 0
+    )
+    return valor_bruto, desconto_promocional, desconto_cupom
+
+
+def _montar_resumo(
+    valor_bruto: int, desconto_promocional: int, desconto_cupom: int, frete: Frete
+) -> ResumoPedido:
+    total = valor_bruto - desconto_promocional - desconto_cupom + frete.valor.centavos
+    return ResumoPedido(
+        valor_bruto=Dinheiro.de_centavos(valor_bruto),
+        desconto_promocional=Dinheiro.de_centavos(desconto_promocional),
+        desconto_cupom=Dinheiro.de_centavos(desconto_cupom),
+        frete=frete,
+        total=Dinheiro.de_centavos(total),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _ResumoMemorizado:
+    carrinho: Carrinho
+    versao: int
+    cep_destino: str
+    referencia: date
+    faixa_frete: Hashable
+    frete: Frete
+    resumo: ResumoPedido
+
+
+def _medido(instrumentacao: "Instrumentacao", operacao: str, funcao: Callable) -> Callable:
+    registrar = instrumentacao.registrar
+
+    def medido(*argumentos, **nomeados):
+        inicio = perf_counter()
+        try:
+            return funcao(*argumentos, **nomeados)
+        finally:
+            registrar(operacao, perf_counter() - inicio)
+
+    return medido
+
+
 class CarrinhoService:
     def __init__(
         self,
@@ -33,19 +94,90 @@ class CarrinhoService:
         *,
         data_provider: Callable[[], date] | None = None,
         cep_origem: str = CEP_ORIGEM_PADRAO,
+        promocoes: MotorPromocoes = PROMOCOES_PADRAO,
+        estoque_por_carrinho: Callable[[Carrinho], EstoqueRepository] | None = None,
+        instrumentacao: "Instrumentacao | None" = None,
+        resumos_em_cache: int = 0,
+        faixa_peso: Callable[[float], Hashable] | None = None,
+        cupons: "RegistroCupons | None" = None,
+        eventos: "DiarioCarrinhos | None" = None,
     ) -> None:
         self._estoque = estoque
+        # Permite que o repositório saiba a qual carrinho pertence cada reserva.
+        self._estoque_por_carrinho = estoque_por_carrinho
         self._frete_api = frete_api
         self._hoje = data_provider or date.today
         self._cep_origem = cep_origem
+        self._promocoes = promocoes
+        self._cupons = cupons
+        # Cada mutação bem-sucedida vira um evento no diário, se houver um.
+        self._eventos = eventos
+        self._descontos = _calcular_descontos
+        # Com resumos_em_cache > 0, guarda o último resumo de até esse número de
+        # carrinhos (LRU por identificador). Por padrão o frete só é reaproveitado
+        # com o mesmo peso exato; faixa_peso agrupa pesos e deve corresponder às
+        # faixas da frete_api (ex.: TabelaFreteLocal.chave_faixa).
+        if resumos_em_cache < 0:
+            raise ValueError("resumos_em_cache não pode ser negativo")
+        self._resumos: Optional[OrderedDict[str, _ResumoMemorizado]] = (
+            OrderedDict() if resumos_em_cache else None
+        )
+        self._resumos_em_cache = resumos_em_cache
+        self._faixa_peso = faixa_peso
+        self.instrumentacao = instrumentacao
+        if instrumentacao is not None:
+            self._instrumentar(instrumentacao)
+
+    def _instrumentar(self, instrumentacao: "Instrumentacao") -> None:
+        from .instrumentacao import EstoqueInstrumentado, FreteInstrumentado
+
+        # Sem instrumentação nada disto é montado: o caminho quente segue intacto.
+        self._estoque = EstoqueInstrumentado(self._estoque, instrumentacao)
+        self._frete_api = FreteInstrumentado(self._frete_api, instrumentacao)
+        if self._estoque_por_carrinho is not None:
+            por_carrinho = self._estoque_por_carrinho
+            self._estoque_por_carrinho = lambda carrinho: EstoqueInstrumentado(
+                por_carrinho(carrinho), instrumentacao
+            )
+        self._descontos = _medido(instrumentacao, "carrinho.descontos", _calcular_descontos)
+        for nome in (
+            "adicionar_item",
+            "adicionar_itens",
+            "alterar_quantidade",
+            "remover_item",
+            "aplicar_cupom",
+            "calcular_resumo",
+            "finalizar",
+        ):
+            setattr(self, nome, _medido(instrumentacao, f"carrinho.{nome}", getattr(self, nome)))
 
     def adicionar_item(self, carrinho: Carrinho, produto: Produto, quantidade: int) -> None:
-        self._estoque.reservar(produto.sku, quantidade)
+        estoque = self._estoque_de(carrinho)
+        estoque.reservar(produto.sku, quantidade)
         try:
             carrinho.adicionar(produto, quantidade)
         except Exception:
-            self._estoque.liberar(produto.sku, quantidade)
+            estoque.liberar(produto.sku, quantidade)
             raise
+        if self._eventos is not None:
+            self._eventos.registrar_adicao(carrinho, produto, quantidade)
+
+    def adicionar_itens(self, carrinho: Carrinho, itens: Iterable[Tuple[Produto, int]]) -> None:
+        """Adiciona vários itens reservando o estoque em uma única chamada em lote."""
+        produtos: Dict[str, Produto] = {}
+        quantidades: Dict[str, int] = {}
+        for produto, quantidade in itens:
+            if quantidade <= 0:
+                raise ValueError("Quantidade deve ser positiva")
+            produtos[produto.sku] = produto
+            quantidades[produto.sku] = quantidades.get(produto.sku, 0) + quantidade
+        if not quantidades:
+            return
+        self._estoque_de(carrinho).reservar_lote(quantidades)
+        for sku, quantidade in quantidades.items():
+            carrinho.adicionar(produtos[sku], quantidade)
+            if self._eventos is not None:
+                self._eventos.registrar_adicao(carrinho, produtos[sku], quantidade)
 
     def alterar_quantidade(self, carrinho: Carrinho, sku: str, quantidade: int) -> None:
         item = carrinho.itens.get(sku)
@@ -53,67 +185,114 @@ class CarrinhoService:
             raise ValueError(f"SKU {sku} não está no carrinho")
         delta = quantidade - item.quantidade
         if delta > 0:
-            self._estoque.reservar(sku, delta)
+            self._estoque_de(carrinho).reservar(sku, delta)
         elif delta < 0:
-            self._estoque.liberar(sku, -delta)
+            self._estoque_de(carrinho).liberar(sku, -delta)
         carrinho.alterar_quantidade(sku, quantidade)
+        if self._eventos is not None:
+            self._eventos.registrar_alteracao(carrinho, sku, quantidade)
 
     def remover_item(self, carrinho: Carrinho, sku: str) -> None:
         item = carrinho.itens.get(sku)
         if item is None:
             raise ValueError(f"SKU {sku} não está no carrinho")
-        self._estoque.liberar(sku, item.quantidade)
+        self._estoque_de(carrinho).liberar(sku, item.quantidade)
         carrinho.remover(sku)
+        if self._eventos is not None:
+            self._eventos.registrar_remocao(carrinho, sku)
 
-    def aplicar_cupom(self, carrinho: Carrinho, cupom: Cupom) -> None:
-        # Validamos utilizando um valor simbólico para garantir erros imediatos.
-        cupom.calcular_desconto(Decimal("1.00"), self._hoje())
+    def aplicar_cupom(self, carrinho: Carrinho, cupom: Cupom | str, *, cliente: str | None = None) -> None:
+        """Aplica um cupom; códigos (``str``) são resolvidos no registro de cupons."""
+        if isinstance(cupom, str):
+            if self._cupons is None:
+                raise ValueError("Serviço sem registro de cupons para resolver códigos")
+            cupom = self._cupons.verificar(cupom, self._hoje(), cliente)
+        else:
+            cupom.validar(self._hoje())
         carrinho.registrar_cupom(cupom)
+        if self._eventos is not None:
+            self._eventos.registrar_cupom(carrinho, cupom)
 
     def calcular_resumo(self, carrinho: Carrinho, cep_destino: str) -> ResumoPedido:
         if carrinho.esta_vazio():
             raise ValueError("Carrinho não pode estar vazio ao calcular resumo")
-        valor_bruto = carrinho.valor_bruto
-        desconto_promocional = self._calcular_promocao(valor_bruto, carrinho.quantidade_total)
-        base_para_cupom = valor_bruto - desconto_promocional
-        desconto_cupom = (
-            carrinho.cupom.calcular_desconto(base_para_cupom, self._hoje())
-            if carrinho.cupom
-            else Decimal("0.00")
+        if self._resumos is not None:
+            return self._resumo_memorizado(carrinho, cep_destino)
+        valor_bruto, desconto_promocional, desconto_cupom = self._descontos(
+            carrinho, self._hoje(), self._promocoes
         )
         frete = self._cotacao_frete(cep_destino, carrinho.peso_total)
-        total = (valor_bruto - desconto_promocional - desconto_cupom + frete.valor).quantize(
-            CENT, rounding=ROUND_HALF_UP
-        )
-        return ResumoPedido(
-            valor_bruto=valor_bruto,
-            desconto_promocional=desconto_promocional,
-            desconto_cupom=desconto_cupom,
-            frete=frete,
-            total=total,
-        )
+        return _montar_resumo(valor_bruto, desconto_promocional, desconto_cupom, frete)
 
-    def finalizar(self, carrinho: Carrinho, cep_destino: str) -> ResumoPedido:
+    def finalizar(self, carrinho: Carrinho, cep_destino: str, *, cliente: str | None = None) -> ResumoPedido:
         resumo = self.calcular_resumo(carrinho, cep_destino)
-        for item in carrinho.itens.values():
-            self._estoque.confirmar_reserva(item.produto.sku, item.quantidade)
+        # O uso do cupom cadastrado é consumido antes da baixa do estoque e
+        # estornado se ela falhar, para que os limites valham sob concorrência.
+        codigo = None
+        if self._cupons is not None and carrinho.cupom is not None and carrinho.cupom.codigo in self._cupons:
+            codigo = carrinho.cupom.codigo
+            self._cupons.resgatar(codigo, self._hoje(), cliente)
+        try:
+            self._estoque_de(carrinho).confirmar_lote(
+                {sku: item.quantidade for sku, item in carrinho.itens.items()}
+            )
+        except Exception:
+            if codigo is not None:
+                self._cupons.estornar(codigo, cliente)  # type: ignore[union-attr]
+            raise
         carrinho.limpar()
+        if self._eventos is not None:
+            self._eventos.registrar_limpeza(carrinho)
+        self.descartar_resumo(carrinho)
         return resumo
 
+    def descartar_resumo(self, carrinho: Carrinho) -> None:
+        if self._resumos is not None:
+            self._resumos.pop(carrinho.identificador, None)
+
+    def _resumo_memorizado(self, carrinho: Carrinho, cep_destino: str) -> ResumoPedido:
+        assert self._resumos is not None
+        referencia = self._hoje()
+        anterior = self._resumos.get(carrinho.identificador)
+        if anterior is not None and anterior.carrinho is not carrinho:
+            anterior = None
+        if (
+            anterior is not None
+            and anterior.versao == carrinho.versao
+            and anterior.cep_destino == cep_destino
+            and anterior.referencia == referencia
+        ):
+            self._resumos.move_to_end(carrinho.identificador)
+            return anterior.resumo
+
+        # Descontos são baratos e dependem de itens, cupom e data; o frete só
+        # é cotado de novo se o CEP ou a faixa de peso mudaram.
+        valor_bruto, desconto_promocional, desconto_cupom = self._descontos(
+            carrinho, referencia, self._promocoes
+        )
+        peso = carrinho.peso_total
+        faixa = peso if self._faixa_peso is None else self._faixa_peso(peso)
+        if anterior is not None and anterior.cep_destino == cep_destino and anterior.faixa_frete == faixa:
+            frete = anterior.frete
+        else:
+            frete = self._cotacao_frete(cep_destino, peso)
+        resumo = _montar_resumo(valor_bruto, desconto_promocional, desconto_cupom, frete)
+
+        self._resumos[carrinho.identificador] = _ResumoMemorizado(
+            carrinho, carrinho.versao, cep_destino, referencia, faixa, frete, resumo
+        )
+        self._resumos.move_to_end(carrinho.identificador)
+        if len(self._resumos) > self._resumos_em_cache:
+            self._resumos.popitem(last=False)
+        return resumo
+
+    def _estoque_de(self, carrinho: Carrinho) -> EstoqueRepository:
+        if self._estoque_por_carrinho is None:
+            return self._estoque
+        return self._estoque_por_carrinho(carrinho)
+
     def _cotacao_frete(self, cep_destino: str, peso_total: float) -> Frete:
         frete = self._frete_api.cotacao(self._cep_origem, cep_destino, peso_total)
         if frete is None:
             raise FreteIndisponivelError(cep_destino)
         return frete
-
-    @staticmethod
-    def _calcular_promocao(valor_bruto: Decimal, quantidade_total: int) -> Decimal:
-        if quantidade_total >= 10:
-            percentual = Decimal("0.15")
-        elif quantidade_total >= 5:
-            percentual = Decimal("0.10")
-        elif quantidade_total >= 3:
-            percentual = Decimal("0.05")
-        else:
-            return Decimal("0.00")
-        return (valor_bruto * percentual).quantize(CENT, rounding=ROUND_HALF_UP)
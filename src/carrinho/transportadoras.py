@@ -0,0 +1,90 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .exceptions import FreteIndisponivelError
+from .frete import Frete, FreteAPI
+
+CriterioFrete = Callable[[Frete], Tuple]
+
+_logger = logging.getLogger(__name__)
+
+CRITERIOS: Dict[str, CriterioFrete] = {
+    "mais_barato": lambda frete: (frete.valor, frete.prazo_dias),
+    "mais_rapido": lambda frete: (frete.prazo_dias, frete.valor),
+}
+
+
+class FreteMultiTransportadora:
+    """``FreteAPI`` composta que cota várias transportadoras em paralelo.
+
+    Todas as transportadoras são consultadas ao mesmo tempo em um pool de
+    threads e a melhor cotação recebida até ``prazo_limite`` segundos é
+    escolhida pelo ``criterio`` ("mais_barato", "mais_rapido" ou uma função
+    de chave). Transportadoras que estouram o prazo, devolvem ``None`` ou
+    levantam qualquer exceção são ignoradas (erros inesperados vão para o
+    log); ``FreteIndisponivelError`` só sobe quando nenhuma cotou.
+    """
+
+    def __init__(
+        self,
+        transportadoras: Sequence[FreteAPI],
+        *,
+        criterio: Union[str, CriterioFrete] = "mais_barato",
+        prazo_limite: float = 2.0,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if not transportadoras:
+            raise ValueError("Informe ao menos uma transportadora")
+        if prazo_limite <= 0:
+            raise ValueError("Prazo limite deve ser positivo")
+        if isinstance(criterio, str):
+            if criterio not in CRITERIOS:
+                raise ValueError(f"Critério de frete desconhecido: {criterio!r}")
+            criterio = CRITERIOS[criterio]
+        self._transportadoras = list(transportadoras)
+        self._criterio = criterio
+        self._prazo_limite = prazo_limite
+        # Folga para que transportadoras lentas de uma cotação não atrasem a próxima.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or 4 * len(self._transportadoras),
+            thread_name_prefix="cotacao-frete",
+        )
+
+    def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        pendentes = {
+            self._executor.submit(t.cotacao, cep_origem, cep_destino, peso_total)
+            for t in self._transportadoras
+        }
+        concluidas, atrasadas = wait(pendentes, timeout=self._prazo_limite)
+        for futuro in atrasadas:
+            futuro.cancel()
+        cotacoes, erro = self._cotacoes_validas(concluidas)
+        if not cotacoes:
+            raise FreteIndisponivelError(cep_destino) from erro
+        return min(cotacoes, key=self._criterio)
+
+    def fechar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "FreteMultiTransportadora":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.fechar()
+
+    @staticmethod
+    def _cotacoes_validas(concluidas: "set[Future[Frete]]") -> Tuple[List[Frete], Optional[BaseException]]:
+        cotacoes = []
+        ultimo_erro = None
+        for futuro in concluidas:
+            erro = futuro.exception()
+            if erro is not None:
+                if not isinstance(erro, FreteIndisponivelError):
+                    _logger.warning("Transportadora falhou ao cotar frete", exc_info=erro)
+                ultimo_erro = erro
+                continue
+            frete = futuro.result()
+            if frete is not None:
+                cotacoes.append(frete)
+        return cotacoes, ultimo_erro
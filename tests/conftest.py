@@ -5,17 +5,35 @@ from unittest.mock import Mock
 import pytest  # type: ignore[import]
 from carrinho import Carrinho, CarrinhoService, Cupom, Produto
 from carrinho.frete import Frete, FreteAPI
-from carrinho.repositories import InMemoryEstoqueRepository
+from carrinho.estoque_sqlite import SQLiteEstoqueRepository
+from carrinho.repositories import ConcurrentEstoqueRepository, InMemoryEstoqueRepository
+
+REPOSITORIOS_ESTOQUE = [InMemoryEstoqueRepository, ConcurrentEstoqueRepository, SQLiteEstoqueRepository]
+
+
+# Toda a suíte que usa o estoque roda contra cada implementação do repositório.
+@pytest.fixture(params=REPOSITORIOS_ESTOQUE, ids=lambda cls: cls.__name__)
+def fabrica_estoque(request) -> Iterator[Callable[[], InMemoryEstoqueRepository]]:
+    criados = []
+
+    def criar() -> InMemoryEstoqueRepository:
+        repo = request.param()
+        criados.append(repo)
+        return repo
+
+    yield criar
+    for repo in criados:
+        fechar = getattr(repo, "fechar", None)
+        if fechar is not None:
+            fechar()
 
 
 @pytest.fixture
-def estoque() -> Iterator[InMemoryEstoqueRepository]:
-    repo = InMemoryEstoqueRepository()
+def estoque(fabrica_estoque: Callable[[], InMemoryEstoqueRepository]) -> InMemoryEstoqueRepository:
+    repo = fabrica_estoque()
     repo.registrar("SKU-001", 25)
     repo.registrar("SKU-002", 10)
-    yield repo
-    # teardown explícito para demonstrar controle do ciclo de vida
-    repo.snapshot()
+    return repo
 
 @pytest.fixture
 def frete_api() -> Mock:
@@ -34,7 +52,7 @@ def service(estoque: InMemoryEstoqueRepository, frete_api: Mock, data_congelada:
 
 @pytest.fixture
 def carrinho() -> Carrinho:
-    return Carrinho()
+    return Carrinho(validar_totais=True)
 
 @pytest.fixture
 def produto_padrao() -> Produto:
@@ -0,0 +1,107 @@
+import json
+from contextlib import contextmanager
+
+import pytest  # type: ignore[import]
+from carrinho.benchmark import (
+    BENCHMARKS,
+    Benchmark,
+    carregar_baseline,
+    comparar,
+    executar_benchmark,
+    executar_suite,
+    main,
+    salvar_baseline,
+)
+
+
+def _resultado(p50: float) -> dict:
+    return {"n": 5, "media": p50, "p50": p50, "p95": p50, "p99": p50, "max": p50}
+
+
+def test_benchmark_descarta_aquecimento_e_resume_repeticoes() -> None:
+    chamadas = []
+    benchmark = Benchmark("teste", lambda: lambda: chamadas.append(1), iteracoes=4)
+
+    resultado = executar_benchmark(benchmark, aquecimento=2, repeticoes=3)
+
+    assert len(chamadas) == (2 + 3) * 4
+    assert resultado["n"] == 3
+    assert resultado["p50"] <= resultado["p99"]
+
+
+def test_suite_filtra_por_nome() -> None:
+    resultados = executar_suite("cupom.valid", aquecimento=0, repeticoes=1)
+
+    assert list(resultados) == ["cupom.validacao"]
+
+
+def test_suite_cobre_cenarios_pedidos() -> None:
+    assert {
+        "carrinho.mutacao",
+        "resumo.linhas_1",
+        "resumo.linhas_100",
+        "resumo.linhas_10000",
+        "estoque.contencao",
+        "estoque.contencao_lock_global",
+        "estoque.sqlite",
+        "estoque.wal_grupo",
+        "estoque.expiracao",
+        "precificacao.lote_1000",
+        "promocoes.mil_regras",
+        "catalogo_colunar.abertura_200000",
+        "serializacao.importar_1000",
+        "replay.processos_2",
+        "frete.cotacao",
+        "frete.tabela_cep_30000",
+        "cupom.validacao",
+        "cupom.resgate_300k",
+        "eventos.reconstrucao_snapshot",
+        "carga.vitrine",
+    } <= set(BENCHMARKS)
+
+
+def test_preparar_com_contexto_libera_recursos_ao_final() -> None:
+    eventos = []
+
+    @contextmanager
+    def preparar():
+        eventos.append("abrir")
+        yield lambda: eventos.append("operar")
+        eventos.append("fechar")
+
+    executar_benchmark(Benchmark("teste", preparar), aquecimento=1, repeticoes=2)
+
+    assert eventos == ["abrir", "operar", "operar", "operar", "fechar"]
+
+
+def test_comparar_aponta_apenas_regressoes_acima_da_tolerancia() -> None:
+    base = {"a": _resultado(1.0), "b": _resultado(1.0), "so_na_base": _resultado(1.0)}
+    atual = {"a": _resultado(1.09), "b": _resultado(1.2), "novo": _resultado(9.0)}
+
+    regressoes = comparar(base, atual, tolerancia=10)
+
+    assert [r.nome for r in regressoes] == ["b"]
+    assert regressoes[0].variacao == pytest.approx(20.0)
+
+
+def test_baseline_ida_e_volta(tmp_path) -> None:
+    caminho = tmp_path / "baseline.json"
+
+    salvar_baseline({"a": _resultado(0.5)}, str(caminho))
+
+    assert carregar_baseline(str(caminho)) == {"a": _resultado(0.5)}
+    documento = json.loads(caminho.read_text(encoding="utf-8"))
+    documento["versao"] = 99
+    caminho.write_text(json.dumps(documento), encoding="utf-8")
+    with pytest.raises(ValueError):
+        carregar_baseline(str(caminho))
+
+
+def test_comando_comparar_falha_em_regressao(tmp_path, capsys) -> None:
+    base, atual = tmp_path / "base.json", tmp_path / "atual.json"
+    salvar_baseline({"a": _resultado(1.0)}, str(base))
+    salvar_baseline({"a": _resultado(1.5)}, str(atual))
+
+    assert main(["comparar", str(base), str(atual), "--tolerancia", "60"]) == 0
+    assert main(["comparar", str(base), str(atual), "--tolerancia", "10"]) == 1
+    assert "REGRESSÃO a" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import time
+from collections import Counter
+
+import pytest  # type: ignore[import]
+from carrinho import CarrinhoService
+from carrinho.carga import REFERENCIA, PerfilCarga, executar_carga, main, planejar
+from carrinho.frete import TabelaFreteLocal
+from carrinho.repositories import InMemoryEstoqueRepository
+
+PEQUENO = PerfilCarga(semente=7, sessoes=300, produtos=50, estoque_por_sku=20)
+
+
+def test_mesma_semente_gera_o_mesmo_plano_e_as_mesmas_contagens() -> None:
+    assert planejar(PEQUENO) == planejar(PEQUENO)
+    assert planejar(PEQUENO) != planejar(PerfilCarga(semente=8, sessoes=300, produtos=50))
+
+    primeiro, segundo = executar_carga(PEQUENO), executar_carga(PEQUENO)
+    for campo in ("finalizadas", "abandonadas", "vazias", "operacoes", "falhas_estoque", "erros"):
+        assert getattr(primeiro, campo) == getattr(segundo, campo)
+
+
+def test_popularidade_segue_zipf() -> None:
+    perfil = PerfilCarga(sessoes=2_000, produtos=100, zipf=1.2)
+    contagem = Counter(indice for sessao in planejar(perfil) for indice, _ in sessao.itens)
+    mais_vendidos = [indice for indice, _ in contagem.most_common(3)]
+
+    assert mais_vendidos == [0, 1, 2]
+    assert contagem[0] > 10 * contagem.get(99, 0)
+
+
+def test_chegadas_respeitam_a_taxa() -> None:
+    sessoes = planejar(PerfilCarga(sessoes=2_000, taxa_chegada=1_000))
+
+    assert 1.7 < sessoes[-1].chegada < 2.3
+    assert all(a.chegada <= b.chegada for a, b in zip(sessoes, sessoes[1:]))
+
+
+def test_estoque_escasso_gera_falhas_contabilizadas() -> None:
+    relatorio = executar_carga(PerfilCarga(sessoes=300, produtos=20, estoque_por_sku=5, probabilidade_abandono=0))
+
+    assert relatorio.falhas_estoque["adicionar_item"] > 0
+    assert not relatorio.erros
+    assert relatorio.finalizadas + relatorio.vazias == relatorio.sessoes
+    assert set(relatorio.latencias["calcular_resumo"]) >= {"p50", "p95", "p99"}
+
+
+def test_abandono_devolve_o_estoque_reservado() -> None:
+    relatorio = executar_carga(PerfilCarga(sessoes=200, probabilidade_abandono=1.0))
+
+    assert relatorio.abandonadas + relatorio.vazias == relatorio.sessoes
+    assert relatorio.finalizadas == 0
+    assert not relatorio.falhas_estoque
+
+
+def test_varias_threads_processam_todas_as_sessoes() -> None:
+    relatorio = executar_carga(PerfilCarga(sessoes=400, threads=4))
+
+    assert relatorio.finalizadas + relatorio.abandonadas + relatorio.vazias == 400
+    assert not relatorio.erros
+
+
+@pytest.mark.slow
+def test_carga_longa_sem_erros_inesperados() -> None:
+    relatorio = executar_carga(PerfilCarga(sessoes=10_000, threads=4))
+
+    assert relatorio.finalizadas + relatorio.abandonadas + relatorio.vazias == 10_000
+    assert not relatorio.erros
+
+
+def test_atraso_das_threads_entra_na_latencia_da_sessao() -> None:
+    class ServicoLento(CarrinhoService):
+        def calcular_resumo(self, carrinho, cep_destino):
+            time.sleep(0.002)
+            return super().calcular_resumo(carrinho, cep_destino)
+
+    perfil = PerfilCarga(sessoes=100, produtos=20, taxa_chegada=100_000, probabilidade_abandono=0)
+    estoque = InMemoryEstoqueRepository()
+    for indice in range(perfil.produtos):
+        estoque.registrar(f"SKU-{indice:05d}", 1_000)
+    servico = ServicoLento(estoque, TabelaFreteLocal(), data_provider=lambda: REFERENCIA)
+
+    relatorio = executar_carga(perfil, servico=servico)
+
+    # As chegadas vencem em ~1ms, mas cada sessão leva ~4ms: a fila cresce.
+    assert relatorio.latencias["fila"]["p99"] > 0.1
+    assert relatorio.latencias["sessao"]["p99"] >= relatorio.latencias["fila"]["p99"]
+    assert relatorio.latencias["calcular_resumo"]["p99"] < relatorio.latencias["fila"]["p99"]
+
+
+def test_cli_grava_relatorio_json(tmp_path, capsys) -> None:
+    import json
+
+    destino = tmp_path / "carga.json"
+    assert main(["--sessoes", "50", "--semente", "3", "--json", str(destino)]) == 0
+
+    dados = json.loads(destino.read_text(encoding="utf-8"))
+    assert dados["perfil"]["semente"] == 3
+    assert dados["relatorio"]["sessoes"] == 50
+    assert "operações/s" in capsys.readouterr().out
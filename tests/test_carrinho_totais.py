@@ -0,0 +1,99 @@
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, Produto
+from carrinho.frete import TabelaFreteLocal
+
+
+@pytest.fixture
+def produtos() -> list[Produto]:
+    return [
+        Produto(sku=f"SKU-{i:03d}", nome=f"Item {i}", preco=Decimal("19.99") + i, peso_kg=0.1 * (i + 1))
+        for i in range(20)
+    ]
+
+
+def test_totais_acompanham_mutacoes(produtos: list[Produto]) -> None:
+    carrinho = Carrinho(validar_totais=True)
+    for indice, produto in enumerate(produtos):
+        carrinho.adicionar(produto, indice + 1)
+    carrinho.adicionar(produtos[0], 4)
+    carrinho.alterar_quantidade("SKU-005", 2)
+    carrinho.alterar_quantidade("SKU-007", 30)
+    carrinho.remover("SKU-010")
+
+    quantidade, valor, peso = carrinho.recalcular_totais()
+    assert carrinho.quantidade_total == quantidade
+    assert carrinho.valor_bruto == valor
+    assert carrinho.peso_total == pytest.approx(peso)
+
+
+def test_totais_zerados_ao_esvaziar(produtos: list[Produto]) -> None:
+    carrinho = Carrinho(validar_totais=True)
+    carrinho.adicionar(produtos[1], 3)
+    carrinho.adicionar(produtos[2], 1)
+    carrinho.remover(produtos[1].sku)
+    carrinho.remover(produtos[2].sku)
+
+    assert carrinho.quantidade_total == 0
+    assert carrinho.valor_bruto == Decimal("0.00")
+    assert carrinho.peso_total == 0.0
+
+    carrinho.adicionar(produtos[3], 2)
+    carrinho.limpar()
+    assert carrinho.quantidade_total == 0
+
+
+def test_peso_incremental_nao_cruza_faixa_de_frete(produtos: list[Produto]) -> None:
+    leve, outro = produtos[0], produtos[6]
+    carrinho = Carrinho(validar_totais=True)
+    for _ in range(30):
+        carrinho.adicionar(leve, 1)
+        carrinho.adicionar(outro, 3)
+        carrinho.remover(outro.sku)
+
+    recem_montado = Carrinho()
+    recem_montado.adicionar(leve, 30)
+    assert carrinho.peso_total == recem_montado.peso_total == 3.0
+    assert TabelaFreteLocal().cotacao("01000-000", "88000-000", carrinho.peso_total) == TabelaFreteLocal().cotacao(
+        "01000-000", "88000-000", 3.0
+    )
+
+
+def test_modo_verificacao_detecta_mutacao_direta(produtos: list[Produto]) -> None:
+    carrinho = Carrinho(validar_totais=True)
+    carrinho.adicionar(produtos[0], 2)
+    carrinho.itens[produtos[0].sku].aumentar(5)
+
+    with pytest.raises(AssertionError):
+        carrinho.valor_bruto
+
+    carrinho.sincronizar_totais()
+    assert carrinho.quantidade_total == 7
+
+
+def test_carrinho_criado_com_itens_inicializa_totais(produtos: list[Produto]) -> None:
+    carrinho = Carrinho()
+    carrinho.adicionar(produtos[4], 3)
+    copia = Carrinho(itens=dict(carrinho.itens), validar_totais=True)
+
+    assert copia.quantidade_total == 3
+    assert copia.valor_bruto == carrinho.valor_bruto
+
+
+def test_versao_muda_a_cada_mutacao(produtos: list[Produto], cupom_valido) -> None:
+    carrinho = Carrinho()
+    versoes = [carrinho.versao]
+
+    carrinho.adicionar(produtos[0], 2)
+    versoes.append(carrinho.versao)
+    carrinho.alterar_quantidade(produtos[0].sku, 1)
+    versoes.append(carrinho.versao)
+    carrinho.registrar_cupom(cupom_valido)
+    versoes.append(carrinho.versao)
+    carrinho.remover(produtos[0].sku)
+    versoes.append(carrinho.versao)
+    carrinho.limpar()
+    versoes.append(carrinho.versao)
+
+    assert versoes == sorted(set(versoes))
+    assert carrinho.quantidade_total == 0
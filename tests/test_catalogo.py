@@ -0,0 +1,105 @@
+import json
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import ProdutoInexistenteError, Produto
+from carrinho.catalogo import Catalogo
+
+CSV = """sku,nome,preco,peso_kg,categoria,ativo
+SKU-001,Notebook Gamer,5200.00,2.8,informatica,true
+SKU-002,Mouse Premium,250.00,0.3,informatica,true
+SKU-003,Monitor 27,1899.90,5.1,informatica,false
+SKU-004,Cafeteira,250.00,2.8,cozinha,true
+SKU-002,Mouse Premium v2,260.00,0.3,informatica,true
+"""
+
+
+@pytest.fixture
+def catalogo(tmp_path) -> Catalogo:
+    arquivo = tmp_path / "produtos.csv"
+    arquivo.write_text(CSV, encoding="utf-8")
+    return Catalogo.carregar(arquivo)
+
+
+def test_carrega_csv_com_lookup_por_sku(catalogo: Catalogo) -> None:
+    assert len(catalogo) == 4
+    assert catalogo.obter("SKU-001").preco == Decimal("5200.00")
+    assert catalogo.obter("SKU-002").nome == "Mouse Premium v2"
+    assert "SKU-003" in catalogo
+    assert catalogo.buscar("SKU-999") is None
+    with pytest.raises(ProdutoInexistenteError):
+        catalogo.obter("SKU-999")
+
+
+def test_indices_por_categoria_e_ativo(catalogo: Catalogo) -> None:
+    assert [p.sku for p in catalogo.por_categoria("informatica")] == ["SKU-001", "SKU-002", "SKU-003"]
+    assert [p.sku for p in catalogo.por_categoria("informatica", somente_ativos=True)] == ["SKU-001", "SKU-002"]
+    assert catalogo.por_categoria("jardim") == []
+    assert sorted(p.sku for p in catalogo.ativos()) == ["SKU-001", "SKU-002", "SKU-004"]
+    assert not catalogo.esta_ativo("SKU-003")
+
+
+def test_busca_por_prefixo_de_nome(catalogo: Catalogo) -> None:
+    assert [p.sku for p in catalogo.buscar_por_prefixo("mo")] == ["SKU-003", "SKU-002"]
+    assert [p.sku for p in catalogo.buscar_por_prefixo("MO", limite=1)] == ["SKU-003"]
+    assert catalogo.buscar_por_prefixo("zz") == []
+
+
+def test_valores_repetidos_sao_compartilhados(catalogo: Catalogo) -> None:
+    notebook, cafeteira = catalogo.obter("SKU-001"), catalogo.obter("SKU-004")
+    mouse = catalogo.obter("SKU-002")
+
+    assert notebook.peso_kg is cafeteira.peso_kg
+    assert notebook.categoria is mouse.categoria
+    assert catalogo.obter("SKU-003").preco is not mouse.preco
+    with pytest.raises(AttributeError):
+        notebook.preco = Decimal("1.00")  # type: ignore[misc]
+
+
+def test_carrega_json_lines(tmp_path) -> None:
+    arquivo = tmp_path / "produtos.jsonl"
+    registros = [
+        {"sku": "A", "nome": "Caneta", "preco": "2.50", "peso_kg": 0.01},
+        {"sku": "B", "nome": "Caderno", "preco": "15.00", "peso_kg": 0.4, "categoria": "papelaria", "ativo": False},
+    ]
+    arquivo.write_text("\n".join(json.dumps(r) for r in registros) + "\n", encoding="utf-8")
+
+    catalogo = Catalogo.carregar(arquivo)
+
+    assert catalogo.obter("A").categoria == "geral"
+    assert catalogo.obter("B").ativo is False
+    assert catalogo.categorias == ("geral", "papelaria")
+
+
+def test_ativo_em_branco_no_csv_vale_como_ativo(tmp_path) -> None:
+    arquivo = tmp_path / "produtos.csv"
+    arquivo.write_text(
+        "sku,nome,preco,peso_kg,ativo\nA,Caneta,2.50,0.01,\nB,Caderno,15.00,0.4, \nC,Lápis,1.00,0.01,false\n",
+        encoding="utf-8",
+    )
+
+    catalogo = Catalogo.carregar(arquivo)
+
+    assert [catalogo.esta_ativo(sku) for sku in "ABC"] == [True, True, False]
+
+
+def test_ativo_ausente_nulo_ou_em_branco_no_jsonl_vale_como_ativo(tmp_path) -> None:
+    arquivo = tmp_path / "produtos.jsonl"
+    registros = [
+        {"sku": "A", "nome": "Caneta", "preco": "2.50", "peso_kg": 0.01},
+        {"sku": "B", "nome": "Caderno", "preco": "15.00", "peso_kg": 0.4, "ativo": ""},
+        {"sku": "C", "nome": "Lápis", "preco": "1.00", "peso_kg": 0.01, "ativo": None},
+        {"sku": "D", "nome": "Borracha", "preco": "1.00", "peso_kg": 0.01, "ativo": "false"},
+    ]
+    arquivo.write_text("\n".join(json.dumps(r) for r in registros) + "\n", encoding="utf-8")
+
+    catalogo = Catalogo.carregar(arquivo)
+
+    assert [catalogo.esta_ativo(sku) for sku in "ABCD"] == [True, True, True, False]
+
+
+def test_catalogo_a_partir_de_produtos() -> None:
+    produtos = [Produto(sku=f"P{i}", nome=f"Item {i}", preco=Decimal("1.00"), peso_kg=1.0) for i in range(3)]
+    catalogo = Catalogo(produtos)
+
+    assert [p.sku for p in catalogo] == ["P0", "P1", "P2"]
+    assert catalogo.obter("P0").preco is catalogo.obter("P2").preco
@@ -0,0 +1,62 @@
+import multiprocessing
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import ProdutoInexistenteError, Produto
+from carrinho.catalogo_colunar import CatalogoColunar, exportar_colunar
+
+PRODUTOS = [
+    Produto(sku="SKU-010", nome="Cafeteira Elétrica", preco=Decimal("349.90"), peso_kg=2.4, categoria="cozinha"),
+    Produto(sku="SKU-002", nome="Mouse Premium", preco=Decimal("250.00"), peso_kg=0.3, categoria="informatica"),
+    Produto(sku="SKU-001", nome="Notebook Gamer", preco=Decimal("5200.00"), peso_kg=2.8, categoria="informatica"),
+    Produto(sku="SKU-003", nome="Monitor 27", preco=Decimal("1899.90"), peso_kg=5.1, categoria="informatica", ativo=False),
+]
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = tmp_path / "catalogo.col"
+    assert exportar_colunar(PRODUTOS, caminho) == len(PRODUTOS)
+    return caminho
+
+
+def test_ida_e_volta_preserva_produtos(arquivo) -> None:
+    with CatalogoColunar(arquivo) as catalogo:
+        assert len(catalogo) == 4
+        assert list(catalogo) == sorted(PRODUTOS, key=lambda p: p.sku)
+        assert catalogo.obter("SKU-010") == PRODUTOS[0]
+        assert catalogo[-1].sku == "SKU-010"
+        assert catalogo.categorias == ("informatica", "cozinha")
+
+
+def test_busca_por_sku_e_categoria(arquivo) -> None:
+    with CatalogoColunar(arquivo) as catalogo:
+        assert "SKU-003" in catalogo
+        assert "SKU-004" not in catalogo
+        assert catalogo.buscar("SKU-000") is None
+        with pytest.raises(ProdutoInexistenteError):
+            catalogo.obter("SKU-999")
+        assert [p.sku for p in catalogo.por_categoria("informatica")] == ["SKU-001", "SKU-002", "SKU-003"]
+        assert catalogo.por_categoria("jardim") == []
+        assert catalogo.obter("SKU-003").ativo is False
+
+
+def test_arquivo_invalido(tmp_path) -> None:
+    caminho = tmp_path / "lixo.col"
+    caminho.write_bytes(b"x" * 256)
+    with pytest.raises(ValueError):
+        CatalogoColunar(caminho)
+
+
+def _preco_em_outro_processo(caminho: str, sku: str, fila) -> None:
+    with CatalogoColunar(caminho) as catalogo:
+        fila.put(str(catalogo.obter(sku).preco))
+
+
+def test_leitura_em_outro_processo(arquivo) -> None:
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_preco_em_outro_processo, args=(str(arquivo), "SKU-001", fila))
+    processo.start()
+    processo.join(timeout=30)
+
+    assert fila.get(timeout=5) == "5200.00"
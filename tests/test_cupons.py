@@ -0,0 +1,152 @@
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Cupom, Produto
+from carrinho.cupons import RegistroCupons
+from carrinho.exceptions import (
+    CupomEsgotadoError,
+    CupomExpiradoError,
+    CupomInexistenteError,
+    CupomInvalidoError,
+    EstoqueInsuficienteError,
+)
+from carrinho.frete import TabelaFreteLocal
+from carrinho.repositories import InMemoryEstoqueRepository
+
+HOJE = date(2025, 1, 15)
+
+
+def _cupom(codigo: str, dias: int = 30, percentual: int = 10) -> Cupom:
+    return Cupom(codigo=codigo, percentual=percentual, expira_em=HOJE + timedelta(days=dias))
+
+
+def test_busca_por_codigo() -> None:
+    registro = RegistroCupons(_cupom(f"C{i}") for i in range(1_000))
+
+    assert registro.obter("C500").codigo == "C500"
+    assert registro.buscar("NAO-EXISTE") is None
+    with pytest.raises(CupomInexistenteError):
+        registro.obter("NAO-EXISTE")
+
+
+def test_expurgo_remove_apenas_vencidos() -> None:
+    registro = RegistroCupons([_cupom("ONTEM", -1), _cupom("HOJE", 0), _cupom("AMANHA", 1)])
+    registro.cadastrar(_cupom("RENOVADO", -5))
+    registro.cadastrar(_cupom("RENOVADO", 10))
+
+    assert registro.expurgar(HOJE) == 1
+    assert "ONTEM" not in registro
+    assert all(codigo in registro for codigo in ("HOJE", "AMANHA", "RENOVADO"))
+    assert registro.expurgar(HOJE + timedelta(days=2)) == 2
+    assert len(registro) == 1
+
+
+def test_verificar_valida_cupom_sem_consumir() -> None:
+    registro = RegistroCupons([_cupom("VENCIDO", -1), _cupom("ZERO", percentual=0)])
+    registro.cadastrar(_cupom("UNICO"), limite_global=1)
+
+    with pytest.raises(CupomExpiradoError):
+        registro.verificar("VENCIDO", HOJE)
+    with pytest.raises(CupomInvalidoError):
+        registro.verificar("ZERO", HOJE)
+    registro.verificar("UNICO", HOJE)
+    assert registro.usos("UNICO") == 0
+
+
+def test_limites_global_e_por_cliente() -> None:
+    registro = RegistroCupons()
+    registro.cadastrar(_cupom("PROMO"), limite_global=3, limite_por_cliente=2)
+
+    registro.resgatar("PROMO", HOJE, "ana")
+    registro.resgatar("PROMO", HOJE, "ana")
+    with pytest.raises(CupomEsgotadoError) as erro:
+        registro.resgatar("PROMO", HOJE, "ana")
+    assert erro.value.cliente == "ana"
+    registro.resgatar("PROMO", HOJE, "bia")
+    with pytest.raises(CupomEsgotadoError):
+        registro.resgatar("PROMO", HOJE, "caio")
+    with pytest.raises(ValueError):
+        registro.resgatar("PROMO", HOJE)
+
+    registro.estornar("PROMO", "ana")
+    assert registro.usos("PROMO") == 2
+    assert registro.usos("PROMO", "ana") == 1
+
+
+def test_resgates_concorrentes_respeitam_limite_global() -> None:
+    registro = RegistroCupons()
+    registro.cadastrar(_cupom("RELAMPAGO"), limite_global=100)
+    sucessos = []
+    barreira = threading.Barrier(8)
+
+    def comprar(indice: int) -> None:
+        barreira.wait()
+        for tentativa in range(50):
+            try:
+                registro.resgatar("RELAMPAGO", HOJE, f"cliente-{indice}-{tentativa}")
+            except CupomEsgotadoError:
+                continue
+            sucessos.append(1)
+
+    threads = [threading.Thread(target=comprar, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sucessos) == 100
+    assert registro.usos("RELAMPAGO") == 100
+
+
+@pytest.fixture
+def caneca() -> Produto:
+    return Produto(sku="CANECA", nome="Caneca", preco=Decimal("30.00"), peso_kg=0.5)
+
+
+def _servico(registro: RegistroCupons, quantidade: int = 10) -> CarrinhoService:
+    estoque = InMemoryEstoqueRepository()
+    estoque.registrar("CANECA", quantidade)
+    return CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: HOJE, cupons=registro)
+
+
+def test_servico_resolve_codigo_e_consome_no_checkout(caneca: Produto) -> None:
+    registro = RegistroCupons()
+    registro.cadastrar(_cupom("PRIMEIRA"), limite_por_cliente=1)
+    servico = _servico(registro)
+
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 1)
+    servico.aplicar_cupom(carrinho, "PRIMEIRA", cliente="ana")
+    resumo = servico.finalizar(carrinho, "88000-000", cliente="ana")
+
+    assert resumo.desconto_cupom == Decimal("3.00")
+    assert registro.usos("PRIMEIRA", "ana") == 1
+    with pytest.raises(CupomEsgotadoError):
+        servico.aplicar_cupom(Carrinho(), "PRIMEIRA", cliente="ana")
+
+
+def test_falha_na_baixa_estorna_o_uso(caneca: Produto) -> None:
+    registro = RegistroCupons()
+    registro.cadastrar(_cupom("PROMO"), limite_global=1)
+    servico = _servico(registro, quantidade=1)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 1)
+    servico.aplicar_cupom(carrinho, "PROMO")
+    # Esgota o estoque por fora para a confirmação falhar.
+    servico._estoque.liberar("CANECA", 1)
+    servico._estoque.reservar("CANECA", 1)
+    servico._estoque.confirmar_reserva("CANECA", 1)
+
+    with pytest.raises((EstoqueInsuficienteError, ValueError)):
+        servico.finalizar(carrinho, "88000-000")
+
+    assert registro.usos("PROMO") == 0
+
+
+def test_codigo_sem_registro_falha(caneca: Produto) -> None:
+    servico = CarrinhoService(InMemoryEstoqueRepository(), TabelaFreteLocal(), data_provider=lambda: HOJE)
+
+    with pytest.raises(ValueError):
+        servico.aplicar_cupom(Carrinho(), "PROMO")
@@ -1,15 +1,80 @@
-import time
+import os
+import tracemalloc
 import pytest  # type: ignore[import]
-from carrinho import Carrinho, CarrinhoService
+from carrinho.benchmark import BENCHMARKS, carregar_baseline, comparar, executar_suite
+from carrinho.catalogo import Catalogo, produto_de_registro
+
+# As medições de desempenho ficam em carrinho.benchmark; aqui só se verifica
+# o que pode ser verificado na máquina de quem roda os testes: percentis
+# coerentes, a baseline quando CARRINHO_BENCH_BASELINE aponta para uma gerada
+# na mesma máquina, e relações entre cenários que não dependem do hardware.
+
+
+@pytest.mark.slow
+def test_suite_de_benchmarks() -> None:
+    resultados = executar_suite(aquecimento=1, repeticoes=5)
+
+    for valores in resultados.values():
+        assert 0 < valores["p50"] <= valores["p95"] <= valores["p99"]
+    baseline = os.environ.get("CARRINHO_BENCH_BASELINE")
+    if baseline:
+        tolerancia = float(os.environ.get("CARRINHO_BENCH_TOLERANCIA", "25"))
+        assert comparar(carregar_baseline(baseline), resultados, tolerancia=tolerancia) == []
+
 
 @pytest.mark.slow
-def test_calculo_resumo_eh_rapido(service: CarrinhoService, carrinho: Carrinho, produto_padrao) -> None:
-    for _ in range(3):
-        service.adicionar_item(carrinho, produto_padrao, 1)
+@pytest.mark.parametrize(
+    ("medido", "referencia", "fator"),
+    [
+        ("resumo.memorizado", "resumo.linhas_100", 1),
+        ("frete.cotacao_cache", "frete.cotacao", 1),
+        ("precificacao.lote_1000", "precificacao.escalar_1000", 1),
+        # Abrir só lê o cabeçalho, independentemente do número de SKUs.
+        ("catalogo_colunar.abertura_200000", "catalogo_colunar.abertura_2000", 5),
+        # Acesso por dicionário; a diferença que sobra vem do cache de CPU.
+        ("cupom.resgate_300k", "cupom.resgate_1k", 5),
+        # O custo fixo é codificar o registro; o fsync é amortizado pelo grupo.
+        ("estoque.wal_grupo", "estoque.memoria", 20),
+        # Busca binária: 500 vezes mais faixas custam poucos níveis a mais.
+        ("frete.tabela_cep_30000", "frete.tabela_cep_60", 3),
+        ("eventos.reconstrucao_snapshot", "eventos.reconstrucao_log", 1),
+    ],
+)
+def test_relacao_entre_benchmarks(medido: str, referencia: str, fator: float) -> None:
+    resultados = executar_suite(benchmarks={nome: BENCHMARKS[nome] for nome in (medido, referencia)})
+
+    assert resultados[medido]["p50"] <= fator * resultados[referencia]["p50"]
+
+
+@pytest.mark.slow
+def test_indices_do_catalogo_custam_menos_que_metade_dos_produtos() -> None:
+    quantidade = 50_000
+    categorias = [f"categoria-{i}" for i in range(200)]
+
+    def registros():
+        for indice in range(quantidade):
+            yield produto_de_registro(
+                {
+                    "sku": f"SKU-{indice:07d}",
+                    "nome": f"Produto {indice}",
+                    "preco": f"{(indice % 5_000) + 1}.90",
+                    "peso_kg": (indice % 50 + 1) / 10,
+                    "categoria": categorias[indice % len(categorias)],
+                    "ativo": indice % 10 != 0,
+                }
+            )
+
+    def memoria(montar) -> int:
+        tracemalloc.start()
+        try:
+            estrutura = montar(registros())
+            atual, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(estrutura) == quantidade
+        return atual
 
-    inicio = time.perf_counter()
-    resumo = service.calcular_resumo(carrinho, "88000-000")
-    duracao = time.perf_counter() - inicio
+    so_produtos = memoria(lambda produtos: {produto.sku: produto for produto in produtos})
+    catalogo = memoria(Catalogo)
 
-    assert duracao < 0.2
-    assert resumo.total > 0
+    assert catalogo <= 1.5 * so_produtos
@@ -0,0 +1,57 @@
+import pickle
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho.dinheiro import Dinheiro
+
+
+@pytest.mark.parametrize(
+    "entrada, centavos",
+    [(Decimal("12.345"), 1235), (Decimal("12.344"), 1234), ("0.005", 1), (7, 700), (Decimal("-1.005"), -101)],
+)
+def test_construcao_arredonda_half_up(entrada, centavos: int) -> None:
+    assert Dinheiro(entrada).centavos == centavos
+
+
+def test_compatibilidade_com_decimal() -> None:
+    valor = Dinheiro(Decimal("15600.00"))
+
+    assert valor == Decimal("15600.00")
+    assert Decimal("15600") == valor
+    assert hash(valor) == hash(Decimal("15600.00"))
+    assert hash(Dinheiro("0.10")) == hash(Decimal("0.10"))
+    assert valor > 0 and Decimal("1") < valor
+    assert str(valor) == "15600.00"
+    assert str(Dinheiro("-0.05")) == "-0.05"
+    assert valor + Decimal("0.001") == Decimal("15600.001")
+    assert valor.quantize(Decimal("0.01")) is valor
+    assert f"{Dinheiro('3.5'):.1f}" == "3.5"
+
+
+def test_aritmetica_em_centavos() -> None:
+    preco = Dinheiro("19.99")
+
+    assert (preco * 3).centavos == 5997
+    assert (3 * preco) == Decimal("59.97")
+    assert (preco - Dinheiro("0.99") + 1).centavos == 2000
+    assert -preco == Decimal("-19.99")
+    assert sum([preco, preco], Dinheiro()) == Decimal("39.98")
+
+
+@pytest.mark.parametrize(
+    "valor, percentual, esperado",
+    [("0.30", 5, "0.02"), ("0.28", 5, "0.01"), ("15600.00", 15, "2340.00"), ("-0.30", 5, "-0.02"), ("10.00", Decimal("12.5"), "1.25")],
+)
+def test_percentual_half_up(valor: str, percentual, esperado: str) -> None:
+    assert Dinheiro(valor).percentual(percentual) == Decimal(esperado)
+    if isinstance(percentual, int):
+        referencia = (Decimal(valor) * percentual / 100).quantize(Decimal("0.01"), rounding="ROUND_HALF_UP")
+        assert Dinheiro(valor).percentual(percentual) == referencia
+
+
+def test_multiplicar_por_fator_decimal() -> None:
+    assert Dinheiro("10.00").multiplicar(Decimal("0.333")) == Decimal("3.33")
+    assert Dinheiro("10.00").multiplicar(Decimal("0.3335")) == Decimal("3.34")
+
+
+def test_pickle_preserva_valor() -> None:
+    assert pickle.loads(pickle.dumps(Dinheiro("42.42"))) == Dinheiro("42.42")
@@ -0,0 +1,75 @@
+import sys
+import threading
+from typing import Iterator
+import pytest  # type: ignore[import]
+from carrinho.exceptions import EstoqueInsuficienteError
+from carrinho.repositories import ConcurrentEstoqueRepository
+
+
+@pytest.fixture(autouse=True)
+def troca_de_threads_agressiva() -> Iterator[None]:
+    # Força trocas frequentes de thread para expor condições de corrida.
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(anterior)
+
+
+def _executar_em_paralelo(alvo, quantidade_threads: int) -> None:
+    barreira = threading.Barrier(quantidade_threads)
+
+    def corpo() -> None:
+        barreira.wait()
+        alvo()
+
+    threads = [threading.Thread(target=corpo) for _ in range(quantidade_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_reservas_concorrentes_nao_vendem_alem_do_estoque() -> None:
+    repo = ConcurrentEstoqueRepository(listras=8)
+    repo.registrar("SKU-001", 1_000)
+    sucessos = []
+    falhas = []
+
+    def comprar() -> None:
+        for _ in range(300):
+            try:
+                repo.reservar("SKU-001", 1)
+                sucessos.append(1)
+            except EstoqueInsuficienteError:
+                falhas.append(1)
+
+    _executar_em_paralelo(comprar, 8)
+
+    assert len(sucessos) == 1_000
+    assert len(falhas) == 8 * 300 - 1_000
+    assert repo.snapshot()["SKU-001"] == {"disponivel": 0, "reservado": 1_000}
+
+
+def test_reservar_liberar_e_confirmar_preservam_totais() -> None:
+    repo = ConcurrentEstoqueRepository(listras=4)
+    skus = [f"SKU-{i:03d}" for i in range(16)]
+    for sku in skus:
+        repo.registrar(sku, 500)
+
+    def operar() -> None:
+        for rodada in range(200):
+            sku = skus[rodada % len(skus)]
+            repo.reservar(sku, 2)
+            repo.liberar(sku, 1)
+            repo.confirmar_reserva(sku, 1)
+
+    _executar_em_paralelo(operar, 6)
+
+    vendidos = sum(500 - dados["disponivel"] for dados in repo.snapshot().values())
+    assert vendidos == 6 * 200
+    assert all(dados["reservado"] == 0 for dados in repo.snapshot().values())
+
+
+def test_listras_invalidas() -> None:
+    with pytest.raises(ValueError):
+        ConcurrentEstoqueRepository(listras=0)
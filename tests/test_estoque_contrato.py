@@ -0,0 +1,67 @@
+import pytest  # type: ignore[import]
+from carrinho import EstoqueRepository
+from carrinho.estoque_sqlite import SQLiteEstoqueRepository
+from carrinho.exceptions import EstoqueInsuficienteError
+
+
+def test_implementa_protocolo(estoque) -> None:
+    assert isinstance(estoque, EstoqueRepository)
+
+
+def test_reservar_liberar_confirmar(estoque) -> None:
+    estoque.reservar("SKU-001", 5)
+    estoque.liberar("SKU-001", 2)
+    estoque.confirmar_reserva("SKU-001", 3)
+
+    assert estoque.quantidade_disponivel("SKU-001") == 22
+    assert estoque.snapshot()["SKU-001"] == {"disponivel": 22, "reservado": 0}
+
+
+def test_erros_de_estoque(estoque) -> None:
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        estoque.reservar("SKU-002", 11)
+    assert erro.value.disponivel == 10
+    with pytest.raises(EstoqueInsuficienteError):
+        estoque.reservar("SKU-404", 1)
+    with pytest.raises(EstoqueInsuficienteError):
+        estoque.liberar("SKU-002", 1)
+    with pytest.raises(EstoqueInsuficienteError):
+        estoque.confirmar_reserva("SKU-002", 1)
+    with pytest.raises(ValueError):
+        estoque.reservar("SKU-002", 0)
+    with pytest.raises(ValueError):
+        estoque.registrar("SKU-003", -1)
+
+    assert estoque.quantidade_disponivel("SKU-404") == 0
+    assert estoque.snapshot()["SKU-002"] == {"disponivel": 10, "reservado": 0}
+
+
+def test_registrar_reinicia_item(estoque) -> None:
+    estoque.reservar("SKU-001", 5)
+    estoque.registrar("SKU-001", 3)
+
+    assert estoque.snapshot()["SKU-001"] == {"disponivel": 3, "reservado": 0}
+
+
+def test_sqlite_persiste_entre_conexoes(tmp_path) -> None:
+    caminho = str(tmp_path / "estoque.db")
+    with SQLiteEstoqueRepository(caminho) as repo:
+        repo.registrar("SKU-001", 10)
+        repo.reservar_lote({"SKU-001": 4})
+        modo = repo._conexao.execute("PRAGMA journal_mode").fetchone()[0]
+
+    with SQLiteEstoqueRepository(caminho) as reaberto:
+        assert reaberto.snapshot()["SKU-001"] == {"disponivel": 6, "reservado": 4}
+    assert modo == "wal"
+
+
+def test_sqlite_carga_em_massa_e_snapshot_em_paginas() -> None:
+    repo = SQLiteEstoqueRepository()
+    carregados = repo.registrar_em_massa(((f"SKU-{i:06d}", i % 7) for i in range(25_001)), tamanho_lote=10_000)
+
+    linhas = list(repo.iterar_snapshot(tamanho_lote=1_000))
+
+    assert carregados == 25_001
+    assert len(linhas) == 25_001
+    assert [sku for sku, _, _ in linhas] == sorted(sku for sku, _, _ in linhas)
+    assert linhas[13] == ("SKU-000013", 6, 0)
@@ -0,0 +1,211 @@
+import threading
+import time
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Produto
+from carrinho.estoque_expiracao import EstoqueComExpiracao
+from carrinho.exceptions import EstoqueInsuficienteError
+from carrinho.repositories import InMemoryEstoqueRepository
+
+
+class RelogioFalso:
+    def __init__(self) -> None:
+        self.agora = 1_000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+@pytest.fixture
+def relogio() -> RelogioFalso:
+    return RelogioFalso()
+
+
+@pytest.fixture
+def base() -> InMemoryEstoqueRepository:
+    repo = InMemoryEstoqueRepository()
+    repo.registrar("SKU-001", 10)
+    repo.registrar("SKU-002", 10)
+    return repo
+
+
+def test_reserva_abandonada_volta_ao_estoque(base, relogio) -> None:
+    expirados = []
+    estoque = EstoqueComExpiracao(base, ttl=60, relogio=relogio, ao_expirar=lambda d, q: expirados.append((d, q)))
+    estoque.para("carrinho-a").reservar("SKU-001", 4)
+    estoque.para("carrinho-a").reservar("SKU-002", 1)
+
+    relogio.agora += 59
+    assert estoque.expirar() == 0
+    relogio.agora += 2
+    assert estoque.expirar() == 1
+
+    assert base.snapshot()["SKU-001"] == {"disponivel": 10, "reservado": 0}
+    assert expirados == [("carrinho-a", {"SKU-001": 4, "SKU-002": 1})]
+    assert len(estoque) == 0
+
+
+def test_atividade_renova_prazo(base, relogio) -> None:
+    estoque = EstoqueComExpiracao(base, ttl=60, relogio=relogio)
+    dono = estoque.para("carrinho-a")
+    dono.reservar("SKU-001", 2)
+
+    relogio.agora += 50
+    dono.reservar("SKU-001", 1)
+    relogio.agora += 50
+    assert estoque.expirar() == 0
+    assert estoque.reservas_de("carrinho-a") == {"SKU-001": 3}
+
+    relogio.agora += 11
+    assert estoque.expirar() == 1
+
+
+def test_dono_expirado_nao_consome_reserva_alheia(base, relogio) -> None:
+    estoque = EstoqueComExpiracao(base, ttl=60, relogio=relogio)
+    estoque.para("abandonado").reservar("SKU-001", 3)
+    relogio.agora += 61
+    estoque.para("ativo").reservar("SKU-001", 3)
+    estoque.expirar()
+
+    with pytest.raises(EstoqueInsuficienteError):
+        estoque.para("abandonado").confirmar_reserva("SKU-001", 3)
+    assert base.snapshot()["SKU-001"] == {"disponivel": 7, "reservado": 3}
+
+
+def test_service_com_expiracao(base, relogio, frete_api) -> None:
+    estoque = EstoqueComExpiracao(base, ttl=60, relogio=relogio)
+    service = CarrinhoService(base, frete_api, estoque_por_carrinho=estoque.para_carrinho)
+    produto = Produto(sku="SKU-001", nome="Cabo", preco=Decimal("9.90"), peso_kg=0.1)
+    finalizado, abandonado = Carrinho(), Carrinho()
+
+    service.adicionar_item(finalizado, produto, 2)
+    service.adicionar_item(abandonado, produto, 5)
+    service.alterar_quantidade(abandonado, "SKU-001", 4)
+    service.finalizar(finalizado, "88000-000")
+
+    assert estoque.reservas_de(finalizado.identificador) == {}
+    relogio.agora += 120
+    estoque.expirar()
+
+    assert base.snapshot()["SKU-001"] == {"disponivel": 8, "reservado": 0}
+    with pytest.raises(EstoqueInsuficienteError):
+        service.finalizar(abandonado, "88000-000")
+
+
+def test_varredor_em_segundo_plano(base) -> None:
+    estoque = EstoqueComExpiracao(base, ttl=0.05)
+    estoque.para("carrinho").reservar("SKU-002", 6)
+    estoque.iniciar_varredor(intervalo=0.01)
+    try:
+        limite = time.monotonic() + 2
+        while base.quantidade_disponivel("SKU-002") != 10 and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        estoque.parar_varredor()
+
+    assert base.quantidade_disponivel("SKU-002") == 10
+
+
+class _FalhaNaPrimeiraLiberacao:
+    def __init__(self, estoque: InMemoryEstoqueRepository) -> None:
+        self._estoque = estoque
+        self.falhas = 1
+
+    def __getattr__(self, nome: str):
+        return getattr(self._estoque, nome)
+
+    def liberar_lote(self, itens) -> None:
+        if self.falhas:
+            self.falhas -= 1
+            raise RuntimeError("banco indisponível")
+        self._estoque.liberar_lote(itens)
+
+
+def test_falha_ao_liberar_mantem_o_dono_para_nova_tentativa(base, relogio) -> None:
+    estoque = EstoqueComExpiracao(_FalhaNaPrimeiraLiberacao(base), ttl=60, relogio=relogio)
+    estoque.para("carrinho").reservar("SKU-001", 4)
+    relogio.agora += 61
+
+    with pytest.raises(RuntimeError):
+        estoque.expirar()
+    assert estoque.reservas_de("carrinho") == {"SKU-001": 4}
+
+    assert estoque.expirar() == 1
+    assert base.snapshot()["SKU-001"] == {"disponivel": 10, "reservado": 0}
+
+
+def test_falha_ao_liberar_devolve_as_unidades_ao_dono(base, relogio) -> None:
+    estoque = EstoqueComExpiracao(_FalhaNaPrimeiraLiberacao(base), ttl=60, relogio=relogio)
+    dono = estoque.para("carrinho")
+    dono.reservar("SKU-001", 4)
+
+    with pytest.raises(RuntimeError):
+        dono.liberar("SKU-001", 3)
+    assert estoque.reservas_de("carrinho") == {"SKU-001": 4}
+
+    dono.liberar("SKU-001", 3)
+    assert estoque.reservas_de("carrinho") == {"SKU-001": 1}
+    assert base.snapshot()["SKU-001"] == {"disponivel": 9, "reservado": 1}
+
+
+class _EstoqueQueTrava:
+    def __init__(self, estoque: InMemoryEstoqueRepository) -> None:
+        self._estoque = estoque
+        self.dentro = threading.Event()
+        self.soltar = threading.Event()
+
+    def __getattr__(self, nome: str):
+        return getattr(self._estoque, nome)
+
+    def reservar_lote(self, itens) -> None:
+        if "SKU-001" in itens:
+            self.dentro.set()
+            self.soltar.wait(5)
+        self._estoque.reservar_lote(itens)
+
+
+def test_chamada_lenta_ao_estoque_nao_bloqueia_outros_donos(base, relogio) -> None:
+    lento = _EstoqueQueTrava(base)
+    estoque = EstoqueComExpiracao(lento, ttl=60, relogio=relogio)
+    travado = threading.Thread(target=estoque.para("a").reservar, args=("SKU-001", 1))
+    travado.start()
+    try:
+        assert lento.dentro.wait(5)
+        outro = threading.Thread(target=estoque.para("b").reservar, args=("SKU-002", 2))
+        outro.start()
+        outro.join(1)
+        assert not outro.is_alive()
+        assert estoque.reservas_de("b") == {"SKU-002": 2}
+    finally:
+        lento.soltar.set()
+        travado.join()
+
+    assert estoque.reservas_de("a") == {"SKU-001": 1}
+
+
+def test_varredor_sobrevive_a_falhas(base, caplog: pytest.LogCaptureFixture) -> None:
+    estoque = EstoqueComExpiracao(_FalhaNaPrimeiraLiberacao(base), ttl=0.05)
+    estoque.para("carrinho").reservar("SKU-002", 6)
+    estoque.iniciar_varredor(intervalo=0.01)
+    try:
+        limite = time.monotonic() + 2
+        while base.quantidade_disponivel("SKU-002") != 10 and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        estoque.parar_varredor()
+
+    assert base.quantidade_disponivel("SKU-002") == 10
+    assert "Falha ao expirar reservas" in caplog.text
+
+
+def test_renovacoes_nao_incham_o_heap(base, relogio) -> None:
+    estoque = EstoqueComExpiracao(base, ttl=60, relogio=relogio)
+    dono = estoque.para("carrinho")
+    for _ in range(5_000):
+        dono.reservar("SKU-001", 1)
+        dono.liberar("SKU-001", 1)
+        dono.reservar("SKU-002", 1)
+        dono.liberar("SKU-002", 1)
+    dono.reservar("SKU-001", 1)
+
+    assert len(estoque._prazos) < 2_100
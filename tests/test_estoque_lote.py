@@ -0,0 +1,100 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Produto
+from carrinho.exceptions import EstoqueInsuficienteError
+from carrinho.repositories import InMemoryEstoqueRepository
+
+
+@pytest.fixture
+def repo(fabrica_estoque):
+    repositorio = fabrica_estoque()
+    repositorio.registrar("A", 10)
+    repositorio.registrar("B", 5)
+    repositorio.registrar("C", 1)
+    return repositorio
+
+
+def test_reservar_lote_aplica_todos(repo) -> None:
+    repo.reservar_lote({"A": 3, "B": 5})
+
+    assert repo.snapshot()["A"] == {"disponivel": 7, "reservado": 3}
+    assert repo.snapshot()["B"] == {"disponivel": 0, "reservado": 5}
+
+
+def test_reservar_lote_falha_parcial_nao_altera_nada(repo) -> None:
+    antes = repo.snapshot()
+
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        repo.reservar_lote({"A": 3, "B": 2, "C": 2})
+
+    assert erro.value.sku == "C"
+    assert repo.snapshot() == antes
+
+
+def test_reservar_lote_sku_desconhecido(repo) -> None:
+    with pytest.raises(EstoqueInsuficienteError):
+        repo.reservar_lote({"A": 1, "X": 1})
+    assert repo.quantidade_disponivel("A") == 10
+
+
+def test_liberar_e_confirmar_lote(repo) -> None:
+    repo.reservar_lote({"A": 4, "B": 2})
+    repo.liberar_lote({"A": 1})
+    repo.confirmar_lote({"A": 3, "B": 2})
+
+    assert repo.snapshot()["A"] == {"disponivel": 7, "reservado": 0}
+    assert repo.snapshot()["B"] == {"disponivel": 3, "reservado": 0}
+
+
+def test_confirmar_lote_sem_reserva_suficiente_nao_altera_nada(repo) -> None:
+    repo.reservar_lote({"A": 2, "B": 1})
+    antes = repo.snapshot()
+
+    with pytest.raises(EstoqueInsuficienteError):
+        repo.confirmar_lote({"A": 2, "B": 2})
+    assert repo.snapshot() == antes
+
+
+def test_lote_rejeita_quantidade_nao_positiva(repo) -> None:
+    with pytest.raises(ValueError):
+        repo.reservar_lote({"A": 1, "B": 0})
+    assert repo.quantidade_disponivel("A") == 10
+
+
+def test_service_usa_uma_chamada_por_lote(frete_api) -> None:
+    estoque = InMemoryEstoqueRepository()
+    produtos = [
+        Produto(sku=f"SKU-{i:03d}", nome=f"Item {i}", preco=Decimal("10.00"), peso_kg=0.2)
+        for i in range(500)
+    ]
+    for produto in produtos:
+        estoque.registrar(produto.sku, 5)
+    espiao = Mock(wraps=estoque)
+    service = CarrinhoService(espiao, frete_api, data_provider=lambda: date(2025, 1, 15))
+    carrinho = Carrinho()
+
+    service.adicionar_itens(carrinho, [(produto, 2) for produto in produtos])
+    service.finalizar(carrinho, "88000-000")
+
+    assert espiao.reservar_lote.call_count == 1
+    assert espiao.confirmar_lote.call_count == 1
+    espiao.reservar.assert_not_called()
+    espiao.confirmar_reserva.assert_not_called()
+    assert estoque.snapshot()["SKU-042"] == {"disponivel": 3, "reservado": 0}
+
+
+def test_adicionar_itens_agrega_sku_repetido_e_falha_sem_efeito(
+    service: CarrinhoService, carrinho: Carrinho, produto_padrao, estoque
+) -> None:
+    outro = Produto(sku="SKU-002", nome="Mouse", preco=Decimal("99.90"), peso_kg=0.1)
+
+    service.adicionar_itens(carrinho, [(produto_padrao, 2), (outro, 1), (produto_padrao, 3)])
+    assert carrinho.itens["SKU-001"].quantidade == 5
+    assert estoque.quantidade_disponivel("SKU-001") == 20
+
+    with pytest.raises(EstoqueInsuficienteError):
+        service.adicionar_itens(carrinho, [(produto_padrao, 1), (outro, 50)])
+    assert carrinho.quantidade_total == 6
+    assert estoque.quantidade_disponivel("SKU-001") == 20
@@ -0,0 +1,200 @@
+import multiprocessing
+import pickle
+import threading
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, EstoqueRepository, Produto
+from carrinho.estoque_particionado import AnelConsistente, EstoqueParticionado
+from carrinho.exceptions import EstoqueInsuficienteError
+from carrinho.frete import TabelaFreteLocal
+
+SKUS = [f"SKU-{i:05d}" for i in range(20_000)]
+
+
+@pytest.fixture(scope="module")
+def particionado():
+    with EstoqueParticionado(3) as estoque:
+        yield estoque
+
+
+@pytest.fixture
+def estoque(particionado: EstoqueParticionado) -> EstoqueParticionado:
+    for indice in range(12):
+        particionado.registrar(f"P-{indice}", 10)
+    return particionado
+
+
+def test_anel_distribui_e_move_cerca_de_um_enesimo() -> None:
+    quatro = AnelConsistente(range(4))
+    cinco = AnelConsistente(range(5))
+
+    contagem = Counter(quatro.no_de(sku) for sku in SKUS)
+    movidas = [sku for sku in SKUS if quatro.no_de(sku) != cinco.no_de(sku)]
+
+    assert all(abs(quantidade - len(SKUS) / 4) < len(SKUS) * 0.06 for quantidade in contagem.values())
+    assert 0.15 < len(movidas) / len(SKUS) < 0.26
+    assert all(cinco.no_de(sku) == 4 for sku in movidas)
+
+
+def test_anel_e_estavel_entre_instancias() -> None:
+    assert [AnelConsistente(range(3)).no_de(sku) for sku in SKUS[:50]] == [
+        AnelConsistente(range(3)).no_de(sku) for sku in SKUS[:50]
+    ]
+    with pytest.raises(LookupError):
+        AnelConsistente().no_de("x")
+
+
+def test_operacoes_individuais(estoque: EstoqueParticionado) -> None:
+    assert isinstance(estoque, EstoqueRepository)
+    estoque.reservar("P-0", 4)
+    estoque.liberar("P-0", 1)
+    estoque.confirmar_reserva("P-0", 2)
+
+    assert estoque.quantidade_disponivel("P-0") == 7
+    assert estoque.snapshot()["P-0"] == {"disponivel": 7, "reservado": 1}
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        estoque.reservar("P-1", 11)
+    assert erro.value.disponivel == 10
+    with pytest.raises(ValueError):
+        estoque.reservar("P-1", 0)
+
+
+def test_lote_entre_shards_e_tudo_ou_nada(estoque: EstoqueParticionado) -> None:
+    itens = {f"P-{indice}": 2 for indice in range(12)}
+    assert len({estoque.shard_de(sku) for sku in itens}) > 1
+    antes = estoque.snapshot()
+
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        estoque.reservar_lote({**itens, "P-7": 50})
+    assert erro.value.sku == "P-7"
+    assert estoque.snapshot() == antes
+
+    estoque.reservar_lote(itens)
+    with pytest.raises(EstoqueInsuficienteError):
+        estoque.confirmar_lote({**itens, "P-11": 3})
+    assert all(estoque.snapshot()[sku]["reservado"] == 2 for sku in itens)
+
+    estoque.confirmar_lote({sku: 1 for sku in itens})
+    estoque.liberar_lote({sku: 1 for sku in itens})
+    assert all(estoque.snapshot()[sku] == {"disponivel": 9, "reservado": 0} for sku in itens)
+
+
+def test_falha_ao_desfazer_fica_encadeada_no_erro(
+    estoque: EstoqueParticionado, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    itens = {f"P-{indice}": 2 for indice in range(12)}
+    difundir = estoque._difundir
+
+    def desfazer_falha(pedidos):
+        if any(operacao in ("liberar_lote", "abortar") for lote in pedidos.values() for operacao, _ in lote):
+            return {no: [(False, ConnectionError(f"shard {no}"))] for no in pedidos}
+        return difundir(pedidos)
+
+    monkeypatch.setattr(estoque, "_difundir", desfazer_falha)
+
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        estoque.reservar_lote({**itens, "P-7": 50})
+    assert erro.value.sku == "P-7"
+    assert isinstance(erro.value.__context__, ConnectionError)
+    assert "Falha ao desfazer o lote" in erro.value.__notes__[0]
+
+    monkeypatch.setattr(estoque, "_difundir", difundir)
+    estoque.reservar_lote(itens)
+    monkeypatch.setattr(estoque, "_difundir", desfazer_falha)
+    with pytest.raises(EstoqueInsuficienteError) as erro:
+        estoque.liberar_lote({**itens, "P-11": 50})
+    assert isinstance(erro.value.__context__, ConnectionError)
+
+
+def test_liberacoes_concorrentes_entre_shards_nao_aplicam_parcialmente(particionado: EstoqueParticionado) -> None:
+    a = "CONC-A"
+    b = next(f"CONC-{i}" for i in range(100) if particionado.shard_de(f"CONC-{i}") != particionado.shard_de(a))
+    particionado.registrar(a, 1_000)
+    particionado.registrar(b, 1_000)
+    # Cópias têm conexões próprias, como clientes em outros processos.
+    clientes = [pickle.loads(pickle.dumps(particionado)) for _ in range(2)]
+
+    for _ in range(40):
+        particionado.reservar_lote({a: 1, b: 1})
+        sucessos = []
+        barreira = threading.Barrier(len(clientes))
+
+        def liberar(cliente: EstoqueParticionado) -> None:
+            barreira.wait()
+            try:
+                cliente.liberar_lote({a: 1, b: 1})
+                sucessos.append(cliente)
+            except EstoqueInsuficienteError:
+                pass
+
+        threads = [threading.Thread(target=liberar, args=(cliente,)) for cliente in clientes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Cada um pode reter um shard e ambos desistirem, mas nunca metade do lote é aplicada.
+        estado = particionado.snapshot()
+        assert len(sucessos) <= 1
+        assert estado[a] == estado[b] == {"disponivel": 1_000 - 1 + len(sucessos), "reservado": 1 - len(sucessos)}
+        if not sucessos:
+            particionado.liberar_lote({a: 1, b: 1})
+    for cliente in clientes:
+        cliente.fechar()
+
+
+def test_executar_lote_agrupa_pedidos_independentes(estoque: EstoqueParticionado) -> None:
+    erros = estoque.executar_lote([("reservar", "P-0", 1), ("reservar", "P-1", 99), ("reservar", "P-2", 1)])
+
+    assert erros[0] is None and erros[2] is None
+    assert isinstance(erros[1], EstoqueInsuficienteError)
+    assert estoque.snapshot()["P-2"]["reservado"] == 1
+
+
+def _reservar_em_outro_processo(estoque: EstoqueParticionado, fila) -> None:
+    estoque.reservar_lote({"P-3": 2, "P-4": 2})
+    fila.put(estoque.quantidade_disponivel("P-3"))
+
+
+def test_copia_em_outro_processo_usa_os_mesmos_shards(estoque: EstoqueParticionado) -> None:
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_reservar_em_outro_processo, args=(estoque, fila))
+    processo.start()
+    processo.join(timeout=30)
+
+    assert processo.exitcode == 0
+    assert fila.get(timeout=5) == 8
+    assert estoque.snapshot()["P-4"] == {"disponivel": 8, "reservado": 2}
+
+
+def test_adicionar_shard_move_parte_das_chaves() -> None:
+    with EstoqueParticionado(3) as estoque:
+        skus = SKUS[:3_000]
+        estoque.executar_lote([("registrar", sku, 5) for sku in skus])
+        estoque.reservar_lote({sku: 1 for sku in skus[:100]})
+        antes = estoque.snapshot()
+        donos = {sku: estoque.shard_de(sku) for sku in skus}
+
+        novo = estoque.adicionar_shard()
+
+        movidas = [sku for sku in skus if estoque.shard_de(sku) != donos[sku]]
+        assert estoque.snapshot() == antes
+        assert 0.15 < len(movidas) / len(skus) < 0.35
+        assert all(estoque.shard_de(sku) == novo for sku in movidas)
+        estoque.reservar(movidas[0], 1)
+        assert estoque.quantidade_disponivel(movidas[0]) == antes[movidas[0]]["disponivel"] - 1
+
+
+def test_servico_sobre_estoque_particionado(estoque: EstoqueParticionado) -> None:
+    servico = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: date(2025, 1, 15))
+    carrinho = Carrinho()
+    produtos = [Produto(sku=f"P-{i}", nome=f"Item {i}", preco=Decimal("10.00"), peso_kg=0.5) for i in (8, 9, 10)]
+
+    servico.adicionar_itens(carrinho, [(produto, 3) for produto in produtos])
+    servico.finalizar(carrinho, "88000-000")
+
+    assert [estoque.snapshot()[p.sku] for p in produtos] == [{"disponivel": 7, "reservado": 0}] * 3
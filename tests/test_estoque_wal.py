@@ -0,0 +1,230 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest  # type: ignore[import]
+from carrinho import EstoqueRepository
+from carrinho.estoque_wal import EstoqueDuravel
+from carrinho.exceptions import EstoqueInsuficienteError
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _logs(diretorio: Path) -> list:
+    return sorted(diretorio.glob("estoque-*.wal"))
+
+
+def test_estado_sobrevive_a_reabertura(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path) as estoque:
+        assert isinstance(estoque, EstoqueRepository)
+        estoque.registrar("A", 10)
+        estoque.registrar("B", 5)
+        estoque.reservar("A", 4)
+        estoque.liberar("A", 1)
+        estoque.confirmar_reserva("A", 2)
+        estoque.reservar_lote({"A": 1, "B": 2})
+        estoque.confirmar_lote({"B": 1})
+        esperado = estoque.snapshot()
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.snapshot() == esperado
+        assert reaberto.recuperacao.registros_reaplicados == 7
+
+
+def test_operacoes_rejeitadas_nao_vao_para_o_log(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path) as estoque:
+        estoque.registrar("A", 2)
+        with pytest.raises(EstoqueInsuficienteError):
+            estoque.reservar_lote({"A": 1, "Z": 1})
+        with pytest.raises(ValueError):
+            estoque.reservar("A", 0)
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.recuperacao.registros_reaplicados == 1
+        assert reaberto.snapshot() == {"A": {"disponivel": 2, "reservado": 0}}
+
+
+def test_itens_fora_do_formato_nao_alteram_memoria_nem_log(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path) as estoque:
+        estoque.registrar("A", 5)
+        with pytest.raises(ValueError):
+            estoque.registrar("X" * 70_000, 1)
+        with pytest.raises(ValueError):
+            estoque.reservar_lote({"A": 1, "Ç" * 40_000: 1})
+        with pytest.raises(ValueError):
+            estoque.registrar("B", 2**63)
+        esperado = estoque.snapshot()
+        assert esperado == {"A": {"disponivel": 5, "reservado": 0}}
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.snapshot() == esperado
+        assert reaberto.recuperacao.registros_reaplicados == 1
+
+
+def test_lote_com_mais_de_65535_itens_e_recuperado(tmp_path: Path) -> None:
+    skus = [f"S{indice}" for indice in range(70_000)]
+    with EstoqueDuravel(tmp_path, duravel_ao_retornar=False) as estoque:
+        for sku in skus:
+            estoque.registrar(sku, 3)
+        estoque.reservar_lote({sku: 2 for sku in skus})
+        estoque.liberar_lote({sku: 1 for sku in skus})
+        esperado = estoque.snapshot()
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.snapshot() == esperado
+    assert esperado[skus[-1]] == {"disponivel": 2, "reservado": 1}
+
+
+def test_compactacao_gera_snapshot_e_nova_geracao(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path, registros_por_snapshot=10) as estoque:
+        for indice in range(5):
+            estoque.registrar(f"SKU-{indice}", 100)
+        for _ in range(12):
+            estoque.reservar("SKU-0", 1)
+        esperado = estoque.snapshot()
+
+    assert (tmp_path / "estoque.snap").exists()
+    assert len(_logs(tmp_path)) == 1
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.snapshot() == esperado
+        assert reaberto.recuperacao.geracao_snapshot >= 2
+        assert reaberto.recuperacao.registros_reaplicados < 17
+
+
+def test_cauda_truncada_e_descartada(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path) as estoque:
+        estoque.registrar("A", 10)
+        estoque.reservar("A", 3)
+    log = _logs(tmp_path)[-1]
+    tamanho_integro = log.stat().st_size
+    with open(log, "ab") as arquivo:
+        arquivo.write(b"\x01\x02\x03\x04\x02\x10\x00")  # escrita interrompida no meio
+
+    reaberto = EstoqueDuravel(tmp_path)
+
+    assert reaberto.snapshot() == {"A": {"disponivel": 7, "reservado": 3}}
+    assert reaberto.recuperacao.bytes_descartados == 7
+    assert log.stat().st_size == tamanho_integro
+    reaberto.reservar("A", 1)
+    reaberto.fechar()
+    with EstoqueDuravel(tmp_path) as final:
+        assert final.snapshot() == {"A": {"disponivel": 6, "reservado": 4}}
+
+
+def test_compactacao_interrompida_antes_do_snapshot(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path) as estoque:
+        estoque.registrar("A", 10)
+        estoque.compactar()
+        estoque.reservar("A", 2)
+    # Simula queda entre abrir a geração nova e gravar o snapshot dela.
+    geracao = int(_logs(tmp_path)[-1].stem.split("-")[1])
+    (tmp_path / f"estoque-{geracao + 1:010d}.wal").write_bytes(b"")
+
+    reaberto = EstoqueDuravel(tmp_path)
+    reaberto.reservar("A", 1)
+    reaberto.fechar()
+
+    with EstoqueDuravel(tmp_path) as final:
+        assert final.snapshot() == {"A": {"disponivel": 7, "reservado": 3}}
+
+
+def test_queda_do_processo_preserva_operacoes_confirmadas(tmp_path: Path) -> None:
+    # O filho confirma operações e morre com os._exit, sem fechar nada.
+    script = textwrap.dedent(
+        f"""
+        import os, sys
+        sys.path.insert(0, {str(SRC)!r})
+        from carrinho.estoque_wal import EstoqueDuravel
+        estoque = EstoqueDuravel({str(tmp_path)!r}, registros_por_snapshot=50)
+        for indice in range(20):
+            estoque.registrar(f"SKU-{{indice}}", 10)
+        for indice in range(100):
+            estoque.reservar(f"SKU-{{indice % 20}}", 1)
+        estoque.confirmar_lote({{"SKU-0": 2, "SKU-1": 1}})
+        print("ok", flush=True)
+        os._exit(1)
+        """
+    )
+    processo = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    assert processo.stdout.strip() == "ok", processo.stderr
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        estado = reaberto.snapshot()
+
+    assert estado["SKU-0"] == {"disponivel": 5, "reservado": 3}
+    assert estado["SKU-1"] == {"disponivel": 5, "reservado": 4}
+    assert estado["SKU-19"] == {"disponivel": 5, "reservado": 5}
+
+
+def test_group_commit_com_varias_threads(tmp_path: Path) -> None:
+    estoque = EstoqueDuravel(tmp_path)
+    for indice in range(8):
+        estoque.registrar(f"SKU-{indice}", 1_000)
+
+    def trabalhar(indice: int) -> None:
+        for _ in range(100):
+            estoque.reservar(f"SKU-{indice}", 1)
+            estoque.liberar(f"SKU-{indice}", 1)
+        estoque.reservar(f"SKU-{indice}", 7)
+
+    threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    estoque.fechar()
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert all(v == {"disponivel": 993, "reservado": 7} for v in reaberto.snapshot().values())
+        assert reaberto.recuperacao.registros_reaplicados == 8 + 8 * 201
+
+
+def test_modo_em_grupo_sincroniza_sob_demanda(tmp_path: Path) -> None:
+    estoque = EstoqueDuravel(tmp_path, duravel_ao_retornar=False, intervalo_fsync=3600)
+    estoque.registrar("A", 5)
+    estoque.reservar("A", 1)
+    assert _logs(tmp_path)[-1].stat().st_size == 0
+
+    estoque.sincronizar()
+
+    with EstoqueDuravel(tmp_path) as reaberto:
+        assert reaberto.snapshot() == {"A": {"disponivel": 4, "reservado": 1}}
+    estoque.fechar()
+    with pytest.raises(ValueError):
+        estoque.reservar("A", 1)
+
+
+def test_modo_em_grupo_grava_sozinho_apos_o_intervalo(tmp_path: Path) -> None:
+    with EstoqueDuravel(tmp_path, duravel_ao_retornar=False, intervalo_fsync=0.01) as estoque:
+        estoque.registrar("A", 5)
+        estoque.reservar("A", 1)
+        limite = time.monotonic() + 2
+        while _logs(tmp_path)[-1].stat().st_size == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+
+        with EstoqueDuravel(tmp_path) as reaberto:
+            assert reaberto.snapshot() == {"A": {"disponivel": 4, "reservado": 1}}
+
+
+def test_falha_de_fsync_interrompe_o_estoque(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    estoque = EstoqueDuravel(tmp_path)
+    estoque.registrar("A", 5)
+
+    def falhar(_: int) -> None:
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(os, "fsync", falhar)
+    with pytest.raises(RuntimeError) as erro:
+        estoque.reservar("A", 1)
+    assert isinstance(erro.value.__cause__, OSError)
+
+    monkeypatch.undo()
+    with pytest.raises(RuntimeError):
+        estoque.reservar("A", 1)
+    with pytest.raises(RuntimeError):
+        estoque.sincronizar()
+    estoque.fechar()
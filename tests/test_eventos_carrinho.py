@@ -0,0 +1,237 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Cupom, Produto
+from carrinho.eventos_carrinho import DiarioCarrinhos
+from carrinho.frete import TabelaFreteLocal
+from carrinho.repositories import InMemoryEstoqueRepository
+
+HOJE = date(2025, 1, 15)
+
+
+@pytest.fixture
+def produtos() -> list[Produto]:
+    return [
+        Produto(sku=f"SKU-{i}", nome=f"Produto {i}", preco=Decimal("10.50") + i, peso_kg=0.25 * (i + 1), categoria="casa")
+        for i in range(5)
+    ]
+
+
+def _servico(diario: DiarioCarrinhos, produtos: list[Produto]) -> CarrinhoService:
+    estoque = InMemoryEstoqueRepository()
+    for produto in produtos:
+        estoque.registrar(produto.sku, 1_000)
+    return CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: HOJE, eventos=diario)
+
+
+def _estado(carrinho: Carrinho) -> tuple:
+    return (
+        [(sku, item.produto, item.quantidade) for sku, item in carrinho.itens.items()],
+        carrinho.cupom,
+        carrinho.valor_bruto,
+    )
+
+
+def test_servico_registra_e_reconstroi(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path) as diario:
+        servico = _servico(diario, produtos)
+        carrinho = Carrinho(identificador="c1")
+        servico.adicionar_item(carrinho, produtos[0], 2)
+        servico.adicionar_itens(carrinho, [(produtos[1], 1), (produtos[2], 3), (produtos[1], 1)])
+        servico.alterar_quantidade(carrinho, "SKU-2", 1)
+        servico.remover_item(carrinho, "SKU-0")
+        servico.aplicar_cupom(carrinho, Cupom("DEZ", 10, HOJE + timedelta(days=5)))
+
+    reconstruido = DiarioCarrinhos(tmp_path).reconstruir("c1")
+
+    assert _estado(reconstruido) == _estado(carrinho)
+    assert reconstruido.identificador == "c1"
+
+
+def test_eventos_sao_compactos(tmp_path: Path, produtos: list[Produto]) -> None:
+    diario = DiarioCarrinhos(tmp_path)
+    carrinho = Carrinho(identificador="c1")
+    diario.registrar_adicao(carrinho, produtos[0], 1)
+    log = tmp_path / "c1.log"
+    tamanho = log.stat().st_size
+
+    diario.registrar_adicao(carrinho, produtos[0], 1)
+    diario.registrar_alteracao(carrinho, "SKU-0", 5)
+    diario.registrar_remocao(carrinho, "SKU-0")
+    diario.fechar()
+
+    assert log.stat().st_size - tamanho == 9 + 9 + 5
+
+
+def test_snapshot_periodico_reinicia_log(tmp_path: Path, produtos: list[Produto]) -> None:
+    diario = DiarioCarrinhos(tmp_path, eventos_por_snapshot=10)
+    servico = _servico(diario, produtos)
+    carrinho = Carrinho(identificador="c1")
+    for indice in range(23):
+        servico.adicionar_item(carrinho, produtos[indice % 5], 1)
+    diario.fechar()
+
+    novo = DiarioCarrinhos(tmp_path, eventos_por_snapshot=10)
+
+    assert (tmp_path / "c1.snap").exists()
+    assert novo.eventos_pendentes("c1") == 3
+    assert _estado(novo.reconstruir("c1")) == _estado(carrinho)
+
+
+def test_continua_apos_reabrir(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path, eventos_por_snapshot=4) as diario:
+        carrinho = Carrinho(identificador="c1")
+        for produto in produtos[:3]:
+            carrinho.adicionar(produto, 1)
+            diario.registrar_adicao(carrinho, produto, 1)
+
+    with DiarioCarrinhos(tmp_path, eventos_por_snapshot=4) as diario:
+        carrinho = diario.reconstruir("c1")
+        carrinho.adicionar(produtos[1], 2)
+        diario.registrar_adicao(carrinho, produtos[1], 2)
+        carrinho.alterar_quantidade("SKU-0", 7)
+        diario.registrar_alteracao(carrinho, "SKU-0", 7)
+
+    assert _estado(DiarioCarrinhos(tmp_path).reconstruir("c1")) == _estado(carrinho)
+
+
+def test_finalizar_registra_limpeza(tmp_path: Path, produtos: list[Produto]) -> None:
+    diario = DiarioCarrinhos(tmp_path)
+    servico = _servico(diario, produtos)
+    carrinho = Carrinho(identificador="c1")
+    servico.adicionar_item(carrinho, produtos[0], 1)
+    servico.aplicar_cupom(carrinho, Cupom("DEZ", 10, HOJE + timedelta(days=5)))
+
+    servico.finalizar(carrinho, "88000-000")
+
+    reconstruido = DiarioCarrinhos(tmp_path).reconstruir("c1")
+    assert reconstruido.esta_vazio()
+    assert reconstruido.cupom is None
+
+
+def test_produto_alterado_e_regravado(tmp_path: Path, produtos: list[Produto]) -> None:
+    diario = DiarioCarrinhos(tmp_path)
+    carrinho = Carrinho(identificador="c1")
+    remarcado = Produto(sku="SKU-0", nome="Produto 0", preco=Decimal("99.90"), peso_kg=0.25)
+    carrinho.adicionar(produtos[0], 1)
+    diario.registrar_adicao(carrinho, produtos[0], 1)
+    carrinho.remover("SKU-0")
+    diario.registrar_remocao(carrinho, "SKU-0")
+    carrinho.adicionar(remarcado, 1)
+    diario.registrar_adicao(carrinho, remarcado, 1)
+    diario.fechar()
+
+    assert DiarioCarrinhos(tmp_path).reconstruir("c1").valor_bruto == Decimal("99.90")
+
+
+def test_evento_incompleto_no_fim_e_cortado(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path) as diario:
+        carrinho = Carrinho(identificador="c1")
+        carrinho.adicionar(produtos[0], 2)
+        diario.registrar_adicao(carrinho, produtos[0], 2)
+    log = tmp_path / "c1.log"
+    integro = log.stat().st_size
+    with open(log, "ab") as arquivo:
+        arquivo.write(b"\x02\x00\x00")
+
+    with DiarioCarrinhos(tmp_path) as diario:
+        assert diario.reconstruir("c1").quantidade_total == 2
+        carrinho = Carrinho(identificador="c1")
+        diario.registrar_alteracao(carrinho, "SKU-0", 4)
+
+    assert log.stat().st_size == integro + 9
+    assert DiarioCarrinhos(tmp_path).reconstruir("c1").quantidade_total == 4
+
+
+def test_log_anterior_ao_snapshot_e_descartado(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path) as diario:
+        carrinho = Carrinho(identificador="c1")
+        carrinho.adicionar(produtos[0], 1)
+        diario.registrar_adicao(carrinho, produtos[0], 1)
+        log_antigo = (tmp_path / "c1.log").read_bytes()
+        diario.salvar_snapshot(carrinho)
+    # Simula queda entre gravar o snapshot e reiniciar o log.
+    (tmp_path / "c1.log").write_bytes(log_antigo)
+
+    assert DiarioCarrinhos(tmp_path).reconstruir("c1").quantidade_total == 1
+
+
+def test_identificador_com_caracteres_especiais(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path) as diario:
+        carrinho = Carrinho(identificador="../cliente:42")
+        diario.registrar_adicao(carrinho, produtos[0], 1)
+
+        assert all(caminho.parent == tmp_path for caminho in tmp_path.iterdir())
+        assert diario.reconstruir("../cliente:42").quantidade_total == 1
+
+
+def test_limpeza_fecha_o_log_e_abertos_sao_limitados(tmp_path: Path, produtos: list[Produto]) -> None:
+    with DiarioCarrinhos(tmp_path, fluxos_abertos=3) as diario:
+        servico = _servico(diario, produtos)
+        carrinhos = [Carrinho(identificador=f"c{i}") for i in range(10)]
+        for carrinho in carrinhos:
+            servico.adicionar_item(carrinho, produtos[0], 1)
+        assert len(diario._fluxos) == 3
+
+        servico.finalizar(carrinhos[-1], "88000-000")
+        assert "c9" not in diario._fluxos
+
+        servico.adicionar_item(carrinhos[0], produtos[1], 2)
+
+    assert _estado(DiarioCarrinhos(tmp_path).reconstruir("c0")) == _estado(carrinhos[0])
+    assert DiarioCarrinhos(tmp_path).reconstruir("c9").esta_vazio()
+
+
+def test_carrinho_com_itens_anteriores_ao_diario(tmp_path: Path, produtos: list[Produto]) -> None:
+    estoque = InMemoryEstoqueRepository()
+    for produto in produtos:
+        estoque.registrar(produto.sku, 1_000)
+    carrinho = Carrinho(identificador="c1")
+    CarrinhoService(estoque, TabelaFreteLocal()).adicionar_itens(carrinho, [(produtos[0], 2), (produtos[1], 1)])
+
+    with DiarioCarrinhos(tmp_path) as diario:
+        servico = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: HOJE, eventos=diario)
+        servico.alterar_quantidade(carrinho, "SKU-0", 5)
+        servico.remover_item(carrinho, "SKU-1")
+        servico.adicionar_item(carrinho, produtos[2], 1)
+
+    assert _estado(DiarioCarrinhos(tmp_path).reconstruir("c1")) == _estado(carrinho)
+
+
+@pytest.mark.parametrize("mutacao", ["adicionar", "cupom"])
+def test_primeira_mutacao_de_carrinho_preexistente_vira_snapshot(
+    tmp_path: Path, produtos: list[Produto], mutacao: str
+) -> None:
+    estoque = InMemoryEstoqueRepository()
+    for produto in produtos:
+        estoque.registrar(produto.sku, 1_000)
+    carrinho = Carrinho(identificador="c1")
+    CarrinhoService(estoque, TabelaFreteLocal()).adicionar_itens(carrinho, [(produtos[0], 2), (produtos[1], 1)])
+
+    with DiarioCarrinhos(tmp_path) as diario:
+        servico = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: HOJE, eventos=diario)
+        if mutacao == "adicionar":
+            servico.adicionar_item(carrinho, produtos[3], 1)
+        else:
+            servico.aplicar_cupom(carrinho, Cupom("DEZ", 10, HOJE + timedelta(days=5)))
+
+    assert _estado(DiarioCarrinhos(tmp_path).reconstruir("c1")) == _estado(carrinho)
+
+
+def test_eventos_no_log_sao_compactos(tmp_path: Path, produtos: list[Produto]) -> None:
+    eventos = 1_000
+    with DiarioCarrinhos(tmp_path, eventos_por_snapshot=eventos + 1) as diario:
+        carrinho = Carrinho(identificador="compacto")
+        for indice in range(eventos):
+            if indice % 4 == 3:
+                sku = produtos[(indice - 3) % len(produtos)].sku
+                carrinho.alterar_quantidade(sku, 1 + indice % 7)
+                diario.registrar_alteracao(carrinho, sku, 1 + indice % 7)
+            else:
+                produto = produtos[indice % len(produtos)]
+                carrinho.adicionar(produto, 1)
+                diario.registrar_adicao(carrinho, produto, 1)
+
+    assert (tmp_path / "compacto.log").stat().st_size / eventos < 12
@@ -31,3 +31,26 @@ def test_alterar_quantidade_para_zero_falha(produto_padrao, carrinho: Carrinho)
 
     with pytest.raises(ValueError):
         carrinho.alterar_quantidade(produto_padrao.sku, 0)
+
+
+def test_excecoes_sobrevivem_a_pickle() -> None:
+    import pickle
+    from carrinho.exceptions import (
+        CupomEsgotadoError,
+        CupomInexistenteError,
+        EstoqueInsuficienteError,
+        FreteIndisponivelError,
+    )
+
+    erros = [
+        EstoqueInsuficienteError("SKU-001", 5, 2),
+        CupomExpiradoError("X", date(2025, 1, 1), date(2025, 1, 2)),
+        FreteIndisponivelError("88000-000"),
+        CupomInexistenteError("NADA"),
+        CupomEsgotadoError("X", 1, "cliente-1"),
+    ]
+    for erro in erros:
+        copia = pickle.loads(pickle.dumps(erro))
+        assert type(copia) is type(erro)
+        assert str(copia) == str(erro)
+        assert vars(copia) == vars(erro)
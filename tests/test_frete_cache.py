@@ -0,0 +1,137 @@
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import Mock
+import pytest  # type: ignore[import]
+from carrinho.exceptions import FreteIndisponivelError
+from carrinho.frete import Frete, FreteAPI, TabelaFreteLocal
+from carrinho.frete_cache import FreteComCache
+from carrinho.frete_tabela import TabelaFreteCEP
+
+
+class RelogioFalso:
+    def __init__(self) -> None:
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+@pytest.fixture
+def relogio() -> RelogioFalso:
+    return RelogioFalso()
+
+
+@pytest.fixture
+def backend() -> Mock:
+    return Mock(spec=FreteAPI, wraps=TabelaFreteLocal())
+
+
+def test_mesma_faixa_reaproveita_cotacao(backend: Mock, relogio: RelogioFalso) -> None:
+    cache = FreteComCache(backend, faixa_peso=TabelaFreteLocal.chave_faixa, relogio=relogio)
+
+    primeira = cache.cotacao("01000-000", "88000-000", 1.2)
+    segunda = cache.cotacao("01000-000", "88000-000", 2.9)
+
+    assert primeira == segunda == TabelaFreteLocal().cotacao("01000-000", "88000-000", 2.9)
+    assert backend.cotacao.call_count == 1
+    estatisticas = cache.estatisticas
+    assert (estatisticas.acertos, estatisticas.falhas) == (1, 1)
+
+
+def test_faixa_da_tabela_local_respeita_prazo(backend: Mock, relogio: RelogioFalso) -> None:
+    cache = FreteComCache(backend, faixa_peso=TabelaFreteLocal.chave_faixa, relogio=relogio)
+    tabela = TabelaFreteLocal()
+
+    for peso in (4.0, 5.5, 9.9, 10.0, 14.0, 25.0):
+        assert cache.cotacao("01000-000", "88000-000", peso) == tabela.cotacao("01000-000", "88000-000", peso)
+
+
+def test_padrao_usa_peso_exato_com_qualquer_backend(relogio: RelogioFalso) -> None:
+    tabela = TabelaFreteCEP(
+        [
+            {"cep_inicio": "00000-000", "cep_fim": "99999-999", "peso_ate": "1", "valor": "10.00", "prazo_dias": "2"},
+            {"cep_inicio": "00000-000", "cep_fim": "99999-999", "peso_ate": "3", "valor": "50.00", "prazo_dias": "2"},
+        ]
+    )
+    cache = FreteComCache(tabela, relogio=relogio)
+
+    assert cache.cotacao("01000-000", "88000-000", 0.5).valor == Decimal("10.00")
+    assert cache.cotacao("01000-000", "88000-000", 2.0).valor == Decimal("50.00")
+    assert cache.cotacao("01000-000", "88000-000", 0.5).valor == Decimal("10.00")
+    assert cache.estatisticas.acertos == 1
+
+
+def test_prefixo_de_cep_agrupa_destinos(backend: Mock, relogio: RelogioFalso) -> None:
+    cache = FreteComCache(backend, prefixo_cep=5, relogio=relogio)
+
+    cache.cotacao("01000-000", "88000-100", 1.0)
+    cache.cotacao("01000-000", "88000-999", 1.0)
+    cache.cotacao("01000-000", "88001-000", 1.0)
+
+    assert backend.cotacao.call_count == 2
+
+
+def test_ttl_expira_entrada(backend: Mock, relogio: RelogioFalso) -> None:
+    cache = FreteComCache(backend, ttl=10, relogio=relogio)
+
+    cache.cotacao("01000-000", "88000-000", 1.0)
+    relogio.agora = 10.5
+    cache.cotacao("01000-000", "88000-000", 1.0)
+
+    assert backend.cotacao.call_count == 2
+    assert cache.estatisticas.expiracoes == 1
+
+
+def test_lru_expulsa_menos_recente(backend: Mock, relogio: RelogioFalso) -> None:
+    cache = FreteComCache(backend, tamanho_maximo=2, relogio=relogio)
+
+    cache.cotacao("01000-000", "A", 1.0)
+    cache.cotacao("01000-000", "B", 1.0)
+    cache.cotacao("01000-000", "A", 1.0)
+    cache.cotacao("01000-000", "C", 1.0)
+    cache.cotacao("01000-000", "A", 1.0)
+    cache.cotacao("01000-000", "B", 1.0)
+
+    assert len(cache) == 2
+    assert backend.cotacao.call_count == 4
+    assert cache.estatisticas.expulsoes == 2
+
+
+def test_erro_do_backend_nao_fica_em_cache(relogio: RelogioFalso) -> None:
+    backend = Mock(spec=FreteAPI)
+    backend.cotacao.side_effect = [FreteIndisponivelError("88000-000"), Frete(Decimal("10.00"), 2)]
+    cache = FreteComCache(backend, relogio=relogio)
+
+    with pytest.raises(FreteIndisponivelError):
+        cache.cotacao("01000-000", "88000-000", 1.0)
+    assert cache.cotacao("01000-000", "88000-000", 1.0).valor == Decimal("10.00")
+
+
+def test_single_flight_consulta_backend_uma_vez() -> None:
+    liberar = threading.Event()
+    chamadas = []
+
+    class Lento:
+        def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+            chamadas.append(cep_destino)
+            liberar.wait(timeout=5)
+            return Frete(Decimal("20.00"), 3)
+
+    cache = FreteComCache(Lento())
+    resultados = []
+    threads = [
+        threading.Thread(target=lambda: resultados.append(cache.cotacao("01000-000", "88000-000", 1.0)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.estatisticas.compartilhadas < 7:
+        time.sleep(0.001)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert chamadas == ["88000-000"]
+    assert len(resultados) == 8
+    assert len({id(frete) for frete in resultados}) == 1
@@ -0,0 +1,130 @@
+import csv
+import os
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+import pytest  # type: ignore[import]
+from carrinho.exceptions import FreteIndisponivelError
+from carrinho.frete import Frete
+from carrinho.frete_tabela import COLUNAS, TabelaFreteCEP, cep_numerico
+
+LINHAS = [
+    {"cep_inicio": "01000-000", "cep_fim": "09999-999", "peso_ate": "5", "valor": "15.90", "prazo_dias": "2"},
+    {"cep_inicio": "01000-000", "cep_fim": "09999-999", "peso_ate": "30", "valor": "29.90", "prazo_dias": "3"},
+    {"cep_inicio": "88000-000", "cep_fim": "89999-999", "peso_ate": "30", "valor": "42.00", "prazo_dias": "6"},
+    {"cep_inicio": "88000-000", "cep_fim": "89999-999", "peso_ate": "5", "valor": "25.00", "prazo_dias": "5"},
+]
+
+
+def _gravar(caminho: Path, linhas) -> None:
+    with caminho.open("w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+@pytest.fixture
+def tabela() -> TabelaFreteCEP:
+    return TabelaFreteCEP(LINHAS)
+
+
+@pytest.mark.parametrize(
+    "cep, peso, esperado",
+    [
+        ("01000-000", 0.5, Frete(Decimal("15.90"), 2)),
+        ("09999-999", 5.0, Frete(Decimal("15.90"), 2)),
+        ("05000000", 5.01, Frete(Decimal("29.90"), 3)),
+        ("88000-000", 4.0, Frete(Decimal("25.00"), 5)),
+        ("89999-999", 30.0, Frete(Decimal("42.00"), 6)),
+    ],
+)
+def test_cotacao_por_faixa_de_cep_e_peso(tabela: TabelaFreteCEP, cep: str, peso: float, esperado: Frete) -> None:
+    assert tabela.cotacao("01000-000", cep, peso) == esperado
+
+
+@pytest.mark.parametrize("cep, peso", [("10000-000", 1.0), ("00999-999", 1.0), ("88000-000", 30.5), ("88000-000", 0)])
+def test_fora_da_tabela_e_indisponivel(tabela: TabelaFreteCEP, cep: str, peso: float) -> None:
+    with pytest.raises(FreteIndisponivelError):
+        tabela.cotacao("01000-000", cep, peso)
+
+
+def test_cep_invalido() -> None:
+    assert cep_numerico("88000-123") == 88000123
+    with pytest.raises(ValueError):
+        cep_numerico("8800-0123")
+
+
+def test_fretes_iguais_sao_compartilhados() -> None:
+    linhas = [
+        {"cep_inicio": f"{i:05d}-000", "cep_fim": f"{i:05d}-999", "peso_ate": "10", "valor": "20.00", "prazo_dias": "4"}
+        for i in range(10, 60)
+    ]
+    tabela = TabelaFreteCEP(linhas)
+
+    assert len(tabela) == 50
+    assert tabela.cotacao("", "00010-500", 1) is tabela.cotacao("", "00059-000", 9)
+
+
+@pytest.mark.parametrize(
+    "linha",
+    [
+        {"cep_inicio": "09000-000", "cep_fim": "12000-000", "peso_ate": "5", "valor": "1.00", "prazo_dias": "1"},
+        {"cep_inicio": "20000-000", "cep_fim": "19000-000", "peso_ate": "5", "valor": "1.00", "prazo_dias": "1"},
+        {"cep_inicio": "20000-000", "cep_fim": "21000-000", "peso_ate": "x", "valor": "1.00", "prazo_dias": "1"},
+    ],
+)
+def test_tabela_invalida_e_rejeitada(linha) -> None:
+    with pytest.raises(ValueError):
+        TabelaFreteCEP(LINHAS + [linha])
+
+
+def test_recarga_troca_a_tabela(tmp_path: Path) -> None:
+    caminho = tmp_path / "frete.csv"
+    _gravar(caminho, LINHAS)
+    tabela = TabelaFreteCEP.de_csv(caminho)
+    assert tabela.recarregar_se_modificado() is False
+
+    _gravar(caminho, [dict(linha, valor="99.00") for linha in LINHAS])
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 1_000_000))
+
+    assert tabela.recarregar_se_modificado() is True
+    assert tabela.cotacao("", "88000-000", 1).valor == Decimal("99.00")
+
+
+def test_recarga_com_erro_mantem_tabela_antiga(tmp_path: Path) -> None:
+    caminho = tmp_path / "frete.csv"
+    _gravar(caminho, LINHAS)
+    tabela = TabelaFreteCEP.de_csv(caminho)
+    caminho.write_text("cep_inicio,cep_fim\n1,2\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        tabela.recarregar()
+
+    assert tabela.cotacao("", "88000-000", 1).valor == Decimal("25.00")
+
+
+def test_cotacoes_seguem_durante_recargas(tmp_path: Path) -> None:
+    caminho = tmp_path / "frete.csv"
+    _gravar(caminho, LINHAS)
+    tabela = TabelaFreteCEP.de_csv(caminho)
+    validos = {Decimal("25.00"), Decimal("26.00")}
+    erros = []
+    parar = threading.Event()
+
+    def cotar() -> None:
+        while not parar.is_set():
+            if tabela.cotacao("", "88000-000", 1).valor not in validos:
+                erros.append("valor inesperado")
+
+    leitores = [threading.Thread(target=cotar) for _ in range(3)]
+    for leitor in leitores:
+        leitor.start()
+    for indice in range(20):
+        _gravar(caminho, [dict(linha, valor="26.00" if indice % 2 else linha["valor"]) for linha in LINHAS[2:]])
+        tabela.recarregar()
+    parar.set()
+    for leitor in leitores:
+        leitor.join()
+
+    assert erros == []
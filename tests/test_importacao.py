@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest  # type: ignore[import]
+
+RAIZ = Path(__file__).resolve().parents[1]
+ORCAMENTO = Path(__file__).with_name("orcamento_importacao.json")
+
+
+def _python(codigo: str, *opcoes: str) -> subprocess.CompletedProcess:
+    ambiente = dict(os.environ, PYTHONPATH=str(RAIZ / "src"))
+    return subprocess.run(
+        [sys.executable, *opcoes, "-c", codigo], capture_output=True, text=True, env=ambiente, check=True
+    )
+
+
+def _modulos_importados(saida: str) -> dict:
+    """Tempo próprio (us) de cada módulo listado por ``-X importtime``."""
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, nome = linha[len("import time:") :].split("|")
+        tempos[nome.strip()] = int(proprio)
+    return tempos
+
+
+def custo_de_importacao(codigo: str, repeticoes: int = 5) -> int:
+    """Menor soma, entre ``repeticoes`` execuções, do tempo próprio dos módulos que ``codigo`` importa além da partida do interpretador."""
+    partida = set(_modulos_importados(_python("pass", "-X", "importtime").stderr))
+    custos = []
+    for _ in range(repeticoes):
+        tempos = _modulos_importados(_python(codigo, "-X", "importtime").stderr)
+        custos.append(sum(tempo for nome, tempo in tempos.items() if nome not in partida))
+    return min(custos)
+
+
+def test_importar_pacote_nao_carrega_submodulos() -> None:
+    saida = _python(
+        "import sys, carrinho; print(sorted(m for m in sys.modules if m.startswith('carrinho.') or m == 'decimal'))"
+    ).stdout
+
+    assert saida.strip() == "[]"
+
+
+def test_submodulo_carregado_no_primeiro_acesso() -> None:
+    saida = _python(
+        "import sys, carrinho\n"
+        "carrinho.Produto\n"
+        "print('carrinho.entities' in sys.modules, 'carrinho.services' in sys.modules)"
+    ).stdout
+
+    assert saida.split() == ["True", "False"]
+
+
+def test_api_publica_preservada() -> None:
+    import carrinho
+    from carrinho.entities import Carrinho
+    from carrinho.services import CarrinhoService
+
+    assert carrinho.Carrinho is Carrinho
+    assert carrinho.CarrinhoService is CarrinhoService
+    assert all(hasattr(carrinho, nome) for nome in carrinho.__all__)
+    assert set(carrinho.__all__) <= set(dir(carrinho))
+    with pytest.raises(AttributeError):
+        carrinho.NaoExiste  # noqa: B018
+    with pytest.raises(ImportError):
+        exec("from carrinho import NaoExiste", {})
+
+
+# Mede tempo absoluto em subprocessos: fica fora da suíte rápida, onde uma
+# máquina carregada geraria falhas espúrias.
+@pytest.mark.slow
+@pytest.mark.parametrize("codigo", sorted(json.loads(ORCAMENTO.read_text(encoding="utf-8"))))
+def test_custo_de_importacao_dentro_do_orcamento(codigo: str) -> None:
+    orcamento = json.loads(ORCAMENTO.read_text(encoding="utf-8"))[codigo]
+
+    custo = custo_de_importacao(codigo)
+
+    assert custo <= orcamento, f"{codigo!r} custou {custo}us (orçamento {orcamento}us)"
@@ -0,0 +1,121 @@
+import logging
+from datetime import date
+from decimal import Decimal
+
+import pytest  # type: ignore[import]
+from carrinho.entities import Carrinho, Produto
+from carrinho.frete import TabelaFreteLocal
+from carrinho.instrumentacao import (
+    Histograma,
+    Instrumentacao,
+    SinkLogging,
+    SinkMemoria,
+    SinkPrometheus,
+    amostrar_pilhas,
+    perfilar_resumos,
+)
+from carrinho.repositories import InMemoryEstoqueRepository
+from carrinho.services import CarrinhoService
+
+
+@pytest.fixture
+def produto() -> Produto:
+    return Produto(sku="SKU-1", nome="Caneca", preco=Decimal("25.00"), peso_kg=0.4)
+
+
+def _servico(instrumentacao=None) -> CarrinhoService:
+    estoque = InMemoryEstoqueRepository()
+    estoque.registrar("SKU-1", 10)
+    return CarrinhoService(
+        estoque,
+        TabelaFreteLocal(),
+        data_provider=lambda: date(2025, 1, 15),
+        instrumentacao=instrumentacao,
+    )
+
+
+def test_histograma_acumula_baldes_e_percentis() -> None:
+    histograma = Histograma((0.001, 0.01, 0.1))
+    for duracao in (0.0005, 0.0005, 0.005, 0.05, 0.5):
+        histograma.observar(duracao)
+
+    assert histograma.baldes == [2, 1, 1, 1]
+    assert histograma.contagem == 5
+    assert histograma.percentil(40) == 0.001
+    assert histograma.percentil(100) == 0.5
+    assert histograma.maximo == 0.5
+
+
+def test_servico_registra_operacoes_de_carrinho_estoque_e_frete(produto: Produto) -> None:
+    instrumentacao = Instrumentacao()
+    servico = _servico(instrumentacao)
+    carrinho = Carrinho()
+
+    servico.adicionar_item(carrinho, produto, 2)
+    servico.calcular_resumo(carrinho, "88000-000")
+    servico.finalizar(carrinho, "88000-000")
+
+    contagens = instrumentacao.contagens()
+    assert contagens["carrinho.adicionar_item"] == 1
+    assert contagens["carrinho.calcular_resumo"] == 2
+    assert contagens["carrinho.descontos"] == 2
+    assert contagens["frete.cotacao"] == 2
+    assert contagens["estoque.reservar"] == 1
+    assert contagens["estoque.confirmar_lote"] == 1
+
+
+def test_falhas_tambem_sao_medidas(produto: Produto) -> None:
+    instrumentacao = Instrumentacao()
+    servico = _servico(instrumentacao)
+
+    with pytest.raises(ValueError):
+        servico.calcular_resumo(Carrinho(), "88000-000")
+
+    assert instrumentacao.contagens()["carrinho.calcular_resumo"] == 1
+
+
+def test_sem_instrumentacao_nada_e_decorado(produto: Produto) -> None:
+    servico = _servico()
+
+    assert "calcular_resumo" not in vars(servico)
+    assert isinstance(servico._estoque, InMemoryEstoqueRepository)
+
+
+def test_sinks_recebem_retrato(tmp_path, caplog, produto: Produto) -> None:
+    memoria = SinkMemoria()
+    caminho = tmp_path / "carrinho.prom"
+    instrumentacao = Instrumentacao([memoria, SinkLogging(), SinkPrometheus(str(caminho))])
+    instrumentacao.registrar("frete.cotacao", 0.002)
+    instrumentacao.registrar("frete.cotacao", 0.2)
+
+    with caplog.at_level(logging.INFO, logger="carrinho.instrumentacao"):
+        instrumentacao.exportar()
+
+    assert memoria.exportacoes[0]["frete.cotacao"].contagem == 2
+    assert "frete.cotacao n=2" in caplog.text
+    texto = caminho.read_text(encoding="utf-8")
+    assert "# TYPE carrinho_operacao_segundos histogram" in texto
+    assert 'carrinho_operacao_segundos_bucket{operacao="frete.cotacao",le="0.0025"} 1' in texto
+    assert 'carrinho_operacao_segundos_bucket{operacao="frete.cotacao",le="+Inf"} 2' in texto
+    assert 'carrinho_operacao_segundos_count{operacao="frete.cotacao"} 2' in texto
+
+
+def test_perfil_de_resumos_lista_funcoes_quentes(produto: Produto) -> None:
+    servico = _servico()
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, produto, 3)
+
+    perfil = perfilar_resumos(servico, carrinho, "88000-000", n=50)
+
+    assert "_calcular_descontos" in perfil.texto()
+
+
+def test_amostragem_captura_pilha_da_funcao() -> None:
+    def ocupado() -> None:
+        total = 0
+        for i in range(3_000_000):
+            total += i
+
+    amostras = amostrar_pilhas(ocupado, intervalo=0.0005)
+
+    assert any("ocupado" in pilha for pilha in amostras)
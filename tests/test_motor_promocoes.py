@@ -0,0 +1,99 @@
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Produto
+from carrinho.promocoes import (
+    PROMOCOES_PADRAO,
+    DescontoSku,
+    FaixaCategoria,
+    FaixaQuantidade,
+    FaixaValor,
+    LeveXPagueY,
+    MotorPromocoes,
+)
+
+
+def _produto(sku: str, preco: str, categoria: str = "geral") -> Produto:
+    return Produto(sku=sku, nome=sku, preco=Decimal(preco), peso_kg=0.5, categoria=categoria)
+
+
+@pytest.mark.parametrize("quantidade", range(0, 15))
+def test_faixas_padrao_iguais_as_originais(quantidade: int) -> None:
+    carrinho = Carrinho()
+    if quantidade:
+        carrinho.adicionar(_produto("A", "33.33"), quantidade)
+    bruto = Decimal("33.33") * quantidade
+    percentual = 15 if quantidade >= 10 else 10 if quantidade >= 5 else 5 if quantidade >= 3 else 0
+    esperado = (bruto * percentual / 100).quantize(Decimal("0.01"), rounding="ROUND_HALF_UP")
+
+    assert PROMOCOES_PADRAO.calcular(carrinho) == esperado
+    assert PROMOCOES_PADRAO.depende_apenas_de_totais
+
+
+def test_regras_por_categoria_sku_e_leve_pague() -> None:
+    motor = MotorPromocoes(
+        [
+            FaixaCategoria(categoria="livros", minimo=2, percentual=10),
+            FaixaCategoria(categoria="livros", minimo=4, percentual=20),
+            DescontoSku(sku="CAFE", percentual=50, minimo=2),
+            LeveXPagueY(sku="MEIA", leve=3, pague=2),
+        ]
+    )
+    carrinho = Carrinho()
+    carrinho.adicionar(_produto("L1", "40.00", "livros"), 3)
+    carrinho.adicionar(_produto("L2", "20.00", "livros"), 1)
+    carrinho.adicionar(_produto("CAFE", "9.99"), 1)
+    carrinho.adicionar(_produto("MEIA", "12.00"), 7)
+
+    # livros: 4 unidades -> 20% de 140.00 = 28.00; café abaixo do mínimo; meias: 2 grátis = 24.00
+    assert motor.calcular(carrinho) == Decimal("52.00")
+
+    carrinho.alterar_quantidade("CAFE", 3)
+    # café: 50% de 29.97 = 14.985 -> 14.99
+    assert motor.calcular(carrinho) == Decimal("66.99")
+
+
+def test_faixa_de_valor_e_limite_no_valor_bruto() -> None:
+    motor = MotorPromocoes(
+        [
+            FaixaValor(minimo=Decimal("100.00"), percentual=10),
+            DescontoSku(sku="A", percentual=100),
+            FaixaQuantidade(minimo=1, percentual=50),
+        ]
+    )
+    carrinho = Carrinho()
+    carrinho.adicionar(_produto("A", "60.00"), 2)
+
+    assert motor.calcular(carrinho) == Decimal("120.00")
+
+
+def test_regras_a_partir_de_dados() -> None:
+    motor = MotorPromocoes.de_dados(
+        [
+            {"tipo": "faixa_quantidade", "minimo": 2, "percentual": 5},
+            {"tipo": "leve_x_pague_y", "sku": "B", "leve": 2, "pague": 1},
+        ]
+    )
+    carrinho = Carrinho()
+    carrinho.adicionar(_produto("B", "10.00"), 4)
+
+    assert motor.calcular(carrinho) == Decimal("22.00")
+    with pytest.raises(ValueError):
+        MotorPromocoes.de_dados([{"tipo": "sorteio"}])
+
+
+@pytest.mark.parametrize(
+    "regra",
+    [FaixaQuantidade(minimo=1, percentual=0), DescontoSku(sku="A", percentual=101), LeveXPagueY(sku="A", leve=2, pague=2)],
+)
+def test_regras_invalidas(regra) -> None:
+    with pytest.raises(ValueError):
+        MotorPromocoes([regra])
+
+
+def test_service_usa_motor_configurado(estoque, frete_api, data_congelada, produto_padrao) -> None:
+    motor = MotorPromocoes([DescontoSku(sku="SKU-001", percentual=1)])
+    service = CarrinhoService(estoque, frete_api, data_provider=data_congelada, promocoes=motor)
+    carrinho = Carrinho()
+    service.adicionar_item(carrinho, produto_padrao, 10)
+
+    assert service.calcular_resumo(carrinho, "88000-000").desconto_promocional == Decimal("520.00")
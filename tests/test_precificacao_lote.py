@@ -0,0 +1,76 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Cupom, Produto
+from carrinho.exceptions import CupomExpiradoError
+from carrinho.frete import TabelaFreteLocal
+from carrinho.precificacao_lote import calcular_resumos_em_lote
+from carrinho.repositories import InMemoryEstoqueRepository
+
+DATA = date(2025, 1, 15)
+
+
+def gerar_carrinhos(quantidade: int, semente: int = 7) -> list[Carrinho]:
+    aleatorio = random.Random(semente)
+    produtos = [
+        Produto(
+            sku=f"SKU-{i:04d}",
+            nome=f"Produto {i}",
+            preco=Decimal(aleatorio.randint(1, 99_999)) / 100,
+            peso_kg=aleatorio.uniform(0.05, 6.0),
+        )
+        for i in range(300)
+    ]
+    cupons = [None] + [
+        Cupom(codigo=f"C{p}", percentual=p, expira_em=DATA + timedelta(days=10)) for p in (1, 7, 10, 33, 50)
+    ]
+    carrinhos = []
+    for _ in range(quantidade):
+        carrinho = Carrinho()
+        for produto in aleatorio.sample(produtos, aleatorio.randint(1, 6)):
+            carrinho.adicionar(produto, aleatorio.randint(1, 5))
+        cupom = aleatorio.choice(cupons)
+        if cupom is not None:
+            carrinho.registrar_cupom(cupom)
+        carrinhos.append(carrinho)
+    return carrinhos
+
+
+def test_lote_igual_ao_caminho_escalar_ao_centavo() -> None:
+    carrinhos = gerar_carrinhos(2_000)
+    frete = TabelaFreteLocal()
+    service = CarrinhoService(InMemoryEstoqueRepository(), frete, data_provider=lambda: DATA)
+
+    lote = calcular_resumos_em_lote(carrinhos, "88000-000", frete, referencia=DATA)
+
+    assert len(lote) == len(carrinhos)
+    for indice, carrinho in enumerate(carrinhos):
+        assert lote.resumo(indice) == service.calcular_resumo(carrinho, "88000-000")
+
+
+def test_meio_centavo_arredonda_para_cima() -> None:
+    produto = Produto(sku="X", nome="X", preco=Decimal("0.10"), peso_kg=1.0)
+    carrinho = Carrinho()
+    carrinho.adicionar(produto, 3)
+    carrinho.registrar_cupom(Cupom(codigo="C", percentual=5, expira_em=DATA))
+
+    lote = calcular_resumos_em_lote([carrinho], "88000-000", TabelaFreteLocal(), referencia=DATA)
+
+    # 0.30 * 5% = 0.015 -> 0.02 de promoção; (0.30 - 0.02) * 5% = 0.014 -> 0.01 de cupom.
+    assert lote.desconto_promocional[0] == 2
+    assert lote.desconto_cupom[0] == 1
+
+
+def test_cupom_expirado_em_lote() -> None:
+    carrinho = gerar_carrinhos(1)[0]
+    carrinho.registrar_cupom(Cupom(codigo="OLD", percentual=10, expira_em=DATA - timedelta(days=1)))
+
+    with pytest.raises(CupomExpiradoError):
+        calcular_resumos_em_lote([carrinho], "88000-000", TabelaFreteLocal(), referencia=DATA)
+
+
+def test_um_cep_por_carrinho() -> None:
+    carrinhos = gerar_carrinhos(3)
+    with pytest.raises(ValueError):
+        calcular_resumos_em_lote(carrinhos, ["88000-000"], TabelaFreteLocal(), referencia=DATA)
@@ -0,0 +1,123 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from carrinho import Carrinho, Cupom, Produto
+from carrinho.frete import TabelaFreteLocal
+from carrinho import replay
+from carrinho.replay import ReplayPedidos, main, shard_de
+from carrinho.repositories import InMemoryEstoqueRepository
+from carrinho.serializacao import exportar_carrinhos, importar_resumos
+from carrinho.services import CarrinhoService
+
+DATA = date(2025, 1, 15)
+PRODUTOS = [
+    Produto(sku=f"SKU-{i:02d}", nome=f"Produto {i}", preco=Decimal("10.00") * (i + 1), peso_kg=0.5 + i / 10)
+    for i in range(8)
+]
+
+
+def _pedidos(quantidade: int) -> list[Carrinho]:
+    cupom = Cupom(codigo="REPLAY5", percentual=5, expira_em=DATA + timedelta(days=1))
+    expirado = Cupom(codigo="VELHO", percentual=5, expira_em=DATA - timedelta(days=1))
+    pedidos = []
+    for indice in range(quantidade):
+        carrinho = Carrinho(identificador=f"pedido-{indice}")
+        carrinho.adicionar(PRODUTOS[indice % 8], 1 + indice % 3)
+        carrinho.adicionar(PRODUTOS[(indice + 3) % 8], 2)
+        if indice % 4 == 0:
+            carrinho.registrar_cupom(cupom)
+        if indice % 17 == 16:
+            carrinho.registrar_cupom(expirado)
+        pedidos.append(carrinho)
+    return pedidos
+
+
+def _referencia_sequencial(pedidos: list[Carrinho], estoque_inicial: dict) -> list:
+    estoque = InMemoryEstoqueRepository()
+    for sku, quantidade in estoque_inicial.items():
+        estoque.registrar(sku, quantidade)
+    service = CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: DATA)
+    resumos = []
+    for pedido in pedidos:
+        carrinho = Carrinho()
+        service.adicionar_itens(carrinho, [(i.produto, i.quantidade) for i in pedido.itens.values()])
+        if pedido.cupom:
+            try:
+                service.aplicar_cupom(carrinho, pedido.cupom)
+            except ValueError:
+                for sku in list(carrinho.itens):
+                    service.remover_item(carrinho, sku)
+                resumos.append(None)
+                continue
+        resumos.append(service.finalizar(carrinho, "88000-000"))
+    return resumos
+
+
+def test_replay_em_processos_igual_ao_sequencial_e_em_ordem() -> None:
+    pedidos = _pedidos(120)
+    estoque_inicial = {produto.sku: 1_000 for produto in PRODUTOS}
+    replay = ReplayPedidos(estoque_inicial, processos=2, referencia=DATA, tamanho_bloco=16, blocos_em_voo=2)
+
+    resultados = list(replay.executar(pedidos))
+
+    assert [r.identificador for r in resultados] == [p.identificador for p in pedidos]
+    assert [r.resumo for r in resultados] == _referencia_sequencial(pedidos, estoque_inicial)
+    assert replay.relatorio.carrinhos == 120
+    assert replay.relatorio.falhas == {"CupomExpiradoError": 7}
+    assert replay.relatorio.latencias["p99"] >= replay.relatorio.latencias["p50"] > 0
+    assert all(dados["reservado"] == 0 for dados in replay.estoque_final.values())
+
+
+def test_estoque_compartilhado_entre_processos_nao_vende_demais() -> None:
+    pedidos = _pedidos(60)
+    replay = ReplayPedidos({produto.sku: 10 for produto in PRODUTOS}, processos=3, referencia=DATA, tamanho_bloco=8)
+
+    resultados = list(replay.executar(pedidos))
+
+    vendidos = sum(10 - dados["disponivel"] for dados in replay.estoque_final.values())
+    esperado = sum(
+        sum(i.quantidade for i in pedido.itens.values())
+        for pedido, resultado in zip(pedidos, resultados)
+        if resultado.sucesso
+    )
+    assert vendidos == esperado
+    assert replay.relatorio.falhas.get("EstoqueInsuficienteError", 0) > 0
+
+
+class _EstoqueSemLiberacao(InMemoryEstoqueRepository):
+    def liberar_lote(self, itens) -> None:
+        raise ConnectionError("gerenciador de estoque encerrado")
+
+
+def test_falha_na_limpeza_vira_erro_do_pedido(monkeypatch) -> None:
+    estoque = _EstoqueSemLiberacao()
+    for produto in PRODUTOS:
+        estoque.registrar(produto.sku, 100)
+    monkeypatch.setattr(replay, "_service", CarrinhoService(estoque, TabelaFreteLocal(), data_provider=lambda: DATA))
+    monkeypatch.setattr(replay, "_estoque", estoque)
+    monkeypatch.setattr(replay, "_cep_destino", "88000-000")
+    pedido = _pedidos(17)[16]
+
+    resultado = replay._processar_carrinho(pedido)
+
+    assert resultado.erro == "CupomExpiradoError (limpeza: ConnectionError)"
+    assert resultado.resumo is None
+
+
+def test_shard_estavel() -> None:
+    assert shard_de("pedido-42", 4) == shard_de("pedido-42", 4)
+    assert {shard_de(f"pedido-{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_linha_de_comando(tmp_path, capsys) -> None:
+    pedidos = tmp_path / "pedidos.jsonl"
+    with pedidos.open("w", encoding="utf-8") as arquivo:
+        exportar_carrinhos(_pedidos(10), arquivo)
+    estoque = tmp_path / "estoque.csv"
+    estoque.write_text("sku,quantidade\n" + "".join(f"{p.sku},100\n" for p in PRODUTOS), encoding="utf-8")
+    saida = tmp_path / "resumos.jsonl"
+
+    assert main([str(pedidos), "--estoque", str(estoque), "--processos", "2", "--data", "2025-01-15", "--saida", str(saida)]) == 0
+
+    assert "10 carrinhos" in capsys.readouterr().out
+    assert len(list(importar_resumos(io.StringIO(saida.read_text(encoding="utf-8"))))) == 10
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Cupom, Produto
+from carrinho.exceptions import CupomExpiradoError
+from carrinho.frete import FreteAPI, TabelaFreteLocal
+from carrinho.frete_tabela import TabelaFreteCEP
+from carrinho.repositories import InMemoryEstoqueRepository
+
+
+class Calendario:
+    def __init__(self) -> None:
+        self.hoje = date(2025, 1, 15)
+
+    def __call__(self) -> date:
+        return self.hoje
+
+
+@pytest.fixture
+def calendario() -> Calendario:
+    return Calendario()
+
+
+@pytest.fixture
+def frete_api() -> Mock:
+    return Mock(spec=FreteAPI, wraps=TabelaFreteLocal())
+
+
+@pytest.fixture
+def caneca() -> Produto:
+    return Produto(sku="CANECA", nome="Caneca", preco=Decimal("30.00"), peso_kg=0.5)
+
+
+def _servico(frete_api: Mock, calendario: Calendario, **opcoes) -> CarrinhoService:
+    estoque = InMemoryEstoqueRepository()
+    estoque.registrar("CANECA", 100)
+    opcoes.setdefault("faixa_peso", TabelaFreteLocal.chave_faixa)
+    return CarrinhoService(estoque, frete_api, data_provider=calendario, resumos_em_cache=8, **opcoes)
+
+
+def test_resumo_repetido_vem_do_cache(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 2)
+
+    primeiro = servico.calcular_resumo(carrinho, "88000-000")
+    segundo = servico.calcular_resumo(carrinho, "88000-000")
+
+    assert segundo is primeiro
+    assert frete_api.cotacao.call_count == 1
+
+
+def test_mutacao_na_mesma_faixa_reaproveita_frete(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 2)
+    antes = servico.calcular_resumo(carrinho, "88000-000")
+
+    servico.adicionar_item(carrinho, caneca, 1)
+    depois = servico.calcular_resumo(carrinho, "88000-000")
+
+    assert depois.valor_bruto == Decimal("90.00")
+    assert depois.frete == antes.frete
+    assert frete_api.cotacao.call_count == 1
+
+
+def test_mudanca_de_faixa_ou_cep_recota_frete(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 2)
+    servico.calcular_resumo(carrinho, "88000-000")
+
+    servico.alterar_quantidade(carrinho, "CANECA", 10)
+    resumo = servico.calcular_resumo(carrinho, "88000-000")
+    servico.calcular_resumo(carrinho, "01310-100")
+
+    assert frete_api.cotacao.call_count == 3
+    assert resumo.frete == TabelaFreteLocal().cotacao("01000-000", "88000-000", 5.0)
+
+
+def test_padrao_recota_quando_o_peso_muda_com_outra_tabela(calendario: Calendario, caneca: Produto) -> None:
+    tabela = TabelaFreteCEP(
+        [
+            {"cep_inicio": "00000-000", "cep_fim": "99999-999", "peso_ate": "1", "valor": "10.00", "prazo_dias": "2"},
+            {"cep_inicio": "00000-000", "cep_fim": "99999-999", "peso_ate": "3", "valor": "50.00", "prazo_dias": "2"},
+        ]
+    )
+    estoque = InMemoryEstoqueRepository()
+    estoque.registrar("CANECA", 100)
+    servico = CarrinhoService(estoque, tabela, data_provider=calendario, resumos_em_cache=8)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 1)
+    assert servico.calcular_resumo(carrinho, "88000-000").frete.valor == Decimal("10.00")
+
+    servico.alterar_quantidade(carrinho, "CANECA", 4)
+
+    assert servico.calcular_resumo(carrinho, "88000-000").frete.valor == Decimal("50.00")
+
+
+def test_cupom_e_data_invalidam_resumo(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 1)
+    servico.calcular_resumo(carrinho, "88000-000")
+
+    servico.aplicar_cupom(carrinho, Cupom("DEZ", 10, calendario.hoje + timedelta(days=1)))
+    assert servico.calcular_resumo(carrinho, "88000-000").desconto_cupom == Decimal("3.00")
+
+    calendario.hoje += timedelta(days=2)
+    with pytest.raises(CupomExpiradoError):
+        servico.calcular_resumo(carrinho, "88000-000")
+    assert frete_api.cotacao.call_count == 1
+
+
+def test_cache_limitado_por_carrinho(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinhos = [Carrinho() for _ in range(9)]
+    for carrinho in carrinhos:
+        servico.adicionar_item(carrinho, caneca, 1)
+        servico.calcular_resumo(carrinho, "88000-000")
+
+    servico.calcular_resumo(carrinhos[-1], "88000-000")
+    servico.calcular_resumo(carrinhos[0], "88000-000")
+
+    assert len(servico._resumos) == 8
+    assert frete_api.cotacao.call_count == 10
+
+
+def test_outro_objeto_com_mesmo_identificador_nao_reaproveita(
+    frete_api: Mock, calendario: Calendario, caneca: Produto
+) -> None:
+    servico = _servico(frete_api, calendario)
+    original = Carrinho(identificador="pedido-1")
+    servico.adicionar_item(original, caneca, 1)
+    servico.calcular_resumo(original, "88000-000")
+
+    copia = Carrinho(identificador="pedido-1")
+    servico.adicionar_item(copia, caneca, 3)
+
+    assert servico.calcular_resumo(copia, "88000-000").valor_bruto == Decimal("90.00")
+
+
+def test_finalizar_descarta_resumo(frete_api: Mock, calendario: Calendario, caneca: Produto) -> None:
+    servico = _servico(frete_api, calendario)
+    carrinho = Carrinho()
+    servico.adicionar_item(carrinho, caneca, 1)
+
+    servico.finalizar(carrinho, "88000-000")
+
+    assert carrinho.identificador not in servico._resumos
@@ -0,0 +1,95 @@
+import io
+import json
+from datetime import date
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, Cupom, Produto
+from carrinho.frete import TabelaFreteLocal
+from carrinho.repositories import InMemoryEstoqueRepository
+from carrinho.serializacao import (
+    exportar_carrinhos,
+    exportar_resumos,
+    importar_carrinhos,
+    importar_resumos,
+)
+from carrinho.services import CarrinhoService
+
+MOUSE = Produto(sku="SKU-001", nome="Mouse Premium", preco=Decimal("250.00"), peso_kg=0.3)
+TECLADO = Produto(sku="SKU-002", nome="Teclado Mecânico", preco=Decimal("650.00"), peso_kg=1.1, categoria="perifericos")
+
+
+def _carrinhos() -> list[Carrinho]:
+    primeiro = Carrinho(identificador="c1")
+    primeiro.adicionar(MOUSE, 3)
+    primeiro.adicionar(TECLADO, 2)
+    primeiro.registrar_cupom(Cupom(codigo="EQUIPE15", percentual=15, expira_em=date(2025, 2, 15)))
+    segundo = Carrinho(identificador="c2")
+    segundo.adicionar(MOUSE, 1)
+    return [primeiro, segundo]
+
+
+def test_ida_e_volta_de_carrinhos() -> None:
+    originais = _carrinhos()
+    buffer = io.StringIO()
+
+    assert exportar_carrinhos(originais, buffer) == 2
+    buffer.seek(0)
+    importados = list(importar_carrinhos(buffer))
+
+    assert importados == originais
+    assert [c.identificador for c in importados] == ["c1", "c2"]
+    assert importados[0].valor_bruto == Decimal("2050.00")
+    assert importados[0].itens["SKU-002"].produto.categoria == "perifericos"
+
+
+def test_produto_emitido_uma_vez_por_sku() -> None:
+    buffer = io.StringIO()
+    exportar_carrinhos(_carrinhos() * 3, buffer)
+
+    tipos = [json.loads(linha)["tipo"] for linha in buffer.getvalue().splitlines()]
+
+    assert tipos.count("produto") == 2
+    assert tipos.count("carrinho") == 6
+
+
+def test_produto_alterado_e_reemitido() -> None:
+    remarcado = Produto(sku="SKU-001", nome="Mouse Premium", preco=Decimal("199.90"), peso_kg=0.3)
+    antes, depois = Carrinho(identificador="a"), Carrinho(identificador="b")
+    antes.adicionar(MOUSE, 1)
+    depois.adicionar(remarcado, 1)
+    buffer = io.StringIO()
+    exportar_carrinhos([antes, depois], buffer)
+    buffer.seek(0)
+
+    importados = list(importar_carrinhos(buffer))
+
+    assert [c.valor_bruto for c in importados] == [Decimal("250.00"), Decimal("199.90")]
+
+
+def test_importacao_e_preguicosa() -> None:
+    buffer = io.StringIO()
+    exportar_carrinhos(_carrinhos(), buffer)
+    linhas = iter(buffer.getvalue().splitlines())
+
+    gerador = importar_carrinhos(linhas)
+    primeiro = next(gerador)
+
+    assert primeiro.identificador == "c1"
+    assert next(linhas)  # o segundo carrinho ainda não foi consumido
+
+
+def test_referencia_a_produto_desconhecido() -> None:
+    linha = json.dumps({"tipo": "carrinho", "id": "x", "itens": [["SKU-404", 1]]})
+    with pytest.raises(ValueError):
+        list(importar_carrinhos([linha]))
+
+
+def test_ida_e_volta_de_resumos() -> None:
+    service = CarrinhoService(InMemoryEstoqueRepository(), TabelaFreteLocal(), data_provider=lambda: date(2025, 1, 15))
+    resumos = [service.calcular_resumo(carrinho, "88000-000") for carrinho in _carrinhos()]
+    buffer = io.StringIO()
+
+    exportar_resumos(resumos, buffer)
+    buffer.seek(0)
+
+    assert list(importar_resumos(buffer)) == resumos
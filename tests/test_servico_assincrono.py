@@ -0,0 +1,169 @@
+import asyncio
+import time
+from datetime import date
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho import Carrinho, CarrinhoService, Cupom, Produto
+from carrinho.assincrono import AsyncCarrinhoService, EstoqueAssincrono, TransportadoraSimulada
+from carrinho.cupons import RegistroCupons
+from carrinho.exceptions import CupomEsgotadoError, CupomExpiradoError, EstoqueInsuficienteError, FreteIndisponivelError
+from carrinho.frete import TabelaFreteLocal
+from carrinho.repositories import InMemoryEstoqueRepository
+
+DATA = date(2025, 1, 15)
+
+
+def _produto(sku: str = "SKU-001") -> Produto:
+    return Produto(sku=sku, nome="Notebook Gamer", preco=Decimal("5200.00"), peso_kg=2.8)
+
+
+def _estoque(quantidade: int = 25) -> InMemoryEstoqueRepository:
+    repo = InMemoryEstoqueRepository()
+    repo.registrar("SKU-001", quantidade)
+    return repo
+
+
+def test_resumo_assincrono_igual_ao_sincrono() -> None:
+    cupom = Cupom(codigo="PROMO10", percentual=10, expira_em=date(2025, 2, 14))
+    sincrono = CarrinhoService(_estoque(), TabelaFreteLocal(), data_provider=lambda: DATA)
+    carrinho_sincrono = Carrinho()
+    sincrono.adicionar_item(carrinho_sincrono, _produto(), 4)
+    sincrono.aplicar_cupom(carrinho_sincrono, cupom)
+
+    async def cenario():
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(_estoque()), TransportadoraSimulada(), data_provider=lambda: DATA
+        )
+        carrinho = Carrinho()
+        await service.adicionar_item(carrinho, _produto(), 4)
+        await service.aplicar_cupom(carrinho, cupom)
+        return await service.calcular_resumo(carrinho, "88000-000")
+
+    assert asyncio.run(cenario()) == sincrono.calcular_resumo(carrinho_sincrono, "88000-000")
+
+
+def test_cotacao_comeca_antes_do_calculo_de_descontos(monkeypatch: pytest.MonkeyPatch) -> None:
+    import carrinho.assincrono as assincrono
+
+    ordem = []
+    original = assincrono._calcular_descontos
+
+    def descontos(*argumentos):
+        ordem.append("descontos")
+        return original(*argumentos)
+
+    class Transportadora:
+        async def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float):
+            ordem.append("frete")
+            return await TransportadoraSimulada().cotacao(cep_origem, cep_destino, peso_total)
+
+    monkeypatch.setattr(assincrono, "_calcular_descontos", descontos)
+
+    async def cenario():
+        service = AsyncCarrinhoService(EstoqueAssincrono(_estoque()), Transportadora(), data_provider=lambda: DATA)
+        carrinho = Carrinho()
+        await service.adicionar_item(carrinho, _produto(), 1)
+        await service.calcular_resumo(carrinho, "88000-000")
+
+    asyncio.run(cenario())
+    assert ordem == ["frete", "descontos"]
+
+
+def test_timeout_por_chamada_gera_frete_indisponivel() -> None:
+    async def cenario():
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(_estoque()), TransportadoraSimulada(latencia=1.0), data_provider=lambda: DATA
+        )
+        carrinho = Carrinho()
+        await service.adicionar_item(carrinho, _produto(), 1)
+        await service.calcular_resumo(carrinho, "88000-000", timeout=0.01)
+
+    with pytest.raises(FreteIndisponivelError):
+        asyncio.run(cenario())
+
+
+def test_timeout_conta_desde_o_disparo_da_cotacao(monkeypatch: pytest.MonkeyPatch) -> None:
+    import carrinho.assincrono as assincrono
+
+    original = assincrono._calcular_descontos
+
+    def descontos_lentos(*argumentos):
+        time.sleep(0.1)
+        return original(*argumentos)
+
+    monkeypatch.setattr(assincrono, "_calcular_descontos", descontos_lentos)
+
+    async def cenario():
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(_estoque()), TransportadoraSimulada(latencia=0.03), data_provider=lambda: DATA
+        )
+        carrinho = Carrinho()
+        await service.adicionar_item(carrinho, _produto(), 1)
+        await service.calcular_resumo(carrinho, "88000-000", timeout=0.05)
+
+    with pytest.raises(FreteIndisponivelError):
+        asyncio.run(cenario())
+
+
+def test_cupom_validado_e_resgatado_como_no_servico_sincrono() -> None:
+    registro = RegistroCupons()
+    registro.cadastrar(Cupom(codigo="UNICO", percentual=10, expira_em=date(2025, 2, 14)), limite_global=1)
+
+    async def cenario():
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(_estoque()), TransportadoraSimulada(), data_provider=lambda: DATA, cupons=registro
+        )
+        with pytest.raises(CupomExpiradoError):
+            await service.aplicar_cupom(Carrinho(), Cupom(codigo="VELHO", percentual=5, expira_em=date(2025, 1, 1)))
+        primeiro, segundo = Carrinho(), Carrinho()
+        for carrinho in (primeiro, segundo):
+            await service.adicionar_item(carrinho, _produto(), 1)
+            await service.aplicar_cupom(carrinho, "UNICO", cliente="ana")
+        await service.finalizar(primeiro, "88000-000", cliente="ana")
+        with pytest.raises(CupomEsgotadoError):
+            await service.finalizar(segundo, "88000-000", cliente="bia")
+
+    asyncio.run(cenario())
+    assert registro.usos("UNICO") == 1
+
+
+def test_finalizar_confirma_reservas() -> None:
+    repo = _estoque(5)
+
+    async def cenario():
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(repo), TransportadoraSimulada(), data_provider=lambda: DATA, timeout_frete=1.0
+        )
+        carrinho = Carrinho()
+        await service.adicionar_item(carrinho, _produto(), 3)
+        await service.alterar_quantidade(carrinho, "SKU-001", 2)
+        await service.finalizar(carrinho, "88000-000")
+        with pytest.raises(EstoqueInsuficienteError):
+            await service.adicionar_item(carrinho, _produto(), 4)
+
+    asyncio.run(cenario())
+    assert repo.snapshot()["SKU-001"] == {"disponivel": 3, "reservado": 0}
+
+
+def test_latencia_limitada_com_muitos_resumos_concorrentes() -> None:
+    latencia = 0.05
+    transportadora = TransportadoraSimulada(latencia=latencia)
+
+    async def cenario() -> float:
+        service = AsyncCarrinhoService(
+            EstoqueAssincrono(_estoque(1_000)), transportadora, data_provider=lambda: DATA
+        )
+        carrinhos = []
+        for _ in range(200):
+            carrinho = Carrinho()
+            await service.adicionar_item(carrinho, _produto(), 2)
+            carrinhos.append(carrinho)
+        inicio = time.perf_counter()
+        await asyncio.gather(*(service.calcular_resumo(c, "88000-000") for c in carrinhos))
+        return time.perf_counter() - inicio
+
+    duracao = asyncio.run(cenario())
+
+    assert transportadora.chamadas == 200
+    # Sequencialmente seriam 200 * 50ms = 10s; concorrentes ficam perto de uma latência.
+    assert duracao < latencia * 10
@@ -0,0 +1,95 @@
+import time
+from decimal import Decimal
+import pytest  # type: ignore[import]
+from carrinho.exceptions import FreteIndisponivelError
+from carrinho.frete import Frete
+from carrinho.transportadoras import FreteMultiTransportadora
+
+
+class TransportadoraFixa:
+    def __init__(self, valor: str, prazo: int, *, atraso: float = 0.0, erro: Exception | None = None) -> None:
+        self._frete = Frete(valor=Decimal(valor), prazo_dias=prazo)
+        self._atraso = atraso
+        self._erro = erro
+        self.chamadas = 0
+
+    def cotacao(self, cep_origem: str, cep_destino: str, peso_total: float) -> Frete:
+        self.chamadas += 1
+        time.sleep(self._atraso)
+        if self._erro is not None:
+            raise self._erro
+        return self._frete
+
+
+def test_escolhe_mais_barato_por_padrao() -> None:
+    with FreteMultiTransportadora(
+        [TransportadoraFixa("30.00", 2), TransportadoraFixa("18.90", 6), TransportadoraFixa("25.00", 3)]
+    ) as composta:
+        assert composta.cotacao("01000-000", "88000-000", 2.0) == Frete(Decimal("18.90"), 6)
+
+
+def test_escolhe_mais_rapido() -> None:
+    with FreteMultiTransportadora(
+        [TransportadoraFixa("30.00", 2), TransportadoraFixa("18.90", 6), TransportadoraFixa("28.00", 2)],
+        criterio="mais_rapido",
+    ) as composta:
+        assert composta.cotacao("01000-000", "88000-000", 2.0) == Frete(Decimal("28.00"), 2)
+
+
+def test_ignora_indisponiveis_e_atrasadas() -> None:
+    with FreteMultiTransportadora(
+        [
+            TransportadoraFixa("5.00", 1, atraso=1.0),
+            TransportadoraFixa("9.00", 1, erro=FreteIndisponivelError("88000-000")),
+            TransportadoraFixa("40.00", 5),
+        ],
+        prazo_limite=0.1,
+    ) as composta:
+        inicio = time.perf_counter()
+        frete = composta.cotacao("01000-000", "88000-000", 2.0)
+        duracao = time.perf_counter() - inicio
+
+    assert frete == Frete(Decimal("40.00"), 5)
+    assert duracao < 0.5
+
+
+def test_sem_cotacao_valida_levanta_indisponivel() -> None:
+    with FreteMultiTransportadora(
+        [TransportadoraFixa("9.00", 1, erro=FreteIndisponivelError("88000-000"))]
+    ) as composta:
+        with pytest.raises(FreteIndisponivelError):
+            composta.cotacao("01000-000", "88000-000", 2.0)
+
+
+def test_erro_inesperado_de_uma_transportadora_nao_derruba_as_demais(caplog: pytest.LogCaptureFixture) -> None:
+    with FreteMultiTransportadora(
+        [TransportadoraFixa("9.00", 1, erro=RuntimeError("bug")), TransportadoraFixa("10.00", 1)]
+    ) as composta:
+        frete = composta.cotacao("01000-000", "88000-000", 2.0)
+
+    assert frete == Frete(Decimal("10.00"), 1)
+    assert "Transportadora falhou" in caplog.text
+
+
+def test_erro_inesperado_sem_alternativa_vira_indisponivel() -> None:
+    with FreteMultiTransportadora([TransportadoraFixa("9.00", 1, erro=TimeoutError("lenta"))]) as composta:
+        with pytest.raises(FreteIndisponivelError) as erro:
+            composta.cotacao("01000-000", "88000-000", 2.0)
+
+    assert isinstance(erro.value.__cause__, TimeoutError)
+
+
+def test_consultas_em_paralelo_custam_a_mais_lenta_e_nao_a_soma() -> None:
+    transportadoras = [TransportadoraFixa(f"{10 + i}.00", 3, atraso=0.1) for i in range(5)]
+    with FreteMultiTransportadora(transportadoras) as composta:
+        inicio = time.perf_counter()
+        composta.cotacao("01000-000", "88000-000", 2.0)
+        duracao = time.perf_counter() - inicio
+
+    assert all(t.chamadas == 1 for t in transportadoras)
+    assert duracao < 0.3
+
+
+def test_criterio_invalido() -> None:
+    with pytest.raises(ValueError):
+        FreteMultiTransportadora([TransportadoraFixa("1.00", 1)], criterio="mais_bonito")